@@ -0,0 +1,311 @@
+"""
+Deterministic in-process stand-in for the git and docker executables
+"""
+
+import random
+import time
+
+from core.command_runner import CommandResult, CommandRunner
+from core.tool_resolver import ToolInfo
+
+class FakeBackend:
+    """
+    Scripted, in-memory model of a git repository and a docker daemon
+    
+    Everything is derived from the constructor arguments and seed, so the
+    same configuration always produces the same branches, containers and
+    output, which makes timings comparable from run to run and from commit
+    to commit. Output is generated lazily, so a million log lines cost no
+    memory until they are read.
+    
+    Args:
+        branches (int): Number of local branches (including the current one)
+        remote_branches (int): Number of branches on origin; defaults to branches
+        containers (int): Number of running containers
+        images (int): Number of images
+        log_lines (int): Lines printed by docker logs
+        build_steps (int): Steps printed by docker build
+        build_lines_per_step (int): Output lines per build step
+        latency (float or dict): Seconds every command takes before producing
+            output, either one value or per tool ({'git': 0.01, 'docker': 0.05})
+        seed (int): Seed for the generated names
+    """
+    
+    def __init__(self, branches=20, remote_branches=None, containers=5, images=5, log_lines=1000,
+                 build_steps=20, build_lines_per_step=20, latency=0.0, seed=0):
+        rng = random.Random(seed)
+        words = ['api', 'auth', 'build', 'cache', 'core', 'docs', 'fix', 'infra', 'login',
+                 'perf', 'search', 'sync', 'ui', 'upgrade', 'web']
+                 
+        self.current_branch = 'main'
+        self.branches = ['main'] + [
+            f"{rng.choice(['feature', 'bugfix', 'chore'])}/{rng.choice(words)}-{i:05d}"
+            for i in range(1, branches)
+        ]
+        remote_count = branches if remote_branches is None else remote_branches
+        self.remote_branches = self.branches[:remote_count]
+        
+        self.containers = [
+            {
+                'id': f"{rng.getrandbits(48):012x}",
+                'image': f"{rng.choice(words)}:{rng.randint(1, 9)}.{rng.randint(0, 20)}",
+                'status': f"Up {rng.randint(1, 59)} minutes",
+                'name': f"{rng.choice(words)}_{i}",
+                'ports': f"0.0.0.0:{8000 + i}->80/tcp",
+            }
+            for i in range(containers)
+        ]
+        self.images = [
+            {
+                'repository': f"{rng.choice(words)}-{i}",
+                'tag': 'latest',
+                'id': f"{rng.getrandbits(48):012x}",
+                'size': f"{rng.randint(5, 900)}MB",
+            }
+            for i in range(images)
+        ]
+        self.log_lines = log_lines
+        self.build_steps = build_steps
+        self.build_lines_per_step = build_lines_per_step
+        self.latency = latency
+        self.staged = False
+        self.commits = 0
+        self.calls = []
+        
+    def latency_for(self, tool):
+        """Simulated latency of a tool in seconds"""
+        if isinstance(self.latency, dict):
+            return self.latency.get(tool, 0.0)
+        return self.latency
+        
+    def run(self, cmd, cwd=None):
+        """
+        Execute a command against the model
+        
+        Returns:
+            tuple: (returncode, stdout lines, stderr lines); the line
+                sequences may be lazy iterables
+        """
+        self.calls.append(list(cmd))
+        tool = str(cmd[0]) if cmd else ''
+        args = [str(arg) for arg in cmd[1:]]
+        if args == ['--version']:
+            return 0, [f"{tool} version 0.0.0 (fake)"], []
+        if tool == 'git':
+            return self._git(args)
+        if tool == 'docker':
+            return self._docker(args)
+        return 127, [], [f"Command not found: {tool}. Make sure it's installed and in PATH."]
+        
+    def _git(self, args):
+        while args and args[0].startswith('-'):
+            args = args[1:]  # Global options such as --no-optional-locks
+        subcommand = args[0] if args else ''
+        options = args[1:]
+        
+        if subcommand == 'branch' and '--show-current' in options:
+            return 0, [self.current_branch], []
+        if subcommand == 'branch':
+            lines = (('* ' if name == self.current_branch else '  ') + name for name in self.branches)
+            if '-a' in options:
+                remotes = [f"  remotes/origin/HEAD -> origin/{self.branches[0]}"] + [
+                    f"  remotes/origin/{name}" for name in self.remote_branches
+                ]
+                return 0, _chain(lines, remotes), []
+            return 0, lines, []
+        if subcommand == 'for-each-ref':
+            return 0, self._for_each_ref(options), []
+        if subcommand == 'status' and '--porcelain=v2' in options:
+            xy = 'M.' if self.staged else '.M'
+            records = [
+                f"# branch.oid {self.commits:040x}",
+                f"# branch.head {self.current_branch}",
+                f"# branch.upstream origin/{self.current_branch}",
+                "# branch.ab +0 -0",
+                f"1 {xy} N... 100644 100644 100644 {'0' * 40} {'0' * 40} README.md",
+            ]
+            return 0, ['\0'.join(records) + '\0'], []
+        if subcommand == 'status':
+            return 0, [' M README.md'] if not self.staged else ['M  README.md'], []
+        if subcommand == 'add':
+            self.staged = True
+            return 0, [], []
+        if subcommand == 'commit':
+            if not self.staged:
+                return 1, ["nothing to commit, working tree clean"], []
+            self.staged = False
+            self.commits += 1
+            return 0, [f"[{self.current_branch} {self.commits:07x}] {options[-1] if options else ''}"], []
+        if subcommand == 'push':
+            return 0, [], [
+                "Enumerating objects: 5, done.",
+                "Writing objects: 100% (3/3), 300 bytes | 300.00 KiB/s, done.",
+                "To fake:origin.git",
+                f"   0000000..{self.commits:07x}  {self.current_branch} -> {self.current_branch}",
+            ]
+        if subcommand == 'checkout':
+            create = '-b' in options
+            name = options[-1] if options else ''
+            if create:
+                if name in self.branches:
+                    return 128, [], [f"fatal: a branch named '{name}' already exists"]
+                self.branches.append(name)
+            elif name not in self.branches and name not in self.remote_branches:
+                return 1, [], [f"error: pathspec '{name}' did not match any file(s) known to git"]
+            self.current_branch = name
+            return 0, [], [f"Switched to {'a new ' if create else ''}branch '{name}'"]
+        if subcommand == 'clone':
+            progress = []
+            if '--progress' in options:
+                progress = [f"Receiving objects: {p}% ({p * 10}/1000)" for p in range(0, 101, 5)]
+                progress += [f"Resolving deltas: {p}% ({p * 4}/400)" for p in range(0, 101, 25)]
+            return 0, [], ["Cloning into 'repository'..."] + progress + ["done."]
+        return 0, [], []
+        
+    def _for_each_ref(self, options):
+        """for-each-ref over local and origin branches, newest first"""
+        template = next((o[len('--format='):] for o in options if o.startswith('--format=')), '%(refname)')
+        template = template.replace('%00', '\0')
+        refs = [('refs/heads/' + name, name == self.current_branch) for name in self.branches]
+        refs += [('refs/remotes/origin/' + name, False) for name in self.remote_branches]
+        # Branch i was last committed to i hours before the fixed epoch
+        dated = sorted(
+            ((1700000000 - (i % len(self.branches)) * 3600, refname, head) for i, (refname, head) in enumerate(refs)),
+            key=lambda ref: -ref[0]
+        )
+        for committed, refname, head in dated:
+            yield (template.replace('%(HEAD)', '*' if head else ' ')
+                   .replace('%(refname)', refname)
+                   .replace('%(committerdate:unix)', str(committed))
+                   .replace('%(symref)', ''))
+                   
+    def _docker(self, args):
+        subcommand = args[0] if args else ''
+        options = args[1:]
+        
+        if subcommand == 'ps':
+            return 0, (
+                f"{c['id']}|{c['image']}|{c['status']}|{c['name']}|{c['ports']}" for c in self.containers
+            ), []
+        if subcommand == 'images':
+            return 0, (
+                f"{i['repository']}:{i['tag']}|{i['id']}|{i['size']}" for i in self.images
+            ), []
+        if subcommand == 'build':
+            return 0, [], self._build_output()
+        if subcommand == 'logs':
+            count = self.log_lines
+            if '--tail' in options:
+                count = min(count, int(options[options.index('--tail') + 1]))
+            first = self.log_lines - count
+            return 0, (
+                f"2024-01-01T00:00:{n % 60:02d}Z INFO request {n} handled in {n % 97} ms"
+                for n in range(first, self.log_lines)
+            ), []
+        if subcommand in ('stop', 'restart'):
+            return self._find_container(options[-1] if options else '')
+        if subcommand == 'rm':
+            code, out, err = self._find_container(options[-1] if options else '')
+            if code == 0:
+                self.containers = [c for c in self.containers if options[-1] not in (c['id'], c['name'])]
+            return code, out, err
+        if subcommand == 'run':
+            container_id = f"{len(self.containers) + 1:064x}"
+            self.containers.append({
+                'id': container_id[:12], 'image': options[-1] if options else '',
+                'status': 'Up 1 second', 'name': f"fake_{len(self.containers)}", 'ports': '',
+            })
+            return 0, [container_id], []
+        return 0, [], []
+        
+    def _find_container(self, container_id):
+        for container in self.containers:
+            if container_id in (container['id'], container['name']):
+                return 0, [container_id], []
+        return 1, [], [f"Error response from daemon: No such container: {container_id}"]
+        
+    def _build_output(self):
+        """BuildKit-style progress lines"""
+        for step in range(1, self.build_steps + 1):
+            yield f"#{step} [{step}/{self.build_steps}] RUN step-{step}"
+            for line in range(self.build_lines_per_step):
+                yield f"#{step} {line * 0.01:.3f} building layer {step}: {line} of {self.build_lines_per_step}"
+            yield f"#{step} DONE 0.{step % 10}s"
+        yield f"#{self.build_steps + 1} writing image sha256:{'0' * 64} done"
+
+def _chain(first, second):
+    yield from first
+    yield from second
+
+class FakeCommandRunner(CommandRunner):
+    """
+    CommandRunner that executes commands against a FakeBackend
+    
+    Only process creation is replaced. Scheduling, caching, single-flight,
+    output buffering, streaming callbacks, cancellation and metrics all run
+    through the regular CommandRunner code, so timings reflect everything
+    DevTerm does except the cost of the real tools.
+    """
+    
+    def __init__(self, backend=None):
+        super().__init__()
+        self.backend = backend or FakeBackend()
+        
+    def _execute(self, cmd, cwd, timeout, on_output, capture_limit, cancel_token=None, capture_bytes=None):
+        """Produce the backend's output as if a process had printed it"""
+        if cancel_token is not None and cancel_token.cancelled:
+            return CommandResult(False, "", "Command cancelled", cancelled=True)
+            
+        latency = self.backend.latency_for(self.scheduler.tool_name(cmd))
+        if latency:
+            if cancel_token is not None:
+                cancel_token.wait(latency)
+            else:
+                time.sleep(latency)
+                
+        returncode, stdout_lines, stderr_lines = self.backend.run(cmd, cwd)
+        
+        if capture_limit is None and capture_bytes is None and on_output is not None:
+            capture_limit = self.STREAMING_CAPTURE_LIMIT
+        stdout_buffer = self._make_buffer(capture_limit, capture_bytes)
+        stderr_buffer = self._make_buffer(capture_limit, capture_bytes)
+        deadline = time.monotonic() + timeout
+        aborted = None
+        
+        try:
+            for buffer, lines in ((stdout_buffer, stdout_lines), (stderr_buffer, stderr_lines)):
+                for line in lines:
+                    if cancel_token is not None and cancel_token.cancelled:
+                        break
+                    buffer.append(line)
+                    if on_output is not None:
+                        on_output(line)
+                if time.monotonic() > deadline:
+                    return CommandResult(False, "", f"Command timed out after {timeout} seconds", timed_out=True)
+        except Exception as e:
+            aborted = e
+            
+        cancelled = cancel_token is not None and cancel_token.cancelled
+        error = stderr_buffer.text()
+        if cancelled:
+            error = "Command cancelled"
+        elif aborted is not None:
+            error = f"Command aborted: {aborted}"
+            
+        return CommandResult(
+            returncode == 0 and aborted is None and not cancelled,
+            stdout_buffer.text(),
+            error,
+            returncode=returncode,
+            stdout=stdout_buffer,
+            stderr=stderr_buffer,
+            cancelled=cancelled
+        )
+        
+    def check_command_available(self, command):
+        return command in ('git', 'docker')
+        
+    def get_tool_info(self, command):
+        if not self.check_command_available(command):
+            return ToolInfo(command, None)
+        return ToolInfo(command, f"<fake {command}>", f"{command} version 0.0.0 (fake)")
\ No newline at end of file
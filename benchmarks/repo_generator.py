@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Synthetic large-repository generator
+
+Builds reproducible local git repositories with a configurable number of
+commits, files, branches, tags and untracked files, plus bare "remotes" on
+the local filesystem, so clone, push and fetch can be exercised offline:
+    
+    python benchmarks/repo_generator.py /tmp/bigrepo --branches 10000 --files 50000
+
+creates /tmp/bigrepo/work (the working repository, with origin and any
+extra remotes configured and fetched) and /tmp/bigrepo/remotes/<name>.git.
+History is written in one `git fast-import` pass and all content and
+timestamps are derived from the seed, so the same arguments always yield
+the same commit IDs.
+"""
+
+import argparse
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+AUTHOR = "DevTerm Bench <bench@devterm.invalid>"
+EPOCH = 1700000000  # Fixed commit timestamps keep object IDs reproducible
+
+class RepoSpec:
+    """Shape of a generated repository"""
+    
+    def __init__(self, commits=100, files=1000, files_per_commit=5, branches=100, tags=10,
+                 untracked=0, remotes=1, file_size=200, seed=0):
+        self.commits = max(1, commits)
+        self.files = max(1, files)
+        self.files_per_commit = files_per_commit
+        self.branches = branches
+        self.tags = tags
+        self.untracked = untracked
+        self.remotes = remotes
+        self.file_size = file_size
+        self.seed = seed
+        
+    def __repr__(self):
+        fields = ', '.join(f"{key}={value}" for key, value in vars(self).items())
+        return f"RepoSpec({fields})"
+
+class GeneratedRepo:
+    """Paths of a generated repository and its remotes"""
+    
+    def __init__(self, root, work, remotes):
+        self.root = Path(root)
+        self.work = Path(work)
+        self.remotes = remotes
+        
+    @property
+    def origin(self):
+        """Path of the bare origin repository, or None without remotes"""
+        return self.remotes.get('origin')
+
+def _fast_import(cwd, chunks):
+    """Feed a fast-import stream to git without holding it all in memory"""
+    process = subprocess.Popen(
+        ['git', 'fast-import', '--quiet'], cwd=cwd,
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        for chunk in chunks:
+            process.stdin.write(chunk)
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    error = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"git fast-import failed: {error.decode(errors='replace').strip()}")
+        
+def _git(args, cwd):
+    """Run git, raising with its error output on failure"""
+    result = subprocess.run(
+        ['git'] + args, cwd=cwd,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout.decode(errors='replace')
+
+def _file_path(index):
+    """Path of the index-th tracked file, spread over nested directories"""
+    return f"src/module_{index % 97:02d}/pkg_{index % 13:02d}/file_{index:06d}.txt"
+
+def _content(rng, index, revision, size):
+    """Deterministic text content of one file revision"""
+    body = rng.randbytes(max(1, size // 2)).hex()
+    return f"file {index} revision {revision}\n{body}\n".encode()
+
+def _fast_import_stream(spec, rng):
+    """
+    Yield the fast-import commands for the whole history
+    
+    Marks :1 to :commits are the commits on main in order; branches and
+    tags point at randomly chosen ones.
+    """
+    for number in range(1, spec.commits + 1):
+        timestamp = EPOCH + number * 60
+        message = f"Commit {number}\n".encode()
+        yield f"commit refs/heads/main\nmark :{number}\n".encode()
+        yield f"committer {AUTHOR} {timestamp} +0000\n".encode()
+        yield f"data {len(message)}\n".encode() + message
+        if number > 1:
+            yield f"from :{number - 1}\n".encode()
+            
+        if number == 1:
+            changed = range(spec.files)
+        else:
+            changed = sorted({rng.randrange(spec.files) for _ in range(spec.files_per_commit)})
+        for index in changed:
+            data = _content(rng, index, number, spec.file_size)
+            yield f"M 100644 inline {_file_path(index)}\n".encode()
+            yield f"data {len(data)}\n".encode() + data
+        yield b"\n"
+        
+    prefixes = ['feature', 'bugfix', 'release', 'chore', 'user/dev']
+    for number in range(spec.branches):
+        target = rng.randint(1, spec.commits)
+        yield f"reset refs/heads/{rng.choice(prefixes)}/branch-{number:06d}\nfrom :{target}\n\n".encode()
+        
+    for number in range(spec.tags):
+        target = max(1, spec.commits - number * max(1, spec.commits // max(1, spec.tags)))
+        yield f"reset refs/tags/v{number // 100}.{number % 100}.0\nfrom :{target}\n\n".encode()
+
+def generate_repository(root, spec=None, progress=None):
+    """
+    Create a synthetic repository with local bare remotes
+    
+    Args:
+        root (str): Directory to create; must not exist yet
+        spec (RepoSpec): Shape of the repository
+        progress (callable): Optional callback receiving status messages
+        
+    Returns:
+        GeneratedRepo: paths of the working repository and remotes
+    """
+    spec = spec or RepoSpec()
+    report = progress or (lambda message: None)
+    root = Path(root)
+    if root.exists():
+        raise FileExistsError(f"{root} already exists")
+    work = root / 'work'
+    work.mkdir(parents=True)
+    rng = random.Random(spec.seed)
+    
+    report(f"Writing history ({spec.commits} commits, {spec.files} files, {spec.branches} branches)...")
+    _git(['init', '--quiet', '--initial-branch=main'], work)
+    _git(['config', 'user.name', 'DevTerm Bench'], work)
+    _git(['config', 'user.email', 'bench@devterm.invalid'], work)
+    _fast_import(work, _fast_import_stream(spec, rng))
+    
+    report("Checking out working tree...")
+    _git(['reset', '--hard', '--quiet', 'main'], work)
+    
+    remotes = {}
+    names = ['origin'] + [f"mirror{number}" for number in range(1, spec.remotes)]
+    for name in names[:spec.remotes]:
+        report(f"Creating bare remote {name}...")
+        path = root / 'remotes' / f"{name}.git"
+        path.parent.mkdir(exist_ok=True)
+        _git(['clone', '--bare', '--quiet', '--no-local', str(work), str(path)], root)
+        _git(['remote', 'add', name, str(path)], work)
+        _git(['fetch', '--quiet', name], work)
+        remotes[name] = path
+    if 'origin' in remotes:
+        _git(['branch', '--quiet', '--set-upstream-to=origin/main', 'main'], work)
+        
+    if spec.untracked:
+        report(f"Writing {spec.untracked} untracked files...")
+        for index in range(spec.untracked):
+            path = work / 'untracked' / f"dir_{index % 50:02d}" / f"new_{index:06d}.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(_content(rng, index, 0, spec.file_size))
+            
+    return GeneratedRepo(root, work, remotes)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic git repository for benchmarks")
+    parser.add_argument('root', help="Directory to create")
+    parser.add_argument('--commits', type=int, default=100)
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--files-per-commit', type=int, default=5)
+    parser.add_argument('--branches', type=int, default=100)
+    parser.add_argument('--tags', type=int, default=10)
+    parser.add_argument('--untracked', type=int, default=0)
+    parser.add_argument('--remotes', type=int, default=1, help="Number of local bare remotes")
+    parser.add_argument('--file-size', type=int, default=200, help="Approximate bytes per file")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    spec = RepoSpec(
+        commits=args.commits, files=args.files, files_per_commit=args.files_per_commit,
+        branches=args.branches, tags=args.tags, untracked=args.untracked, remotes=args.remotes,
+        file_size=args.file_size, seed=args.seed
+    )
+    started = time.perf_counter()
+    try:
+        repo = generate_repository(args.root, spec, progress=lambda message: print(message, file=sys.stderr))
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+        
+    print(f"✅ Generated {repo.work} in {time.perf_counter() - started:.1f}s")
+    for name, path in repo.remotes.items():
+        print(f"   remote {name}: {path}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+DevTerm benchmark suite
+
+Measures end-to-end latency of Git and Docker tab workflows, from the
+button handler until the last completion slot has updated the UI, against
+the deterministic fake backend (benchmarks/fake_backend.py). No git installation,
+docker daemon or network is needed, and every run sees identical data, so
+results can be compared between commits:
+    
+    python benchmarks/run_benchmarks.py --output before.json
+    (change something)
+    python benchmarks/run_benchmarks.py --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6 import __version__ as pyside_version
+from PySide6.QtWidgets import QApplication, QTextEdit
+
+from core.docker_operations import DockerOperations
+from core.git_operations import GitOperations
+from core.result_cache import result_cache
+from ui.docker_tab import DockerTab
+from ui.git_tab import GitTab
+
+from fake_backend import FakeBackend, FakeCommandRunner
+from repo_generator import RepoSpec, generate_repository
+
+FAKE_REPO = str(project_root)
+
+# Full-size and --quick scales of every scenario
+SCALES = {
+    'full': {'branches': 10000, 'containers': 1000, 'build_steps': 100, 'build_lines_per_step': 100,
+             'log_lines': 1000000, 'repo_files': 20000, 'repo_commits': 300},
+    'quick': {'branches': 1000, 'containers': 100, 'build_steps': 20, 'build_lines_per_step': 50,
+              'log_lines': 50000, 'repo_files': 2000, 'repo_commits': 50},
+}
+
+def wait_until_idle(*runners, timeout=600):
+    """Process GUI events until no background work is pending"""
+    deadline = time.monotonic() + timeout
+    while any(runner.active_count() for runner in runners):
+        if time.monotonic() > deadline:
+            raise TimeoutError("benchmark scenario did not finish")
+        QApplication.processEvents()
+        time.sleep(0.001)
+    QApplication.processEvents()
+
+def run_checked(tab, start, handle_name):
+    """
+    Start a tab action and wait for it, failing the scenario if it fails
+    
+    A failing git command would otherwise be timed like a normal run.
+    
+    Args:
+        tab: Tab whose action to run
+        start (callable): The action's button handler
+        handle_name (str): Tab attribute holding the action's CommandHandle
+    """
+    start()
+    handle = getattr(tab, handle_name)
+    if handle is None:
+        raise RuntimeError(f"{start.__name__} did not start")
+    outcome = []
+    handle.finished.connect(outcome.append)
+    wait_until_idle(tab.async_runner)
+    if not outcome:
+        raise RuntimeError(f"{start.__name__} did not finish")
+    success, _output, error = outcome[0]
+    if not success:
+        raise RuntimeError(f"{start.__name__} failed: {error.strip()}")
+
+def make_git_tab(backend):
+    # The fake repository's refs only exist in the backend, so git must be "run"
+    tab = GitTab(QTextEdit(), git_ops=GitOperations(FakeCommandRunner(backend), read_refs=False))
+    tab.workdir_input.setText(FAKE_REPO)
+    wait_until_idle(tab.async_runner)
+    return tab
+
+def make_docker_tab(backend):
+    tab = DockerTab(QTextEdit(), docker_ops=DockerOperations(FakeCommandRunner(backend)))
+    wait_until_idle(tab.async_runner)
+    return tab
+
+def bench_refresh_branches(scale):
+    """GitTab.refresh_branches with scale['branches'] local and remote branches"""
+    tab = make_git_tab(FakeBackend(branches=scale['branches']))
+    
+    def run():
+        tab.refresh_branches()
+        wait_until_idle(tab.async_runner)
+        assert tab.branch_picker.model.total_count() >= scale['branches']
+    return run
+
+def bench_refresh_containers(scale):
+    """DockerTab.refresh_containers with scale['containers'] running containers"""
+    tab = make_docker_tab(FakeBackend(containers=scale['containers']))
+    
+    def run():
+        tab.refresh_containers()
+        wait_until_idle(tab.async_runner)
+        assert tab.container_list.count() == scale['containers']
+    return run
+
+def bench_build_image(scale):
+    """DockerTab.build_image streaming build_steps x build_lines_per_step lines"""
+    tab = make_docker_tab(FakeBackend(
+        build_steps=scale['build_steps'], build_lines_per_step=scale['build_lines_per_step']
+    ))
+    tab.image_name_input.setText('bench:latest')
+    tab.dockerfile_input.setText(FAKE_REPO)
+    
+    def run():
+        tab.build_image()
+        wait_until_idle(tab.async_runner)
+    return run
+
+def bench_view_logs(scale):
+    """DockerTab.view_logs (last 50 lines) of a container with log_lines lines"""
+    tab = make_docker_tab(FakeBackend(containers=1, log_lines=scale['log_lines']))
+    tab.refresh_containers()
+    wait_until_idle(tab.async_runner)
+    tab.container_list.setCurrentRow(0)
+    
+    def run():
+        tab.view_logs()
+        wait_until_idle(tab.async_runner)
+    return run
+
+def bench_stream_logs(scale):
+    """All log_lines lines of docker logs streamed into the console"""
+    tab = make_docker_tab(FakeBackend(containers=1, log_lines=scale['log_lines']))
+    container_id = tab.docker_ops.runner.backend.containers[0]['id']
+    
+    def run():
+        handle = tab.async_runner.submit_streaming(tab.docker_ops.get_container_logs, container_id)
+        handle.output.connect(tab.log_output)
+        wait_until_idle(tab.async_runner)
+    return run
+
+_generated_repo = None
+
+def generated_repo(scale):
+    """Synthetic repository with a local bare origin, created once per run"""
+    global _generated_repo
+    if _generated_repo is None:
+        workspace = tempfile.mkdtemp(prefix='devterm-bench-')
+        spec = RepoSpec(commits=scale['repo_commits'], files=scale['repo_files'],
+                        branches=scale['branches'], tags=100)
+        _generated_repo = generate_repository(
+            os.path.join(workspace, 'repo'), spec, progress=lambda message: print(message, file=sys.stderr)
+        )
+    return _generated_repo
+
+def bench_git_refresh_branches(scale):
+    """GitTab.refresh_branches on a generated repository using real git"""
+    tab = GitTab(QTextEdit())
+    tab.workdir_input.setText(str(generated_repo(scale).work))
+    wait_until_idle(tab.async_runner)
+    
+    def run():
+        tab.refresh_branches()
+        wait_until_idle(tab.async_runner)
+        assert tab.branch_picker.model.total_count() >= scale['branches']
+    return run
+
+def bench_git_clone(scale):
+    """GitTab.clone_repository of the generated repository's local bare origin"""
+    repo = generated_repo(scale)
+    tab = GitTab(QTextEdit())
+    tab.url_input.setText(str(repo.origin))
+    wait_until_idle(tab.async_runner)
+    
+    def run():
+        tab.folder_input.setText(tempfile.mkdtemp(dir=repo.root, prefix='clone-'))
+        run_checked(tab, tab.clone_repository, 'clone_handle')
+    return run
+
+def bench_git_commit_and_push(scale):
+    """GitTab.commit_and_push of a one-file change to the local bare origin"""
+    repo = generated_repo(scale)
+    tab = GitTab(QTextEdit())
+    tab.workdir_input.setText(str(repo.work))
+    wait_until_idle(tab.async_runner)
+    counter = [0]
+    
+    def run():
+        counter[0] += 1
+        (repo.work / 'BENCHMARK.txt').write_text(f"iteration {counter[0]}\n")
+        tab.commit_msg_input.setText(f"Benchmark commit {counter[0]}")
+        run_checked(tab, tab.commit_and_push, 'commit_handle')
+    return run
+
+SCENARIOS = {
+    'refresh_branches': bench_refresh_branches,
+    'refresh_containers': bench_refresh_containers,
+    'build_image': bench_build_image,
+    'view_logs': bench_view_logs,
+    'stream_logs': bench_stream_logs,
+}
+
+# Scenarios using the real git executable on a generated repository (--real-git)
+REAL_GIT_SCENARIOS = {
+    'git_refresh_branches': bench_git_refresh_branches,
+    'git_clone': bench_git_clone,
+    'git_commit_and_push': bench_git_commit_and_push,
+}
+
+def run_scenario(name, scale, repeat, warmup):
+    """Run one scenario; returns its timing summary"""
+    run = {**SCENARIOS, **REAL_GIT_SCENARIOS}[name](scale)
+    samples = []
+    for iteration in range(warmup + repeat):
+        # Every iteration must do the full work, not hit cached results
+        result_cache.clear()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        if iteration >= warmup:
+            samples.append(elapsed)
+    return {
+        'samples': samples,
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+def git_revision():
+    """Commit the benchmark ran against, if available"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+            capture_output=True, text=True, timeout=10
+        )
+        revision = result.stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=project_root,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+        return f"{revision}-dirty" if revision and dirty else revision or None
+    except Exception:
+        return None
+
+def print_results(results, baseline=None):
+    """Print a table of medians, with the change against a baseline"""
+    header = f"{'scenario':<20} {'median':>10} {'min':>10} {'max':>10}"
+    if baseline:
+        header += f" {'baseline':>10} {'change':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, summary in results['scenarios'].items():
+        line = (f"{name:<20} {summary['median'] * 1000:>8.1f}ms {summary['min'] * 1000:>8.1f}ms "
+                f"{summary['max'] * 1000:>8.1f}ms")
+        previous = (baseline or {}).get('scenarios', {}).get(name)
+        if previous:
+            change = (summary['median'] - previous['median']) / previous['median'] * 100
+            line += f" {previous['median'] * 1000:>8.1f}ms {change:>+7.1f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="DevTerm end-to-end benchmarks on a fake backend")
+    parser.add_argument('--only', nargs='+', choices=sorted({**SCENARIOS, **REAL_GIT_SCENARIOS}),
+                        help="Scenarios to run")
+    parser.add_argument('--real-git', action='store_true',
+                        help="Also run git scenarios on a generated repository with local bare remotes")
+    parser.add_argument('--repeat', type=int, default=5, help="Measured iterations per scenario")
+    parser.add_argument('--warmup', type=int, default=1, help="Unmeasured iterations per scenario")
+    parser.add_argument('--quick', action='store_true', help="Use smaller data sets")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', help="Baseline JSON file from an earlier run")
+    args = parser.parse_args()
+    
+    app = QApplication.instance() or QApplication(sys.argv)
+    
+    scale_name = 'quick' if args.quick else 'full'
+    scale = SCALES[scale_name]
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != scale:
+            print("⚠️ Baseline was recorded with a different scale; changes are not comparable")
+            
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'pyside': pyside_version,
+        'platform': platform.platform(),
+        'scale_name': scale_name,
+        'scale': scale,
+        'repeat': args.repeat,
+        'scenarios': {},
+    }
+    names = args.only or list(SCENARIOS) + (list(REAL_GIT_SCENARIOS) if args.real_git else [])
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        results['scenarios'][name] = run_scenario(name, scale, args.repeat, args.warmup)
+        
+    if _generated_repo is not None:
+        shutil.rmtree(_generated_repo.root.parent, ignore_errors=True)
+        
+    print_results(results, baseline)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
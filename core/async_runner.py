@@ -0,0 +1,219 @@
+"""
+Asynchronous command execution on top of Qt's thread pool
+"""
+
+import threading
+import time
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from .cancellation import CancellationToken, CommandCancelled, cancellation_scope
+from .command_runner import CommandResult, CommandRunner
+from .metrics import command_metrics
+from .tracing import tracer
+from .scheduler import BACKGROUND, INTERACTIVE, priority_scope
+
+class CommandHandle(QObject):
+    """
+    Handle for work running in the background.
+    
+    All public signals are emitted on the thread that owns the handle
+    (normally the GUI thread), so connected slots and lambdas may touch
+    widgets directly.
+    """
+    
+    finished = Signal(object)
+    output = Signal(list)
+    
+    # Internal signals emitted from the worker thread
+    _done = Signal(object)
+    _output_ready = Signal()
+    
+    # Lines allowed to wait for the GUI before the command is throttled
+    MAX_PENDING_LINES = 2000
+    
+    def __init__(self, description="", parent=None):
+        super().__init__(parent)
+        self.description = description
+        self.result = None
+        self.is_finished = False
+        self.cancel_token = CancellationToken()
+        self.submitted_at = None
+        self._completed_at = None
+        self._pending_lines = []
+        self._output_scheduled = False
+        self._pending_lock = threading.Lock()
+        self._pending_room = threading.Condition(self._pending_lock)
+        self._done.connect(self._on_done)
+        self._output_ready.connect(self._on_output_ready)
+        
+    def cancel(self):
+        """
+        Cancel the work behind this handle
+        
+        Running commands have their process group terminated and queued
+        ones are withdrawn; finished still fires, with a result whose
+        cancelled attribute is set.
+        """
+        self.cancel_token.cancel()
+        
+    @property
+    def is_cancelled(self):
+        return self.cancel_token.cancelled
+        
+    def emit_line(self, line):
+        """
+        Queue one output line for the output signal
+        
+        Called from the worker thread. Lines arriving while the GUI is busy
+        are coalesced into a single batch; once MAX_PENDING_LINES are
+        waiting, the caller blocks until the GUI catches up.
+        """
+        with self._pending_lock:
+            while len(self._pending_lines) >= self.MAX_PENDING_LINES:
+                if not self._pending_room.wait(timeout=5):
+                    break  # GUI is not draining; don't deadlock the worker
+            self._pending_lines.append(line)
+            if self._output_scheduled:
+                return
+            self._output_scheduled = True
+        self._output_ready.emit()
+        
+    @Slot()
+    def _on_output_ready(self):
+        """Deliver all pending lines as one batch"""
+        with self._pending_lock:
+            lines = self._pending_lines
+            self._pending_lines = []
+            self._output_scheduled = False
+            self._pending_room.notify_all()
+        if lines:
+            with tracer.span(f"output: {self.description}", 'slot', lines=len(lines)):
+                self.output.emit(lines)
+            
+    @Slot(object)
+    def _on_done(self, result):
+        """Publish the result on the handle's own thread"""
+        if self.submitted_at is not None:
+            now = time.perf_counter()
+            command_metrics.record_task(
+                self.description, now - self.submitted_at, now - (self._completed_at or now)
+            )
+        self.result = result
+        self.is_finished = True
+        with tracer.span(f"finished: {self.description}", 'slot'):
+            self.finished.emit(result)
+
+class _BackgroundTask(QRunnable):
+    """Runnable executing a single callable for a CommandHandle"""
+    
+    def __init__(self, handle, func, args, kwargs, priority=INTERACTIVE):
+        super().__init__()
+        self.handle = handle
+        self.priority = priority
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        
+    def run(self):
+        try:
+            self.handle.cancel_token.raise_if_cancelled()
+            with priority_scope(self.priority), cancellation_scope(self.handle.cancel_token), \
+                    tracer.span(f"task: {self.handle.description}", 'task'):
+                result = self.func(*self.args, **self.kwargs)
+        except CommandCancelled:
+            result = CommandResult(False, "", "Command cancelled", cancelled=True)
+        except Exception as e:
+            result = CommandResult(False, "", f"Unexpected error: {str(e)}")
+            
+        self.handle._completed_at = time.perf_counter()
+        self.handle._done.emit(result)
+
+def _describe(func):
+    """Name used for a task in handles and metrics"""
+    # Pipelines carry their own description; their bound run() is not telling
+    owner = getattr(func, '__self__', None)
+    return getattr(owner, 'description', None) or getattr(func, '__name__', '')
+
+class AsyncCommandRunner:
+    """Runs commands and operations off the GUI thread"""
+    
+    def __init__(self, runner=None, thread_pool=None):
+        self.runner = runner or CommandRunner()
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._active = set()
+        
+    def run_command(self, cmd, cwd=None, timeout=300):
+        """
+        Run a shell command in the background
+        
+        Args:
+            cmd (list): Command and arguments as list
+            cwd (str): Working directory for command
+            timeout (int): Timeout in seconds
+            
+        Returns:
+            CommandHandle: handle whose finished signal carries
+                (success: bool, output: str, error: str)
+        """
+        return self.submit(self.runner.run_command, cmd, cwd=cwd, timeout=timeout)
+        
+    def submit(self, func, *args, **kwargs):
+        """
+        Run an arbitrary callable in the background
+        
+        Args:
+            func (callable): Callable to execute, usually a GitOperations or
+                DockerOperations method returning (success, output, error)
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            CommandHandle: handle whose finished signal carries func's result
+        """
+        handle = CommandHandle(_describe(func))
+        return self._start(handle, func, args, kwargs)
+        
+    def submit_background(self, func, *args, **kwargs):
+        """
+        Like submit, but for refreshes the user did not ask for directly
+        
+        Commands started by func run at BACKGROUND priority, so queued
+        interactive actions are scheduled ahead of them.
+        """
+        handle = CommandHandle(_describe(func))
+        return self._start(handle, func, args, kwargs, priority=BACKGROUND)
+        
+    def submit_streaming(self, func, *args, **kwargs):
+        """
+        Run a callable that accepts an on_output callback in the background
+        
+        Output lines reported through on_output are delivered in batches
+        via the handle's output signal while the work is still running.
+        
+        Returns:
+            CommandHandle: handle with live output and finished signals
+        """
+        handle = CommandHandle(_describe(func))
+        kwargs['on_output'] = handle.emit_line
+        return self._start(handle, func, args, kwargs)
+        
+    def _start(self, handle, func, args, kwargs, priority=INTERACTIVE):
+        """Queue func on the thread pool on behalf of handle"""
+        # Keep the handle alive until its result has been delivered
+        self._active.add(handle)
+        handle.finished.connect(lambda _result, h=handle: self._active.discard(h))
+        
+        handle.submitted_at = time.perf_counter()
+        task = _BackgroundTask(handle, func, args, kwargs, priority)
+        self.thread_pool.start(task, 1 if priority == INTERACTIVE else 0)
+        return handle
+        
+    def cancel_all(self):
+        """Cancel every handle that has not finished yet"""
+        for handle in list(self._active):
+            handle.cancel()
+            
+    def active_count(self):
+        """Number of handles still waiting for a result"""
+        return len(self._active)
\ No newline at end of file
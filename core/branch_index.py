@@ -0,0 +1,154 @@
+"""
+Searchable index of branches for the branch picker
+"""
+
+import re
+from collections import namedtuple
+
+# name is the branch name without the remote ('feature/x'); remote is None
+# for local branches; committed is the commit time as a Unix timestamp
+BranchRef = namedtuple('BranchRef', 'name remote refname committed is_head')
+
+# Fields separated by NUL so any branch name can be parsed back
+FOR_EACH_REF_FORMAT = '%(HEAD)%00%(refname)%00%(committerdate:unix)%00%(symref)'
+
+def parse_ref_line(line):
+    """
+    Parse one line of `git for-each-ref --format=FOR_EACH_REF_FORMAT`
+    
+    Returns:
+        BranchRef: the branch, or None for symbolic refs such as origin/HEAD
+            and unrecognised lines
+    """
+    parts = line.split('\0')
+    if len(parts) != 4 or parts[3]:
+        return None
+    head, refname, committed = parts[0], parts[1], parts[2]
+    
+    if refname.startswith('refs/heads/'):
+        name, remote = refname[len('refs/heads/'):], None
+    elif refname.startswith('refs/remotes/'):
+        remote, _, name = refname[len('refs/remotes/'):].partition('/')
+        if not name:
+            return None
+    else:
+        return None
+    try:
+        committed = int(committed)
+    except ValueError:
+        committed = 0
+    return BranchRef(name, remote, refname, committed, head.strip() == '*')
+
+def display_name(branch):
+    """'origin/feature/x' for remote branches, 'feature/x' for local ones"""
+    return f"{branch.remote}/{branch.name}" if branch.remote else branch.name
+
+def _char_mask(text):
+    """Bit set of the characters in text, for cheap rejection of non-matches"""
+    mask = 0
+    for char in set(text):
+        mask |= 1 << (ord(char) & 63)
+    return mask
+
+class BranchIndex:
+    """
+    Branches in arrival order with incremental fuzzy search
+    
+    A query matches a branch when its characters appear in order in the
+    branch's display name, ignoring case. Each branch carries a character
+    bit set (computed on the first search), so most non-matches are rejected without running the matcher,
+    and the candidates of the previous query are reused while the user
+    keeps typing, so each keystroke only re-examines the previous matches.
+    Results list prefix matches first, then substring matches, then other
+    fuzzy matches, each group in index order (most recent commit first when
+    fed from `for-each-ref --sort=-committerdate`).
+    """
+    
+    def __init__(self):
+        self.branches = []
+        self._keys = []
+        self._masks = []
+        self._names = {}
+        self._last_query = ''
+        self._last_candidates = None
+        
+    def __len__(self):
+        return len(self.branches)
+        
+    def clear(self):
+        self.branches.clear()
+        self._keys.clear()
+        self._masks.clear()
+        self._names.clear()
+        self._last_query = ''
+        self._last_candidates = None
+        
+    def add(self, branches):
+        """
+        Append branches
+        
+        Returns:
+            list: rows of the added branches matching the current query
+        """
+        start = len(self.branches)
+        for branch in branches:
+            key = display_name(branch).lower()
+            self._names.setdefault(key, len(self.branches))
+            self.branches.append(branch)
+            self._keys.append(key)
+            
+        added = range(start, len(self.branches))
+        if not self._last_query:
+            return list(added)
+        matches = self._match(self._last_query, added)
+        if self._last_candidates is not None:
+            self._last_candidates.extend(matches)
+        return self._rank(self._last_query, matches)
+        
+    def find(self, name):
+        """Row of the branch with this display name, or None"""
+        return self._names.get(name.lower())
+        
+    def search(self, query):
+        """
+        Rows matching query, best first
+        
+        Args:
+            query (str): Text typed into the picker; empty matches everything
+            
+        Returns:
+            list: row numbers into self.branches
+        """
+        query = query.strip().lower()
+        if not query:
+            self._last_query, self._last_candidates = '', None
+            return list(range(len(self.branches)))
+            
+        if self._last_candidates is not None and query.startswith(self._last_query):
+            candidates = self._last_candidates  # Narrowing the previous search
+        else:
+            candidates = range(len(self.branches))
+        matches = self._match(query, candidates)
+        self._last_query, self._last_candidates = query, matches
+        return self._rank(query, matches)
+        
+    def _match(self, query, rows):
+        keys, masks = self._keys, self._masks
+        if len(masks) < len(keys):
+            masks.extend(_char_mask(key) for key in keys[len(masks):])
+        mask = _char_mask(query)
+        matcher = re.compile('.*?'.join(re.escape(char) for char in query)).search
+        return [row for row in rows if masks[row] & mask == mask and matcher(keys[row])]
+        
+    def _rank(self, query, rows):
+        keys = self._keys
+        prefix, substring, fuzzy = [], [], []
+        for row in rows:
+            key = keys[row]
+            if key.startswith(query) or ('/' + query) in key:
+                prefix.append(row)
+            elif query in key:
+                substring.append(row)
+            else:
+                fuzzy.append(row)
+        return prefix + substring + fuzzy
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Cooperative cancellation of running commands
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+
+class CommandCancelled(Exception):
+    """Raised when work is abandoned because its token was cancelled"""
+
+class CancellationToken:
+    """
+    Flag shared between the party that may cancel and the running work
+    
+    Callbacks registered with add_callback run (on the cancelling thread)
+    as soon as cancel() is called, which lets the command runner kill a
+    process group immediately instead of polling.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+        
+    def cancel(self):
+        """Request cancellation and notify registered callbacks"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks)
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+                
+    def add_callback(self, callback):
+        """
+        Call callback on cancellation (immediately if already cancelled)
+        
+        Returns:
+            callable: function that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+        
+    def _remove_callback(self, callback):
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+                
+    def raise_if_cancelled(self):
+        """Raise CommandCancelled if cancellation was requested"""
+        if self.cancelled:
+            raise CommandCancelled()
+            
+    def wait(self, timeout=None):
+        """Block until cancelled or timeout; returns True if cancelled"""
+        return self._event.wait(timeout)
+
+_current_token = contextvars.ContextVar('devterm_cancel_token', default=None)
+
+def current_token():
+    """Token governing commands started from the current context, or None"""
+    return _current_token.get()
+
+@contextmanager
+def cancellation_scope(token):
+    """Make commands started inside the block cancellable through token"""
+    previous = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(previous)
\ No newline at end of file
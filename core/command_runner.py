@@ -2,17 +2,267 @@
 Command runner utility for executing shell commands
 """
 
+import collections
+import contextvars
+import mmap
+import os
+import queue
+import signal
 import subprocess
 import sys
+import threading
+import tempfile
+import time
 from pathlib import Path
 
+from .cancellation import CancellationToken, CommandCancelled, current_token
+from .metrics import command_metrics
+from .tracing import tracer
+from .result_cache import result_cache
+from .scheduler import command_scheduler
+from .single_flight import command_flights
+from .tool_resolver import tool_resolver
+
+class OutputBuffer:
+    """
+    Capture of one output stream with optional bounds
+    
+    Without limits every line is kept in memory. With head_lines and
+    tail_lines set, only the first head_lines and the most recent tail_lines
+    lines stay in memory; lines pushed out of the tail ring are written to a
+    temporary spill file. Peak memory is therefore flat no matter how much a
+    command prints, and the complete output can still be read back through
+    iter_lines() or memory-mapped with open_spill().
+    
+    With max_bytes set instead, lines are kept from the start until they
+    add up to max_bytes once encoded (counting one byte per newline);
+    everything after is spilled.
+    """
+    
+    def __init__(self, head_lines=None, tail_lines=None, spill=True, encoding='utf-8', max_bytes=None):
+        self.head_lines = head_lines
+        self.tail_lines = tail_lines
+        self.max_bytes = max_bytes
+        self.spill = spill
+        self.encoding = encoding
+        self.total_lines = 0
+        self.total_bytes = 0
+        self.spilled_lines = 0
+        self._head = []
+        self._tail = collections.deque(maxlen=tail_lines) if head_lines is not None or tail_lines is not None else None
+        self._spill_file = None
+        
+    @property
+    def is_bounded(self):
+        """True if the buffer limits how much it keeps in memory"""
+        return self.head_lines is not None or self.tail_lines is not None or self.max_bytes is not None
+        
+    def append(self, line):
+        """Add one line (without its trailing newline)"""
+        self.total_lines += 1
+        self.total_bytes += len(line.encode(self.encoding, errors='replace')) + 1
+        
+        if self.max_bytes is not None:
+            if self.total_bytes <= self.max_bytes and not self.spilled_lines:
+                self._head.append(line)
+            else:
+                self._spill_line(line)
+            return
+            
+        if self.head_lines is None and self.tail_lines is None:
+            self._head.append(line)
+            return
+            
+        if len(self._head) < (self.head_lines or 0):
+            self._head.append(line)
+            return
+            
+        if self._tail.maxlen == 0:
+            self._spill_line(line)
+            return
+            
+        if len(self._tail) == self._tail.maxlen:
+            self._spill_line(self._tail[0])
+        self._tail.append(line)
+        
+    def _spill_line(self, line):
+        """Move a line out of memory into the spill file"""
+        self.spilled_lines += 1
+        if not self.spill:
+            return
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(prefix='devterm-output-')
+        self._spill_file.write(line.encode(self.encoding, errors='replace') + b'\n')
+        
+    def text(self):
+        """
+        Output as one string
+        
+        For bounded buffers the spilled middle section is replaced by a
+        single marker line.
+        """
+        if not self.spilled_lines:
+            lines = self._head + list(self._tail or ())
+        else:
+            lines = self._head + [f"... {self.spilled_lines} lines omitted ..."] + list(self._tail or ())
+        return '\n'.join(lines).strip()
+        
+    def head(self):
+        """Lines kept in memory from the start of the output"""
+        return list(self._head)
+        
+    def iter_lines(self):
+        """Iterate over the complete output, including any spilled lines"""
+        yield from self._head
+        if self._spill_file is not None:
+            self._spill_file.flush()
+            self._spill_file.seek(0)
+            for raw in self._spill_file:
+                yield raw.decode(self.encoding, errors='replace').rstrip('\n')
+            self._spill_file.seek(0, os.SEEK_END)
+        yield from self._tail or ()
+        
+    def open_spill(self):
+        """
+        Memory-map the spilled middle section of the output
+        
+        Returns:
+            mmap.mmap: read-only map of the spill file, or None if nothing
+                was spilled to disk
+        """
+        if self._spill_file is None:
+            return None
+        self._spill_file.flush()
+        return mmap.mmap(self._spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+    def close(self):
+        """Release the spill file"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+class CommandResult(tuple):
+    """
+    Result of CommandRunner.run_command
+    
+    Unpacks like the classic (success, output, error) tuple and carries the
+    exit code, the underlying OutputBuffer objects and whether the command
+    was cancelled or timed out as attributes.
+    """
+    
+    def __new__(cls, success, output, error, returncode=None, stdout=None, stderr=None,
+                cancelled=False, timed_out=False):
+        result = super().__new__(cls, (success, output, error))
+        result.returncode = returncode
+        result.stdout = stdout
+        result.stderr = stderr
+        result.cancelled = cancelled
+        result.timed_out = timed_out
+        return result
+        
+    @property
+    def success(self):
+        return self[0]
+        
+    @property
+    def output(self):
+        return self[1]
+        
+    @property
+    def error(self):
+        return self[2]
+
+class CommandStream:
+    """
+    Iterator over the output lines of a running command
+    
+    Lines from stdout and stderr are yielded as soon as the command prints
+    them. The reader blocks while max_pending lines are waiting, so a slow
+    consumer throttles the command instead of letting output pile up in
+    memory. Once iteration is over, ``result`` holds the usual
+    (success, output, error) tuple.
+    """
+    
+    _END = object()
+    
+    def __init__(self, runner, cmd, cwd=None, timeout=300, max_pending=1000):
+        self.result = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = threading.Event()
+        self._token = CancellationToken()
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(
+            target=context.run,
+            args=(self._produce, runner, cmd, cwd, timeout),
+            daemon=True
+        )
+        self._thread.start()
+        
+    def _produce(self, runner, cmd, cwd, timeout):
+        """Run the command, feeding its lines into the queue"""
+        try:
+            self.result = runner.run_command(
+                cmd, cwd=cwd, timeout=timeout, on_output=self._put, cancel_token=self._token
+            )
+        finally:
+            self._put(self._END, closing=True)
+            
+    def _put(self, item, closing=False):
+        """Hand an item to the consumer, waiting while the queue is full"""
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        if not closing:
+            raise RuntimeError("Output stream closed by consumer")
+            
+    def __iter__(self):
+        return self
+        
+    def __next__(self):
+        if self._closed.is_set():
+            raise StopIteration
+        item = self._queue.get()
+        if item is self._END:
+            self._closed.set()
+            self._thread.join()
+            raise StopIteration
+        return item
+        
+    def close(self):
+        """Stop consuming; the command is terminated if still running"""
+        self._closed.set()
+        self._token.cancel()
+        self._thread.join()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 class CommandRunner:
     """Utility class for running shell commands safely"""
     
+    # Lines of each stream kept in memory when output is streamed to a callback
+    STREAMING_CAPTURE_LIMIT = 2000
+    
+    # Seconds a cancelled process group gets to exit before it is killed
+    TERMINATE_GRACE = 3
+    
     def __init__(self):
         self.encoding = 'utf-8'
+        self.tools = tool_resolver
+        self.cache = result_cache
+        self.flights = command_flights
+        self.scheduler = command_scheduler
+        self.metrics = command_metrics
+        self.tracer = tracer
         
-    def run_command(self, cmd, cwd=None, timeout=300):
+    def run_command(self, cmd, cwd=None, timeout=300, on_output=None, capture_limit=None,
+                    cache_ttl=None, resource=None, exclusive=False, cancel_token=None, capture_bytes=None):
         """
         Run a shell command and return success status, output, and error
         
@@ -20,69 +270,317 @@ class CommandRunner:
             cmd (list): Command and arguments as list
             cwd (str): Working directory for command
             timeout (int): Timeout in seconds
+            on_output (callable): Optional callback receiving each line of
+                stdout/stderr as it is produced. It runs on a reader thread;
+                blocking in it throttles the command. If it raises, the
+                command is terminated.
+            capture_limit (int): Number of lines of each stream to keep in
+                memory (half from the start, half from the end); the rest is
+                spilled to a temporary file. Unlimited by default, or
+                STREAMING_CAPTURE_LIMIT when on_output is given.
+            capture_bytes (int): Instead of capture_limit, keep only the
+                first capture_bytes bytes (encoded) of each stream in
+                memory; long lines are read in pieces so that a single huge
+                line is never held whole either
+            cache_ttl (float): For read-only commands, seconds a successful
+                result may be served from the shared result cache. Concurrent
+                identical read-only commands also share a single process.
+            resource (str): Resource the command works on (a repository
+                path); the scheduler serializes exclusive commands on it
+            exclusive (bool): True if the command mutates resource
+            cancel_token (CancellationToken): Token that terminates the
+                command's whole process group when cancelled; defaults to
+                the token of the current cancellation_scope
             
         Returns:
-            tuple: (success: bool, output: str, error: str)
+            CommandResult: (success: bool, output: str, error: str); its
+                cancelled attribute is set if the token fired
+        """
+        tool = self.scheduler.tool_name(cmd)
+        if cancel_token is None:
+            cancel_token = current_token()
+            
+        def schedule():
+            queued = time.perf_counter()
+            try:
+                with self.scheduler.slot(tool, resource=resource, exclusive=exclusive,
+                                         cancel_token=cancel_token):
+                    started = time.perf_counter()
+                    result = self._execute(
+                        cmd, cwd, timeout, on_output, capture_limit, cancel_token, capture_bytes=capture_bytes
+                    )
+                    duration = time.perf_counter() - started
+                    self.metrics.record_command(cmd, result, duration, queued=started - queued)
+                    if self.tracer.enabled:
+                        self._trace(cmd, cwd, result, queued, started, duration)
+                    return result
+            except CommandCancelled:
+                return CommandResult(False, "", "Command cancelled", cancelled=True)
+                
+        if not cache_ttl:
+            return schedule()
+            
+        cached = self.cache.get(cmd, cwd)
+        if cached is not None:
+            self.metrics.record_cache_hit(cmd)
+            return cached
+            
+        def execute():
+            generation = self.cache.generation
+            result = schedule()
+            if result.success:
+                self.cache.put(cmd, cwd, result, cache_ttl, generation=generation)
+            return result
+            
+        if on_output is not None:
+            return execute()
+            
+        # Identical read-only queries already running share that process
+        result = self.flights.do(self.cache.make_key(cmd, cwd), execute)
+        if result.cancelled and not (cancel_token and cancel_token.cancelled):
+            # The shared run was cancelled by another caller, not by us
+            result = execute()
+        return result
+        
+    def _trace(self, cmd, cwd, result, queued, started, duration):
+        """Record the scheduler wait and the process run as trace spans"""
+        name = ' '.join(str(arg) for arg in cmd[:3])
+        if started - queued > 0.001:
+            self.tracer.complete(f"queued: {name}", 'scheduler', queued, started - queued)
+        self.tracer.complete(name, 'subprocess', started, duration, {
+            'cmd': ' '.join(str(arg) for arg in cmd),
+            'cwd': cwd,
+            'returncode': getattr(result, 'returncode', None),
+            'timed_out': getattr(result, 'timed_out', False),
+            'cancelled': getattr(result, 'cancelled', False),
+        })
+        
+    def invalidate_cache(self, tool=None, cwd=None):
         """
+        Drop cached read-only results after a mutating command
+        
+        Args:
+            tool (str): Only drop results of this executable (e.g. 'git')
+            cwd (str): Only drop results obtained in this directory
+        """
+        self.cache.invalidate(tool=tool, cwd=cwd)
+        
+    def _execute(self, cmd, cwd, timeout, on_output, capture_limit, cancel_token=None, capture_bytes=None):
+        """Spawn the command and collect its output"""
+        if cancel_token is not None and cancel_token.cancelled:
+            return CommandResult(False, "", "Command cancelled", cancelled=True)
+            
         try:
             # Ensure cwd exists if provided
             if cwd and not Path(cwd).exists():
-                return False, "", f"Directory does not exist: {cwd}"
+                return CommandResult(False, "", f"Directory does not exist: {cwd}")
                 
-            # Run the command
-            result = subprocess.run(
+            # Start the command in its own process group so that cancelling
+            # also stops the helpers it spawns (ssh, credential helpers, ...)
+            if sys.platform.startswith('win'):
+                group_args = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+            else:
+                group_args = {'start_new_session': True}
+            process = subprocess.Popen(
                 cmd,
                 cwd=cwd,
-                capture_output=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
                 encoding=self.encoding,
-                timeout=timeout,
-                shell=sys.platform.startswith('win')  # Use shell on Windows
+                errors='replace',
+                shell=sys.platform.startswith('win'),  # Use shell on Windows
+                **group_args
             )
             
-            # Return results
-            success = result.returncode == 0
-            output = result.stdout.strip() if result.stdout else ""
-            error = result.stderr.strip() if result.stderr else ""
+        except FileNotFoundError:
+            cmd_name = cmd[0] if cmd else "unknown"
+            return CommandResult(False, "", f"Command not found: {cmd_name}. Make sure it's installed and in PATH.")
             
-            return success, output, error
+        except Exception as e:
+            return CommandResult(False, "", f"Unexpected error: {str(e)}")
             
-        except subprocess.TimeoutExpired:
-            return False, "", f"Command timed out after {timeout} seconds"
+        if capture_limit is None and capture_bytes is None and on_output is not None:
+            capture_limit = self.STREAMING_CAPTURE_LIMIT
+        stdout_buffer = self._make_buffer(capture_limit, capture_bytes)
+        stderr_buffer = self._make_buffer(capture_limit, capture_bytes)
+        aborted = []
+        readers = [
+            threading.Thread(
+                target=self._read_stream,
+                args=(process, process.stdout, stdout_buffer, on_output, aborted),
+                daemon=True
+            ),
+            threading.Thread(
+                target=self._read_stream,
+                args=(process, process.stderr, stderr_buffer, on_output, aborted),
+                daemon=True
+            )
+        ]
+        for reader in readers:
+            reader.start()
             
-        except FileNotFoundError:
-            cmd_name = cmd[0] if cmd else "unknown"
-            return False, "", f"Command not found: {cmd_name}. Make sure it's installed and in PATH."
+        unregister = None
+        if cancel_token is not None:
+            unregister = cancel_token.add_callback(lambda: self._terminate(process))
+            
+        try:
+            # Wait for both pipes to reach EOF, then for the exit status
+            deadline = time.monotonic() + timeout
+            for reader in readers:
+                reader.join(max(0, deadline - time.monotonic()))
+            if any(reader.is_alive() for reader in readers):
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            returncode = process.wait(timeout=max(0, deadline - time.monotonic()))
+            
+        except subprocess.TimeoutExpired:
+            self._kill(process, readers)
+            return CommandResult(False, "", f"Command timed out after {timeout} seconds", timed_out=True)
             
         except Exception as e:
-            return False, "", f"Unexpected error: {str(e)}"
+            self._kill(process, readers)
+            return CommandResult(False, "", f"Unexpected error: {str(e)}")
             
-    def check_command_available(self, command):
+        finally:
+            if unregister is not None:
+                unregister()
+                
+        # Return results
+        output = stdout_buffer.text()
+        error = stderr_buffer.text()
+        cancelled = cancel_token is not None and cancel_token.cancelled
+        if cancelled:
+            error = "Command cancelled"
+        elif aborted:
+            error = f"Command aborted: {aborted[0]}"
+            
+        return CommandResult(
+            returncode == 0 and not aborted and not cancelled,
+            output,
+            error,
+            returncode=returncode,
+            stdout=stdout_buffer,
+            stderr=stderr_buffer,
+            cancelled=cancelled
+        )
+        
+    def stream_command(self, cmd, cwd=None, timeout=300, max_pending=1000):
         """
-        Check if a command is available in the system PATH
+        Run a shell command and iterate over its output as it is produced
         
         Args:
-            command (str): Command to check
+            cmd (list): Command and arguments as list
+            cwd (str): Working directory for command
+            timeout (int): Timeout in seconds
+            max_pending (int): Lines buffered before the command is throttled
             
         Returns:
-            bool: True if command is available
+            CommandStream: iterator of output lines; its result attribute
+                holds (success, output, error) once exhausted
         """
+        return CommandStream(self, cmd, cwd=cwd, timeout=timeout, max_pending=max_pending)
+        
+    def _make_buffer(self, capture_limit, capture_bytes=None):
+        """Create the OutputBuffer for one stream"""
+        if capture_bytes is not None:
+            return OutputBuffer(encoding=self.encoding, max_bytes=capture_bytes)
+        if capture_limit is None:
+            return OutputBuffer(encoding=self.encoding)
+        head = capture_limit // 2
+        return OutputBuffer(head_lines=head, tail_lines=capture_limit - head, encoding=self.encoding)
+        
+    def _read_stream(self, process, pipe, buffer, on_output, aborted):
+        """Collect lines from one pipe, forwarding them to on_output"""
+        # With a byte bound, read at most that many characters at once (a
+        # few times that in bytes): a single huge line must not be read into
+        # memory whole either. append() counts the encoded bytes.
+        if buffer.max_bytes is not None:
+            size = buffer.max_bytes + 1
+            lines = iter(lambda: pipe.readline(size), '')
+        else:
+            lines = pipe
+        try:
+            for line in lines:
+                line = line.rstrip('\n')
+                buffer.append(line)
+                if on_output and not aborted:
+                    try:
+                        on_output(line)
+                    except Exception as e:
+                        aborted.append(str(e))
+                        self._kill_group(process)
+        except (OSError, ValueError):
+            # Pipe closed underneath us after a kill
+            pass
+        finally:
+            pipe.close()
+            
+    def _terminate(self, process):
+        """Ask a process group to exit, killing it if it does not comply"""
+        if process.poll() is not None:
+            return
+        if sys.platform.startswith('win'):
+            self._kill_group(process)
+            return
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except OSError:
+            return
+        timer = threading.Timer(self.TERMINATE_GRACE, self._kill_group, args=(process,))
+        timer.daemon = True
+        timer.start()
+        
+    def _kill_group(self, process):
+        """Forcefully kill a process and the rest of its process group"""
         try:
             if sys.platform.startswith('win'):
-                # Windows
-                result = subprocess.run(
-                    ['where', command],
-                    capture_output=True,
-                    shell=True
-                )
-            else:
-                # Unix-like systems
-                result = subprocess.run(
-                    ['which', command],
+                subprocess.run(
+                    ['taskkill', '/F', '/T', '/PID', str(process.pid)],
                     capture_output=True
                 )
-                
-            return result.returncode == 0
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        try:
+            process.kill()
+        except OSError:
+            pass
             
+    def _kill(self, process, readers):
+        """Terminate a process and release its reader threads"""
+        self._kill_group(process)
+        try:
+            process.wait(timeout=5)
         except Exception:
-            return False
\ No newline at end of file
+            pass
+        for reader in readers:
+            reader.join(1)
+            
+    def check_command_available(self, command):
+        """
+        Check if a command is available in the system PATH
+        
+        Resolution is done in-process and memoized per PATH value, so repeated
+        checks do not spawn which/where.
+        
+        Args:
+            command (str): Command to check
+            
+        Returns:
+            bool: True if command is available
+        """
+        return self.tools.is_available(command)
+        
+    def get_tool_info(self, command):
+        """
+        Get the resolved path and version of a command
+        
+        Args:
+            command (str): Command to look up
+            
+        Returns:
+            ToolInfo: path is None if the command is not available
+        """
+        return self.tools.info(command)
\ No newline at end of file
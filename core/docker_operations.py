@@ -3,18 +3,34 @@ Docker operations wrapper
 """
 
 from .command_runner import CommandRunner
+from .pipeline import Pipeline
 
 class DockerOperations:
     """Docker operations handler"""
     
-    def __init__(self):
-        self.runner = CommandRunner()
-        
+    # Seconds read-only query results may be reused
+    CONTAINER_CACHE_TTL = 2.0
+    IMAGE_CACHE_TTL = 5.0
+    
+    def __init__(self, runner=None):
+        self.runner = runner or CommandRunner()
+        
+    def _run_mutating(self, cmd, **kwargs):
+        """Run a command that changes daemon state and drop stale cached reads"""
+        try:
+            return self.runner.run_command(cmd, **kwargs)
+        finally:
+            self.runner.invalidate_cache(tool='docker')
+            
     def is_docker_available(self):
         """Check if docker is available in system PATH"""
         return self.runner.check_command_available('docker')
         
-    def build_image(self, image_name, dockerfile_path, build_args=None):
+    def get_tool_info(self):
+        """Get the resolved docker executable and its version"""
+        return self.runner.get_tool_info('docker')
+        
+    def build_image(self, image_name, dockerfile_path, build_args=None, extra_args=None, on_output=None):
         """
         Build a Docker image
         
@@ -22,6 +38,8 @@ class DockerOperations:
             image_name (str): Name and tag for the image
             dockerfile_path (str): Path to Dockerfile or build context
             build_args (dict): Build arguments
+            extra_args (list): Additional raw options for docker build
+            on_output (callable): Optional callback receiving build output live
             
         Returns:
             tuple: (success: bool, output: str, error: str)
@@ -32,11 +50,15 @@ class DockerOperations:
             for key, value in build_args.items():
                 cmd.extend(['--build-arg', f'{key}={value}'])
                 
+        if extra_args:
+            cmd.extend(extra_args)
+            
         cmd.append(dockerfile_path)
         
-        return self.runner.run_command(cmd, timeout=600)  # 10 minute timeout for builds
+        # 10 minute timeout for builds
+        return self._run_mutating(cmd, timeout=600, on_output=on_output)
         
-    def run_container(self, image, ports=None, environment=None, name=None, detached=True):
+    def run_container(self, image, ports=None, environment=None, name=None, detached=True, extra_args=None):
         """
         Run a Docker container
         
@@ -46,6 +68,7 @@ class DockerOperations:
             environment (dict): Environment variables
             name (str): Container name
             detached (bool): Run in detached mode
+            extra_args (list): Additional raw options for docker run
             
         Returns:
             tuple: (success: bool, output: str, error: str)
@@ -66,9 +89,12 @@ class DockerOperations:
         if name:
             cmd.extend(['--name', name])
             
+        if extra_args:
+            cmd.extend(extra_args)
+            
         cmd.append(image)
         
-        return self.runner.run_command(cmd)
+        return self._run_mutating(cmd)
         
     def list_containers(self, all_containers=False):
         """List Docker containers"""
@@ -77,11 +103,15 @@ class DockerOperations:
             cmd.append('-a')
         cmd.extend(['--format', '{{.ID}}|{{.Image}}|{{.Status}}|{{.Names}}|{{.Ports}}'])
         
-        return self.runner.run_command(cmd)
+        return self.runner.run_command(cmd, cache_ttl=self.CONTAINER_CACHE_TTL)
         
     def stop_container(self, container_id):
         """Stop a running container"""
-        return self.runner.run_command(['docker', 'stop', container_id])
+        return self._run_mutating(['docker', 'stop', container_id])
+        
+    def restart_container(self, container_id):
+        """Restart a container"""
+        return self._run_mutating(['docker', 'restart', container_id])
         
     def remove_container(self, container_id, force=False):
         """Remove a container"""
@@ -90,23 +120,55 @@ class DockerOperations:
             cmd.append('-f')
         cmd.append(container_id)
         
-        return self.runner.run_command(cmd)
+        return self._run_mutating(cmd)
+        
+    def stop_containers_pipeline(self, container_ids):
+        """
+        Build a pipeline stopping several containers in parallel
+        
+        A container that fails to stop does not prevent the others from
+        being stopped.
+        
+        Returns:
+            Pipeline: one 'stop <id>' step per container
+        """
+        pipeline = Pipeline("stop containers", fail_fast=False)
+        for container_id in container_ids:
+            pipeline.add(f'stop {container_id}', self.stop_container, container_id)
+        return pipeline
+        
+    def remove_containers_pipeline(self, container_ids):
+        """
+        Build a pipeline stopping and then removing containers
+        
+        Each container is removed as soon as its own stop finished; the
+        stop may fail (e.g. the container already exited) without
+        preventing the removal.
+        
+        Returns:
+            Pipeline: 'stop <id>' and 'rm <id>' steps per container
+        """
+        pipeline = Pipeline("remove containers", fail_fast=False)
+        for container_id in container_ids:
+            stop = pipeline.add(f'stop {container_id}', self.stop_container, container_id, optional=True)
+            pipeline.add(f'rm {container_id}', self.remove_container, container_id, after=[stop])
+        return pipeline
         
-    def get_container_logs(self, container_id, tail=None):
+    def get_container_logs(self, container_id, tail=None, on_output=None):
         """Get container logs"""
         cmd = ['docker', 'logs']
         if tail:
             cmd.extend(['--tail', str(tail)])
         cmd.append(container_id)
         
-        return self.runner.run_command(cmd)
+        return self.runner.run_command(cmd, on_output=on_output)
         
     def list_images(self):
         """List Docker images"""
         return self.runner.run_command([
             'docker', 'images', 
             '--format', '{{.Repository}}:{{.Tag}}|{{.ID}}|{{.Size}}'
-        ])
+        ], cache_ttl=self.IMAGE_CACHE_TTL)
         
     def remove_image(self, image_id, force=False):
         """Remove a Docker image"""
@@ -115,7 +177,7 @@ class DockerOperations:
             cmd.append('-f')
         cmd.append(image_id)
         
-        return self.runner.run_command(cmd)
+        return self._run_mutating(cmd)
         
     def get_docker_info(self):
         """Get Docker system information"""
@@ -0,0 +1,107 @@
+"""
+Diff file lists and size-limited per-file diffs
+"""
+
+from collections import OrderedDict, namedtuple
+
+# One file of a diff. added and deleted are line counts, None when unknown
+# (untracked files); binary files have no line counts; orig_path is set
+# for renames and copies.
+DiffFile = namedtuple('DiffFile', 'path orig_path added deleted binary untracked')
+
+# The diff of one file as shown: text is the (possibly cut) diff output
+FileDiff = namedtuple('FileDiff', 'text truncated binary')
+
+# `git diff --no-index` compares against this to show a new file
+NULL_PATH = '/dev/null'
+
+# Tree with no files (SHA-1), to diff against before the first commit
+EMPTY_TREE = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+
+def parse_numstat(output):
+    """
+    Parse `git diff --numstat -z` output
+    
+    Each record is 'added<TAB>deleted<TAB>path', NUL-terminated; for renames
+    the path field is empty and the source and destination follow as two
+    more NUL-terminated fields. Binary files report '-' for both counts.
+    
+    Returns:
+        list: DiffFile per changed file, in git's order
+    """
+    fields = output.split('\0')
+    files = []
+    index = 0
+    count = len(fields)
+    while index < count:
+        record = fields[index]
+        index += 1
+        if not record:
+            continue
+        parts = record.split('\t', 2)
+        if len(parts) != 3:
+            continue
+        added, deleted, path = parts
+        orig_path = None
+        if not path:
+            orig_path = fields[index] if index < count else None
+            path = fields[index + 1] if index + 1 < count else ''
+            index += 2
+        binary = added == '-' and deleted == '-'
+        files.append(DiffFile(
+            path,
+            orig_path,
+            None if binary else int(added),
+            None if binary else int(deleted),
+            binary,
+            False
+        ))
+    return files
+
+def is_binary_diff(text):
+    """Whether diff output describes a binary file instead of showing hunks"""
+    for line in text.splitlines()[:8]:
+        if line.startswith('Binary files ') or line == 'GIT binary patch':
+            return True
+    return False
+
+class DiffCache:
+    """
+    Least recently used cache of file diffs bounded by total text size
+    
+    Args:
+        max_chars (int): Characters of diff text kept across all entries
+    """
+    
+    def __init__(self, max_chars=8 * 1024 * 1024):
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._size = 0
+        
+    def __len__(self):
+        return len(self._entries)
+        
+    def get(self, key):
+        """Cached FileDiff, or None; marks the entry as used"""
+        diff = self._entries.get(key)
+        if diff is not None:
+            self._entries.move_to_end(key)
+        return diff
+        
+    def put(self, key, diff):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous.text)
+        self._entries[key] = diff
+        self._size += len(diff.text)
+        while self._size > self.max_chars and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.text)
+            
+    def size(self):
+        """Characters of diff text cached"""
+        return self._size
+        
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Paged reading of commit history
+"""
+
+from collections import OrderedDict, namedtuple
+
+# parents is a tuple of full hashes; timestamp is the author time as a Unix timestamp
+CommitRecord = namedtuple('CommitRecord', 'oid short parents author email timestamp subject')
+
+# With -z, git ends every record with NUL as well, so the output is a flat
+# sequence of HISTORY_FIELDS NUL-terminated fields per commit
+HISTORY_FORMAT = '%H%x00%h%x00%P%x00%an%x00%ae%x00%at%x00%s'
+HISTORY_FIELDS = 7
+
+def parse_log(output):
+    """
+    Parse `git log -z --format=HISTORY_FORMAT` output
+    
+    Returns:
+        list: CommitRecord per commit, newest first
+    """
+    fields = output.split('\0')
+    if fields and not fields[-1]:
+        fields.pop()
+    records = []
+    for start in range(0, len(fields) - HISTORY_FIELDS + 1, HISTORY_FIELDS):
+        oid, short, parents, author, email, timestamp, subject = fields[start:start + HISTORY_FIELDS]
+        try:
+            timestamp = int(timestamp)
+        except ValueError:
+            timestamp = 0
+        records.append(CommitRecord(
+            oid, short, tuple(parents.split()), author, email, timestamp, subject
+        ))
+    return records
+
+class OidIndex:
+    """
+    Every commit of a history, in `git log` order, as packed binary hashes
+    
+    Filled one line at a time from `git rev-list`, it lets any page be
+    read with `git log --no-walk` on exactly its commits instead of walking
+    past all newer ones with --skip. Hashes take 20 bytes each (32 for
+    SHA-256), a few tens of megabytes for millions of commits.
+    """
+    
+    def __init__(self, packed=b'', width=20):
+        self._packed = bytearray(packed)
+        self.width = width
+        
+    def append(self, line):
+        """
+        Add one line of `git rev-list` output
+        
+        Returns:
+            bool: False if the line is not a full hex hash and was skipped
+        """
+        if len(line) not in (40, 64):
+            return False
+        try:
+            raw = bytes.fromhex(line)
+        except ValueError:
+            return False
+        if not self._packed:
+            self.width = len(raw)
+        elif len(raw) != self.width:
+            return False
+        self._packed += raw
+        return True
+        
+    def __len__(self):
+        return len(self._packed) // self.width
+        
+    def page(self, page, page_size):
+        """Hex hashes of the commits on a page, newest first"""
+        width = self.width
+        packed = self._packed[page * page_size * width:(page + 1) * page_size * width]
+        return [packed[start:start + width].hex() for start in range(0, len(packed), width)]
+
+class PageCache:
+    """
+    Least recently used cache of history pages
+    
+    Only max_pages pages of page_size commits are kept, so memory stays
+    bounded however far the user scrolls; evicted pages are simply read
+    again when they come back into view.
+    """
+    
+    def __init__(self, page_size=200, max_pages=50):
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        
+    def __len__(self):
+        return len(self._pages)
+        
+    def __contains__(self, page):
+        return page in self._pages
+        
+    def get(self, page):
+        """Records of a page, or None if not cached; marks the page as used"""
+        records = self._pages.get(page)
+        if records is not None:
+            self._pages.move_to_end(page)
+        return records
+        
+    def put(self, page, records):
+        """
+        Cache a page
+        
+        Returns:
+            list: page numbers evicted to make room
+        """
+        self._pages[page] = records
+        self._pages.move_to_end(page)
+        evicted = []
+        while len(self._pages) > self.max_pages:
+            evicted.append(self._pages.popitem(last=False)[0])
+        return evicted
+        
+    def record(self, row):
+        """CommitRecord at a history row, or None if its page is not cached"""
+        records = self.get(row // self.page_size)
+        if records is None:
+            return None
+        offset = row % self.page_size
+        return records[offset] if offset < len(records) else None
+        
+    def clear(self):
+        self._pages.clear()
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Repository settings and data structures that keep large repositories fast
+"""
+
+from pathlib import Path
+
+# Settings applied by GitOperations.optimize_pipeline, with what they buy
+OPTIMIZED_CONFIG = (
+    ('core.untrackedCache', 'true', "remembers which directories have no new files"),
+    ('feature.manyFiles', 'true', "index format v4, smaller and faster to load"),
+)
+
+def fsmonitor_supported(build_options):
+    """
+    Whether git has the built-in file system monitor
+    
+    Args:
+        build_options (str): Output of `git version --build-options`
+        
+    Returns:
+        bool: True if `core.fsmonitor=true` starts git's own daemon; builds
+            without it (typically Linux builds) need an
+            external hook such as Watchman instead
+    """
+    return 'fsmonitor--daemon' in build_options
+
+def parse_count_objects(output):
+    """Fields of `git count-objects -v` as a dict of ints"""
+    counts = {}
+    for line in output.splitlines():
+        key, _, value = line.partition(':')
+        try:
+            counts[key.strip()] = int(value)
+        except ValueError:
+            continue
+    return counts
+
+class RepoHealth:
+    """
+    State of the settings and data structures optimize_pipeline manages
+    
+    Args:
+        config (dict): Values of core.fsmonitor, core.untrackedCache and
+            feature.manyFiles (lower-case keys, as `git config` prints them)
+        counts (dict): Parsed `git count-objects -v`
+        objects_dir (Path): The repository's objects directory
+    """
+    
+    def __init__(self, config, counts, objects_dir):
+        self.fsmonitor = config.get('core.fsmonitor')
+        self.untracked_cache = config.get('core.untrackedcache')
+        self.many_files = config.get('feature.manyfiles')
+        self.loose_objects = counts.get('count', 0)
+        self.packs = counts.get('packs', 0)
+        
+        objects_dir = Path(objects_dir)
+        info = objects_dir / 'info'
+        self.commit_graph = (info / 'commit-graph').is_file() or (
+            info / 'commit-graphs' / 'commit-graph-chain').is_file()
+        self.multi_pack_index = (objects_dir / 'pack' / 'multi-pack-index').is_file()
+        
+    @staticmethod
+    def _enabled(value):
+        return value is not None and value.lower() not in ('false', 'no', 'off', '0', '')
+        
+    def lines(self):
+        """One line per setting, e.g. 'core.untrackedCache: true'"""
+        def flag(value):
+            return "✓" if value else "✗"
+            
+        return [
+            f"{flag(self._enabled(self.fsmonitor))} core.fsmonitor: {self.fsmonitor or 'unset'}",
+            f"{flag(self._enabled(self.untracked_cache))} core.untrackedCache: {self.untracked_cache or 'unset'}",
+            f"{flag(self._enabled(self.many_files))} feature.manyFiles: {self.many_files or 'unset'}",
+            f"{flag(self.commit_graph)} commit-graph: {'present' if self.commit_graph else 'missing'}",
+            f"{flag(self.multi_pack_index)} multi-pack-index: {'present' if self.multi_pack_index else 'missing'}",
+            f"  {self.packs} packs, {self.loose_objects} loose objects",
+        ]
+        
+    def __repr__(self):
+        return (f"RepoHealth(fsmonitor={self.fsmonitor!r}, untracked_cache={self.untracked_cache!r}, "
+                f"many_files={self.many_files!r}, commit_graph={self.commit_graph}, "
+                f"multi_pack_index={self.multi_pack_index}, packs={self.packs}, "
+                f"loose_objects={self.loose_objects})")
\ No newline at end of file
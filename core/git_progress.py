@@ -0,0 +1,61 @@
+"""
+Parsing of git's --progress output
+"""
+
+import re
+
+# "Receiving objects:  45% (450/1000), 1.20 MiB | 2.00 MiB/s"
+_PROGRESS_LINE = re.compile(r'^(?:remote: )?([A-Za-z][A-Za-z ]*?):\s+(\d{1,3})% \((\d+)/(\d+)\)')
+
+class GitProgress:
+    """
+    Turns progress lines from git clone/fetch/checkout into a percentage
+    
+    Git reports each phase separately (counting and compressing on the
+    remote, then receiving objects, resolving deltas and updating files
+    locally). The phases are mapped onto one overall 0-100 scale using
+    PHASES; the overall value never moves backwards, even when a partial
+    clone starts a second fetch for the blobs it needs during checkout.
+    """
+    
+    # Share of the overall progress as (start, end) percentages
+    PHASES = {
+        'Counting objects': (0, 2),
+        'Compressing objects': (2, 5),
+        'Receiving objects': (5, 75),
+        'Resolving deltas': (75, 90),
+        'Updating files': (90, 100),
+    }
+    
+    def __init__(self):
+        self.phase = None
+        self.percent = 0
+        self.current = 0
+        self.total = 0
+        self.overall = 0
+        
+    def feed(self, line):
+        """
+        Consume one line of git output
+        
+        Returns:
+            bool: True if the line was a progress update
+        """
+        match = _PROGRESS_LINE.match(line.strip())
+        if not match:
+            return False
+        phase, percent, current, total = match.groups()
+        self.phase = phase
+        self.percent = min(100, int(percent))
+        self.current = int(current)
+        self.total = int(total)
+        
+        start, end = self.PHASES.get(phase, (self.overall, self.overall))
+        self.overall = max(self.overall, int(start + (end - start) * self.percent / 100))
+        return True
+        
+    def describe(self):
+        """Current phase, e.g. 'Receiving objects 45% (450/1000)'"""
+        if self.phase is None:
+            return ""
+        return f"{self.phase} {self.percent}% ({self.current}/{self.total})"
\ No newline at end of file
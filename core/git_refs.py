@@ -0,0 +1,342 @@
+"""
+In-process reading of git refs
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+class RefReadError(Exception):
+    """Refs cannot be read without git (unusual layout, reftable, damaged files)"""
+
+class _FileCache:
+    """
+    Contents of small files, reread only when their stat changes
+    
+    Git rewrites refs by renaming a new file over the old one, which a
+    changed inode shows even within one timestamp tick. As git does for
+    its index ("racy git"), anything changed less than RACY_NS ago is not
+    cached at all: on file systems with coarse timestamps a second write
+    in the same tick could otherwise leave every stat field unchanged.
+    """
+    
+    RACY_NS = 2 * 1000 * 1000 * 1000  # Covers 1-2 s timestamp granularity
+    
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        
+    def read(self, path, parse=None):
+        """
+        Read (and optionally parse) a file, reusing the previous result if unchanged
+        
+        Returns:
+            object: parsed contents, or None if the file does not exist
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise RefReadError(f"Cannot stat {path}: {e}") from e
+            
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+            
+        try:
+            with open(path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise RefReadError(f"Cannot read {path}: {e}") from e
+        value = parse(text) if parse else text
+        
+        if not self._is_racy(stat):
+            with self._lock:
+                self._entries[path] = (key, value)
+        return value
+        
+    def _is_racy(self, stat):
+        """Whether a change in the same timestamp tick could still go unnoticed"""
+        return time.time_ns() - max(stat.st_mtime_ns, stat.st_ctime_ns) < self.RACY_NS
+        
+    def scan_refs(self, directory, prefix):
+        """
+        Loose refs below a directory as {refname: value}
+        
+        A directory's listing and ref files are only reread when the
+        directory's stat changes. Git replaces ref files by renaming a lock
+        file over them, which always touches the directory; directories
+        touched too recently to tell are not cached.
+        """
+        refs = {}
+        pending = [(directory, prefix)]
+        while pending:
+            path, name_prefix = pending.pop()
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                raise RefReadError(f"Cannot stat {path}: {e}") from e
+                
+            key = ('dir', stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns)
+            cache_key = ('scan', path)
+            with self._lock:
+                entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == key:
+                files, subdirs = entry[1]
+            else:
+                files, subdirs = self._list_directory(path)
+                if not self._is_racy(stat):
+                    with self._lock:
+                        self._entries[cache_key] = (key, (files, subdirs))
+                    
+            for name, value in files.items():
+                refs[name_prefix + name] = value
+            for name in subdirs:
+                pending.append((os.path.join(path, name), f"{name_prefix}{name}/"))
+        return refs
+        
+    @staticmethod
+    def _list_directory(path):
+        """Read every ref file of one directory"""
+        files = {}
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        subdirs.append(entry.name)
+                    elif not entry.name.endswith('.lock'):
+                        with open(entry.path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+                            value = f.read().strip()
+                        if value:
+                            files[entry.name] = value
+        except OSError as e:
+            raise RefReadError(f"Cannot read refs in {path}: {e}") from e
+        return files, subdirs
+        
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def _parse_packed_refs(text):
+    """{refname: oid} from a packed-refs file; peeled '^' lines are skipped"""
+    refs = {}
+    for line in text.splitlines():
+        if not line or line[0] in '#^':
+            continue
+        oid, _, name = line.partition(' ')
+        if name:
+            refs[name] = oid
+    return refs
+
+def _read_pointer(text):
+    """Contents of a .git file or commondir file, without the 'gitdir: ' prefix"""
+    text = text.strip()
+    if text.startswith('gitdir:'):
+        text = text[len('gitdir:'):].strip()
+    return text
+
+class RefStore:
+    """
+    Refs of one repository, read from its git directory
+    
+    Understands symbolic refs, loose and packed refs and linked worktrees
+    (HEAD comes from the worktree's git directory, refs from the common
+    one). Anything else, such as reftable repositories, raises RefReadError
+    so callers can fall back to running git.
+    
+    Args:
+        git_dir (Path): Git directory holding HEAD
+        common_dir (Path): Directory holding refs and packed-refs
+        files (_FileCache): Cache shared between stores
+    """
+    
+    MAX_SYMREF_DEPTH = 5
+    
+    def __init__(self, git_dir, common_dir, files):
+        self.git_dir = Path(git_dir)
+        self.common_dir = Path(common_dir)
+        self._files = files
+        
+        if (self.common_dir / 'reftable').is_dir():
+            raise RefReadError("reftable ref storage is not supported")
+            
+    def _ref_path(self, name):
+        # HEAD and other pseudo refs are per worktree
+        base = self.common_dir if name.startswith('refs/') else self.git_dir
+        return os.path.join(base, *name.split('/'))
+        
+    def packed_refs(self):
+        """{refname: oid} from packed-refs"""
+        return self._files.read(os.path.join(self.common_dir, 'packed-refs'), _parse_packed_refs) or {}
+        
+    def read_ref(self, name):
+        """
+        Raw value of one ref
+        
+        Returns:
+            str: 'ref: <target>' for symbolic refs, the object ID otherwise,
+                or None if the ref does not exist
+        """
+        value = self._files.read(self._ref_path(name), str.strip)
+        if value:
+            return value
+        if name.startswith('refs/'):
+            return self.packed_refs().get(name)
+        return None
+        
+    def resolve(self, name):
+        """
+        Follow symbolic refs to the object ID
+        
+        Returns:
+            tuple: (refname, oid) of the final ref; oid is None for a branch
+                without commits yet
+        """
+        for _ in range(self.MAX_SYMREF_DEPTH):
+            value = self.read_ref(name)
+            if value is None:
+                return name, None
+            if not value.startswith('ref:'):
+                return name, value
+            name = value[4:].strip()
+        raise RefReadError(f"Symbolic ref loop at {name}")
+        
+    def head(self):
+        """
+        Current branch and commit
+        
+        Returns:
+            tuple: (branch, oid); branch is None for a detached HEAD
+        """
+        value = self.read_ref('HEAD')
+        if value is None:
+            raise RefReadError(f"No HEAD in {self.git_dir}")
+        if not value.startswith('ref:'):
+            return None, value
+        refname, oid = self.resolve('HEAD')
+        if not refname.startswith('refs/heads/'):
+            raise RefReadError(f"HEAD points outside refs/heads: {refname}")
+        return refname[len('refs/heads/'):], oid
+        
+    def refs(self, prefix='refs/'):
+        """
+        All refs below prefix, loose refs overriding packed ones
+        
+        Returns:
+            dict: {refname: raw value} sorted by refname
+        """
+        refs = {name: oid for name, oid in self.packed_refs().items() if name.startswith(prefix)}
+        directory = os.path.join(self.common_dir, *prefix.rstrip('/').split('/'))
+        refs.update(self._files.scan_refs(directory, prefix))
+        return dict(sorted(refs.items()))
+        
+    def branches(self):
+        """Names of local branches, sorted"""
+        return [name[len('refs/heads/'):] for name in self.refs('refs/heads/')]
+        
+    def remote_branches(self):
+        """
+        Remote-tracking branches
+        
+        Returns:
+            list: (name, target) pairs such as ('origin/main', None) or
+                ('origin/HEAD', 'origin/main') for symbolic refs, sorted by name
+        """
+        branches = []
+        for refname, value in self.refs('refs/remotes/').items():
+            name = refname[len('refs/remotes/'):]
+            target = None
+            if value.startswith('ref:'):
+                target = value[4:].strip()
+                if target.startswith('refs/remotes/'):
+                    target = target[len('refs/remotes/'):]
+            branches.append((name, target))
+        return branches
+
+_files = _FileCache()
+
+def find_git_dirs(path):
+    """
+    Locate the git directory and common directory for a working tree path
+    
+    Args:
+        path (str): Any directory inside a working tree, or a bare repository
+        
+    Returns:
+        tuple: (git_dir, common_dir) as Paths
+        
+    Raises:
+        RefReadError: if the repository cannot be located the way git would
+    """
+    if any(name in os.environ for name in ('GIT_DIR', 'GIT_COMMON_DIR', 'GIT_CEILING_DIRECTORIES')):
+        raise RefReadError("Repository discovery is overridden by the environment")
+        
+    current = Path(path).resolve()
+    if not current.is_dir():
+        raise RefReadError(f"Not a directory: {path}")
+        
+    for directory in (current, *current.parents):
+        dotgit = directory / '.git'
+        if dotgit.is_dir():
+            git_dir = dotgit
+        elif dotgit.is_file():
+            git_dir = (directory / _read_pointer(dotgit.read_text(encoding='utf-8'))).resolve()
+        elif directory == current and (directory / 'HEAD').is_file() and (directory / 'refs').is_dir():
+            git_dir = directory  # Bare repository
+        else:
+            continue
+            
+        common_dir = git_dir
+        commondir_file = git_dir / 'commondir'
+        if commondir_file.is_file():
+            common_dir = (git_dir / _read_pointer(commondir_file.read_text(encoding='utf-8'))).resolve()
+        return git_dir, common_dir
+        
+    raise RefReadError(f"Not a git repository: {path}")
+
+def open_refs(path):
+    """
+    RefStore for the repository containing path
+    
+    Raises:
+        RefReadError: if the refs cannot be read without git
+    """
+    try:
+        git_dir, common_dir = find_git_dirs(path)
+    except OSError as e:
+        raise RefReadError(str(e)) from e
+    return RefStore(git_dir, common_dir, _files)
+
+def format_branch_listing(store, include_remote=True):
+    """
+    Branches in the format of `git branch` / `git branch -a`
+    
+    Args:
+        store (RefStore): Repository refs
+        include_remote (bool): Whether to list remote-tracking branches
+        
+    Returns:
+        str: one branch per line, the current branch marked with '*'
+    """
+    current, oid = store.head()
+    lines = []
+    if current is None and oid:
+        lines.append(f"* (HEAD detached at {oid[:7]})")
+    for name in store.branches():
+        lines.append(('* ' if name == current else '  ') + name)
+    if include_remote:
+        for name, target in store.remote_branches():
+            if target:
+                lines.append(f"  remotes/{name} -> {target}")
+            else:
+                lines.append(f"  remotes/{name}")
+    return '\n'.join(lines)
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Selection and batching of paths to stage
+"""
+
+def paths_to_stage(snapshot, selected=None):
+    """
+    Paths whose working tree state is not yet in the index
+    
+    Args:
+        snapshot (RepoSnapshot): Status the selection was made from
+        selected (iterable): Paths the user chose; None means all changes
+        
+    Returns:
+        list: paths for `git add`, in snapshot order. Entries that are
+            fully staged already, and ignored files, are left out.
+    """
+    wanted = None if selected is None else set(selected)
+    paths = []
+    for entry in snapshot.entries:
+        if wanted is not None and entry.path not in wanted:
+            continue
+        if entry.kind == 'ignored':
+            continue
+        if entry.kind in ('untracked', 'unmerged') or entry.worktree != '.':
+            paths.append(entry.path)
+    return paths
+
+def chunk_paths(paths, max_count=1000, max_bytes=24 * 1024):
+    """
+    Split paths into batches that fit on one command line
+    
+    Args:
+        paths (list): Paths to split
+        max_count (int): Most paths per batch
+        max_bytes (int): Most bytes of path text per batch; the default
+            stays below Windows' 32K character command line limit
+            
+    Returns:
+        list: lists of paths
+    """
+    chunks = []
+    chunk = []
+    size = 0
+    for path in paths:
+        length = len(path.encode('utf-8', errors='surrogateescape')) + 1
+        if chunk and (len(chunk) >= max_count or size + length > max_bytes):
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(path)
+        size += length
+    if chunk:
+        chunks.append(chunk)
+    return chunks
\ No newline at end of file
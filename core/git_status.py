@@ -0,0 +1,156 @@
+"""
+Parsing of `git status --porcelain=v2 --branch -z` into a repository snapshot
+"""
+
+from collections import namedtuple
+
+# One changed path. index and worktree are the X and Y status letters
+# ('.' for unchanged); kind is 'changed', 'renamed', 'unmerged',
+# 'untracked' or 'ignored'; orig_path is only set for renames and copies.
+StatusEntry = namedtuple('StatusEntry', 'kind index worktree path orig_path')
+
+class RepoSnapshot:
+    """
+    Branch, upstream and change list of a repository at one point in time
+    
+    Produced from a single `git status --porcelain=v2 --branch -z` call and
+    shared by every view in GitTab. store, when set, is a
+    status_store.StatusStore over the same entries for views that need to
+    filter and sort very large change sets.
+    """
+    
+    __slots__ = ('oid', 'head', 'upstream', 'ahead', 'behind', 'entries', 'store')
+    
+    def __init__(self, oid=None, head=None, upstream=None, ahead=0, behind=0, entries=None):
+        self.oid = oid
+        self.head = head
+        self.upstream = upstream
+        self.ahead = ahead
+        self.behind = behind
+        self.entries = entries if entries is not None else []
+        self.store = None
+        
+    @property
+    def is_detached(self):
+        return self.head is None
+        
+    @property
+    def is_initial(self):
+        """True before the first commit"""
+        return self.oid is None
+        
+    @property
+    def is_clean(self):
+        return not self.entries
+        
+    @property
+    def staged(self):
+        """Entries with changes in the index"""
+        return [e for e in self.entries if e.kind in ('changed', 'renamed') and e.index != '.']
+        
+    @property
+    def unstaged(self):
+        """Entries with changes in the working tree"""
+        return [e for e in self.entries if e.kind in ('changed', 'renamed') and e.worktree != '.']
+        
+    @property
+    def untracked(self):
+        return [e for e in self.entries if e.kind == 'untracked']
+        
+    @property
+    def conflicted(self):
+        return [e for e in self.entries if e.kind == 'unmerged']
+        
+    def branch_label(self):
+        """Short description such as 'main ↑2 ↓1' or 'detached at 1a2b3c4'"""
+        if self.head is None:
+            return f"detached at {self.oid[:7]}" if self.oid else "detached HEAD"
+        label = self.head
+        if self.ahead:
+            label += f" ↑{self.ahead}"
+        if self.behind:
+            label += f" ↓{self.behind}"
+        return label
+        
+    def short_lines(self):
+        """Changes in the familiar `git status --short` form"""
+        lines = []
+        for entry in self.entries:
+            if entry.kind == 'untracked':
+                lines.append(f"?? {entry.path}")
+            elif entry.kind == 'ignored':
+                lines.append(f"!! {entry.path}")
+            else:
+                code = f"{entry.index}{entry.worktree}".replace('.', ' ')
+                if entry.orig_path:
+                    lines.append(f"{code} {entry.orig_path} -> {entry.path}")
+                else:
+                    lines.append(f"{code} {entry.path}")
+        return lines
+        
+    def __repr__(self):
+        return (f"RepoSnapshot(head={self.head!r}, upstream={self.upstream!r}, "
+                f"ahead={self.ahead}, behind={self.behind}, entries={len(self.entries)})")
+
+def parse_porcelain_v2(data):
+    """
+    Parse NUL-separated porcelain v2 output with branch headers
+    
+    Args:
+        data (str): Output of `git status --porcelain=v2 --branch -z`
+        
+    Returns:
+        RepoSnapshot: parsed snapshot
+    """
+    snapshot = RepoSnapshot()
+    entries = snapshot.entries
+    fields = data.split('\0')
+    index = 0
+    count = len(fields)
+    
+    while index < count:
+        record = fields[index]
+        index += 1
+        if not record:
+            continue
+            
+        kind = record[0]
+        if kind == '#':
+            _parse_header(snapshot, record)
+        elif kind == '1':
+            # 1 XY sub mH mI mW hH hI path
+            parts = record.split(' ', 8)
+            entries.append(StatusEntry('changed', parts[1][0], parts[1][1], parts[8], None))
+        elif kind == '2':
+            # 2 XY sub mH mI mW hH hI Xscore path, then origPath as its own field
+            parts = record.split(' ', 9)
+            orig_path = fields[index] if index < count else None
+            index += 1
+            entries.append(StatusEntry('renamed', parts[1][0], parts[1][1], parts[9], orig_path))
+        elif kind == 'u':
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path
+            parts = record.split(' ', 10)
+            entries.append(StatusEntry('unmerged', parts[1][0], parts[1][1], parts[10], None))
+        elif kind == '?':
+            entries.append(StatusEntry('untracked', '?', '?', record[2:], None))
+        elif kind == '!':
+            entries.append(StatusEntry('ignored', '!', '!', record[2:], None))
+            
+    return snapshot
+
+def _parse_header(snapshot, record):
+    """Apply one '# branch.*' header line to snapshot"""
+    parts = record.split(' ', 2)
+    if len(parts) < 3:
+        return
+    key, value = parts[1], parts[2]
+    if key == 'branch.oid':
+        snapshot.oid = None if value == '(initial)' else value
+    elif key == 'branch.head':
+        snapshot.head = None if value == '(detached)' else value
+    elif key == 'branch.upstream':
+        snapshot.upstream = value
+    elif key == 'branch.ab':
+        ahead, _, behind = value.partition(' ')
+        snapshot.ahead = abs(int(ahead or 0))
+        snapshot.behind = abs(int(behind or 0))
\ No newline at end of file
@@ -0,0 +1,289 @@
+"""
+Latency and output metrics for external commands and background tasks
+"""
+
+import bisect
+import json
+import os
+import threading
+from collections import Counter
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Global options whose value is a separate argument, e.g. git -C <path>
+_OPTIONS_WITH_VALUE = {'-C', '-c', '--git-dir', '--work-tree', '-H', '--host', '--context', '--config'}
+
+def command_key(cmd):
+    """
+    Metrics key of a command
+    
+    Returns:
+        tuple: (tool, subcommand), e.g. ('git', 'status') for
+            ['git', '-C', 'repo', 'status', '--porcelain']
+    """
+    if not cmd:
+        return '', ''
+    tool = os.path.basename(str(cmd[0])).lower()
+    if tool.endswith('.exe'):
+        tool = tool[:-4]
+        
+    args = iter(cmd[1:])
+    for arg in args:
+        arg = str(arg)
+        if arg in _OPTIONS_WITH_VALUE:
+            next(args, None)
+        elif not arg.startswith('-'):
+            return tool, arg
+    return tool, ''
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds"""
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        
+    def quantile(self, q):
+        """
+        Approximate quantile, reported as the upper bound of its bucket
+        (or the observed maximum for the overflow bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+        
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs ending with +Inf"""
+        pairs = []
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            pairs.append((bound, seen))
+        return pairs
+        
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'max': round(self.max, 6),
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'buckets': {('+Inf' if bound == float('inf') else str(bound)): count
+                        for bound, count in self.cumulative()},
+        }
+
+class CommandStats:
+    """Aggregated metrics of one (tool, subcommand)"""
+    
+    def __init__(self):
+        self.latency = Histogram()
+        self.queue = Histogram()
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.cache_hits = 0
+        self.output_bytes = 0
+        self.exit_codes = Counter()
+        
+    def to_dict(self):
+        return {
+            'runs': self.runs,
+            'failures': self.failures,
+            'timeouts': self.timeouts,
+            'cancelled': self.cancelled,
+            'cache_hits': self.cache_hits,
+            'output_bytes': self.output_bytes,
+            'exit_codes': {str(code): count for code, count in sorted(self.exit_codes.items())},
+            'latency_seconds': self.latency.to_dict(),
+            'queue_seconds': self.queue.to_dict(),
+        }
+
+class TaskStats:
+    """Aggregated metrics of one kind of background task"""
+    
+    def __init__(self):
+        self.total = Histogram()
+        self.delivery = Histogram()
+        
+    def to_dict(self):
+        return {
+            'total_seconds': self.total.to_dict(),
+            'delivery_seconds': self.delivery.to_dict(),
+        }
+
+class MetricsRegistry:
+    """
+    Thread-safe collection of command and task metrics
+    
+    CommandRunner records every process it runs: the time spent queued in
+    the scheduler, the time the process ran, its output size, exit code and
+    whether it timed out or was cancelled. AsyncCommandRunner records, per
+    task, the time from submission until the result reached the GUI and the
+    part of it spent waiting for the GUI thread to pick the result up, which
+    separates slow tools from a busy event loop.
+    """
+    
+    def __init__(self):
+        self._commands = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        
+    def _command_stats(self, cmd):
+        key = command_key(cmd)
+        stats = self._commands.get(key)
+        if stats is None:
+            stats = self._commands[key] = CommandStats()
+        return stats
+        
+    def record_command(self, cmd, result, duration, queued=0.0):
+        """
+        Record one executed command
+        
+        Args:
+            cmd (list): Command and arguments
+            result (CommandResult): Outcome of the command
+            duration (float): Seconds the process ran
+            queued (float): Seconds spent waiting for a scheduler slot
+        """
+        output_bytes = 0
+        for buffer in (getattr(result, 'stdout', None), getattr(result, 'stderr', None)):
+            if buffer is not None:
+                output_bytes += buffer.total_bytes
+        returncode = getattr(result, 'returncode', None)
+        
+        with self._lock:
+            stats = self._command_stats(cmd)
+            stats.runs += 1
+            stats.latency.observe(duration)
+            stats.queue.observe(queued)
+            stats.output_bytes += output_bytes
+            if not result[0]:
+                stats.failures += 1
+            if getattr(result, 'timed_out', False):
+                stats.timeouts += 1
+            if getattr(result, 'cancelled', False):
+                stats.cancelled += 1
+            if returncode is not None:
+                stats.exit_codes[returncode] += 1
+                
+    def record_cache_hit(self, cmd):
+        """Record a command answered from the result cache"""
+        with self._lock:
+            self._command_stats(cmd).cache_hits += 1
+            
+    def record_task(self, name, duration, delivery=0.0):
+        """
+        Record one completed background task
+        
+        Args:
+            name (str): Task name, normally the operation's function name
+            duration (float): Seconds from submission to result delivery
+            delivery (float): Seconds the finished result waited for the GUI
+        """
+        with self._lock:
+            stats = self._tasks.get(name)
+            if stats is None:
+                stats = self._tasks[name] = TaskStats()
+            stats.total.observe(duration)
+            stats.delivery.observe(delivery)
+            
+    def snapshot(self):
+        """
+        Current metrics as plain data
+        
+        Returns:
+            dict: {'commands': {'git status': {...}}, 'tasks': {name: {...}}}
+        """
+        with self._lock:
+            return {
+                'commands': {
+                    f"{tool} {subcommand}".strip(): stats.to_dict()
+                    for (tool, subcommand), stats in sorted(self._commands.items())
+                },
+                'tasks': {name: stats.to_dict() for name, stats in sorted(self._tasks.items())},
+            }
+            
+    def to_json(self, indent=2):
+        """Export the metrics as a JSON document"""
+        return json.dumps(self.snapshot(), indent=indent)
+        
+    def to_prometheus(self):
+        """Export the metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            commands = sorted(self._commands.items())
+            tasks = sorted(self._tasks.items())
+            
+            def histogram(name, help_text, series):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in series:
+                    for bound, count in hist.cumulative():
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+                    
+            def counter(name, help_text, series):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series:
+                    lines.append(f"{name}{{{labels}}} {value}")
+                    
+            command_labels = [
+                (f'tool="{_escape(tool)}",subcommand="{_escape(subcommand)}"', stats)
+                for (tool, subcommand), stats in commands
+            ]
+            histogram("devterm_command_duration_seconds", "Time external commands ran",
+                      [(labels, stats.latency) for labels, stats in command_labels])
+            histogram("devterm_command_queue_seconds", "Time commands waited for a scheduler slot",
+                      [(labels, stats.queue) for labels, stats in command_labels])
+            counter("devterm_command_output_bytes_total", "Bytes written to stdout and stderr",
+                    [(labels, stats.output_bytes) for labels, stats in command_labels])
+            counter("devterm_command_exit_codes_total", "Commands by exit code",
+                    [(f'{labels},code="{code}"', count)
+                     for labels, stats in command_labels
+                     for code, count in sorted(stats.exit_codes.items())])
+            counter("devterm_command_timeouts_total", "Commands killed after their timeout",
+                    [(labels, stats.timeouts) for labels, stats in command_labels])
+            counter("devterm_command_cancelled_total", "Commands cancelled by the user",
+                    [(labels, stats.cancelled) for labels, stats in command_labels])
+            counter("devterm_command_cache_hits_total", "Commands answered from the result cache",
+                    [(labels, stats.cache_hits) for labels, stats in command_labels])
+                    
+            task_labels = [(f'task="{_escape(name)}"', stats) for name, stats in tasks]
+            histogram("devterm_task_duration_seconds", "Time from submitting a task to its result reaching the GUI",
+                      [(labels, stats.total) for labels, stats in task_labels])
+            histogram("devterm_task_delivery_seconds", "Time a finished result waited for the GUI thread",
+                      [(labels, stats.delivery) for labels, stats in task_labels])
+        return '\n'.join(lines) + '\n'
+        
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._commands.clear()
+            self._tasks.clear()
+
+def _escape(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Shared registry fed by every CommandRunner and AsyncCommandRunner
+command_metrics = MetricsRegistry()
\ No newline at end of file
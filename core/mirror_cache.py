@@ -0,0 +1,262 @@
+"""
+Cache of bare mirror repositories for fast repeated clones
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .command_runner import CommandRunner
+
+# Shared by every MirrorCache in the process, so two instances on the same
+# root cannot interleave index updates and evictions
+_cache_lock = threading.Lock()
+_lease_ids = itertools.count()
+
+class MirrorEntry:
+    """One cached mirror"""
+    
+    def __init__(self, url, path, size=0, last_used=0.0, updated=0.0):
+        self.url = url
+        self.path = Path(path)
+        self.size = size
+        self.last_used = last_used
+        self.updated = updated
+        
+    def to_dict(self):
+        return {'url': self.url, 'size': self.size, 'last_used': self.last_used, 'updated': self.updated}
+        
+    def __repr__(self):
+        return f"MirrorEntry({self.url!r}, {self.size / 1024 ** 2:.1f} MiB)"
+
+class MirrorCache:
+    """
+    Bare mirrors of remote repositories under ~/.devterm/mirrors
+    
+    A mirror is created with `git clone --mirror` the first time a URL is
+    cloned and refreshed with `git fetch --prune` on every later use, so
+    only new objects cross the network. Clones then borrow the mirror's
+    objects (see GitOperations.clone_repository). An index file records
+    each mirror's URL, size on disk and last use; whenever the total size
+    exceeds max_bytes, the least recently used mirrors are deleted.
+    
+    A clone holds a lease on its mirror (a file under leases/, see
+    lease()) for as long as it reads from it, and eviction skips leased
+    mirrors, also those leased by other instances or processes. Evicted
+    mirrors are renamed away before they are deleted, so a process that
+    still finds one sees either the whole mirror or none.
+    
+    Args:
+        root (str): Directory holding the mirrors and index.json
+        max_bytes (int): Size limit of all mirrors together
+        runner (CommandRunner): Runner for git commands
+    """
+    
+    DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+    
+    # Leases older than this are left over from a crashed process
+    STALE_LEASE_SECONDS = 24 * 60 * 60
+    
+    def __init__(self, root=None, max_bytes=None, runner=None):
+        self.root = Path(root) if root else Path.home() / '.devterm' / 'mirrors'
+        self.max_bytes = max_bytes or self.DEFAULT_MAX_BYTES
+        self.runner = runner or CommandRunner()
+        self._lock = _cache_lock
+        
+    @staticmethod
+    def normalize_url(url):
+        """URL with trailing slashes and .git removed, so equivalent spellings share a mirror"""
+        url = url.strip().rstrip('/')
+        if url.endswith('.git'):
+            url = url[:-4]
+        return url
+        
+    def mirror_path(self, url):
+        """Directory of the mirror for url, e.g. github.com-org-repo-1a2b3c4d.git"""
+        url = self.normalize_url(url)
+        slug = re.sub(r'[^A-Za-z0-9._-]+', '-', url.split('://', 1)[-1]).strip('-.')[-60:]
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]
+        return self.root / f"{slug}-{digest}.git"
+        
+    def _lease_dir(self):
+        return self.root / 'leases'
+        
+    @contextmanager
+    def lease(self, url):
+        """
+        Keep the mirror of url from being evicted while the block runs
+        
+        Take the lease before update() and hold it until the clone that
+        borrows the mirror's objects has finished.
+        """
+        name = self.mirror_path(url).name
+        with self._lock:
+            self._lease_dir().mkdir(parents=True, exist_ok=True)
+            lease = self._lease_dir() / f"{name}.{os.getpid()}.{next(_lease_ids)}"
+            lease.touch()
+        try:
+            yield
+        finally:
+            try:
+                lease.unlink()
+            except OSError:
+                pass
+                
+    def _is_leased(self, name):
+        """Whether a live lease is held on the mirror directory name"""
+        try:
+            leases = list(self._lease_dir().glob(f"{name}.*"))
+        except OSError:
+            return False
+        now = time.time()
+        for lease in leases:
+            try:
+                pid = int(lease.name[len(name) + 1:].split('.', 1)[0])
+                fresh = now - lease.stat().st_mtime < self.STALE_LEASE_SECONDS
+            except (ValueError, OSError):
+                continue
+            if fresh and self._process_alive(pid):
+                return True
+        return False
+        
+    @staticmethod
+    def _process_alive(pid):
+        if pid == os.getpid() or sys.platform.startswith('win'):
+            # os.kill would terminate the process on Windows; rely on the lease age
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True  # Exists, owned by someone else
+        return True
+        
+    def _remove(self, path):
+        """Delete a mirror, renaming it away first so it disappears at once"""
+        trash = path.with_name(f"{path.name}.deleting-{os.getpid()}-{next(_lease_ids)}")
+        try:
+            os.replace(path, trash)
+        except OSError:
+            trash = path
+        shutil.rmtree(trash, ignore_errors=True)
+        
+    def _index_file(self):
+        return self.root / 'index.json'
+        
+    def _load_index(self):
+        try:
+            with open(self._index_file(), encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {
+            name: MirrorEntry(info['url'], self.root / name, info.get('size', 0),
+                              info.get('last_used', 0.0), info.get('updated', 0.0))
+            for name, info in data.items()
+            if (self.root / name).is_dir()
+        }
+        
+    def _save_index(self, entries):
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp = self._index_file().with_suffix('.tmp')
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({name: entry.to_dict() for name, entry in entries.items()}, f, indent=2)
+        os.replace(temp, self._index_file())
+        
+    @staticmethod
+    def _directory_size(path):
+        total = 0
+        for directory, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(directory, name)).st_size
+                except OSError:
+                    pass
+        return total
+        
+    def entries(self):
+        """Cached mirrors, most recently used first"""
+        with self._lock:
+            entries = self._load_index()
+        return sorted(entries.values(), key=lambda entry: entry.last_used, reverse=True)
+        
+    def total_size(self):
+        """Bytes used by all mirrors"""
+        return sum(entry.size for entry in self.entries())
+        
+    def update(self, url, on_output=None):
+        """
+        Create or refresh the mirror of url
+        
+        Args:
+            url (str): Remote repository URL
+            on_output (callable): Optional callback receiving git's output lines
+            
+        Returns:
+            tuple: (result: CommandResult, path: Path) where path is the
+                mirror directory, or None if it could not be updated
+        """
+        path = self.mirror_path(url)
+        if (path / 'HEAD').is_file():
+            result = self.runner.run_command(
+                ['git', 'fetch', '--prune', '--progress', 'origin'],
+                cwd=str(path), resource=str(path), exclusive=True, on_output=on_output
+            )
+        else:
+            self.root.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                shutil.rmtree(path, ignore_errors=True)  # Left over from an interrupted mirror clone
+            result = self.runner.run_command(
+                ['git', 'clone', '--mirror', '--progress', url, str(path)],
+                cwd=str(self.root), resource=str(path), exclusive=True, on_output=on_output
+            )
+            if not result.success:
+                shutil.rmtree(path, ignore_errors=True)
+                
+        if not result.success:
+            return result, None
+            
+        now = time.time()
+        with self._lock:
+            entries = self._load_index()
+            entries[path.name] = MirrorEntry(url, path, self._directory_size(path), now, now)
+            self._evict(entries, keep=path.name)
+            self._save_index(entries)
+        return result, path
+        
+    def _evict(self, entries, keep=None):
+        """Delete least recently used mirrors until the cache fits max_bytes, sparing leased ones"""
+        total = sum(entry.size for entry in entries.values())
+        for name, entry in sorted(entries.items(), key=lambda item: item[1].last_used):
+            if total <= self.max_bytes:
+                break
+            if name == keep or self._is_leased(name):
+                continue
+            self._remove(entry.path)
+            total -= entry.size
+            del entries[name]
+            
+    def evict(self, url):
+        """Delete the mirror of url"""
+        path = self.mirror_path(url)
+        with self._lock:
+            entries = self._load_index()
+            entries.pop(path.name, None)
+            self._remove(path)
+            self._save_index(entries)
+            
+    def clear(self):
+        """Delete every mirror"""
+        with self._lock:
+            for entry in self._load_index().values():
+                self._remove(entry.path)
+            self._save_index({})
\ No newline at end of file
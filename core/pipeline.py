@@ -0,0 +1,233 @@
+"""
+Multi-step operations expressed as a dependency graph of commands
+"""
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .cancellation import CancellationToken, CommandCancelled, cancellation_scope, current_token
+from .command_runner import CommandResult
+
+# Step states
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+SKIPPED = 'skipped'
+
+class PipelineStep:
+    """One operation in a Pipeline and, once run, its outcome"""
+    
+    def __init__(self, name, func, args, kwargs, after, optional, stream):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.after = tuple(after)
+        self.optional = optional
+        self.stream = stream
+        self.status = PENDING
+        self.result = None
+        self.started = None
+        self.duration = None
+        
+    @property
+    def succeeded(self):
+        """Whether dependents may run after this step"""
+        return self.status == SUCCEEDED or (self.optional and self.status == FAILED)
+        
+    def __repr__(self):
+        return f"PipelineStep({self.name!r}, status={self.status!r}, duration={self.duration!r})"
+
+class PipelineResult(CommandResult):
+    """
+    Result of Pipeline.run
+    
+    Unpacks like a CommandResult: output joins the output of every step and
+    error is the error of the step that failed the pipeline. The individual
+    steps, in declaration order, are available as ``steps``.
+    """
+    
+    def __new__(cls, steps, duration):
+        failed = next((step for step in steps if step.status == FAILED and not step.optional), None)
+        cancelled = failed is None and any(step.status == CANCELLED for step in steps)
+        success = failed is None and not cancelled and all(step.succeeded for step in steps)
+        
+        output = '\n'.join(
+            step.result[1] for step in steps if step.result is not None and step.result[1]
+        )
+        if failed is not None:
+            error = failed.result[2]
+        elif cancelled:
+            error = "Command cancelled"
+        else:
+            error = ""
+            
+        result = super().__new__(cls, success, output, error, cancelled=cancelled)
+        result.steps = steps
+        result.failed_step = failed
+        result.duration = duration
+        return result
+        
+    def step(self, name):
+        """Look up a step by name"""
+        for step in self.steps:
+            if step.name == name:
+                return step
+        raise KeyError(name)
+        
+    def timing_summary(self):
+        """Human readable per-step timings, e.g. 'add 0.12s, commit 0.05s, push skipped'"""
+        parts = []
+        for step in self.steps:
+            if step.duration is None:
+                parts.append(f"{step.name} {step.status}")
+            else:
+                parts.append(f"{step.name} {step.duration:.2f}s")
+        return ', '.join(parts)
+
+class Pipeline:
+    """
+    Declarative graph of operations with early failure
+    
+    Steps are callables returning (success, output, error), usually
+    GitOperations or DockerOperations methods. A step starts as soon as
+    every step it runs ``after`` has succeeded, so independent steps run in
+    parallel (still subject to the command scheduler's limits). When a
+    required step fails, no further steps are started; with fail_fast the
+    steps already running are cancelled as well. Steps marked optional may
+    fail without stopping their dependents.
+    
+    Example:
+        pipeline = Pipeline("commit and push")
+        pipeline.add('add', git_ops.add_all, repo)
+        pipeline.add('commit', git_ops.commit, repo, message, after=['add'])
+        pipeline.add('push', git_ops.push, repo, after=['commit'], stream=True)
+        result = pipeline.run()
+    """
+    
+    MAX_PARALLEL = 4
+    
+    def __init__(self, description="", fail_fast=True, max_parallel=None):
+        self.description = description
+        self.fail_fast = fail_fast
+        self.max_parallel = max_parallel or self.MAX_PARALLEL
+        self.steps = []
+        
+    def add(self, name, func, *args, after=None, optional=False, stream=False, **kwargs):
+        """
+        Add a step
+        
+        Args:
+            name (str): Unique step name
+            func (callable): Operation to run
+            *args: Positional arguments for func
+            after (list): Names of steps that must succeed first
+            optional (bool): Whether the pipeline continues if this step fails
+            stream (bool): Pass the on_output callback given to run() to func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            str: The step name, for use in later ``after`` lists
+        """
+        if any(step.name == name for step in self.steps):
+            raise ValueError(f"Duplicate pipeline step: {name}")
+        after = list(after or [])
+        known = {step.name for step in self.steps}
+        for dependency in after:
+            if dependency not in known:
+                raise ValueError(f"Step {name} depends on unknown step {dependency}")
+                
+        self.steps.append(PipelineStep(name, func, args, kwargs, after, optional, stream))
+        return name
+        
+    def run(self, on_output=None):
+        """
+        Run every step, in parallel where dependencies allow
+        
+        Blocks until the pipeline is done. Cancelling the current context's
+        token cancels the running steps and skips the rest.
+        
+        Args:
+            on_output (callable): Optional callback receiving output lines of
+                steps added with stream=True
+                
+        Returns:
+            PipelineResult: combined outcome with per-step status and timing
+        """
+        token = CancellationToken()
+        parent = current_token()
+        unregister = parent.add_callback(token.cancel) if parent is not None else None
+        
+        started = time.perf_counter()
+        try:
+            self._execute(token, on_output, started)
+        finally:
+            if unregister is not None:
+                unregister()
+                
+        return PipelineResult(list(self.steps), time.perf_counter() - started)
+        
+    def _execute(self, token, on_output, started):
+        """Drive the step graph until nothing more can run"""
+        for step in self.steps:
+            step.status = PENDING
+            step.result = step.started = step.duration = None
+            
+        by_name = {step.name: step for step in self.steps}
+        running = {}
+        stopped = False
+        
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+            while True:
+                for step in self.steps:
+                    if step.status != PENDING:
+                        continue
+                    dependencies = [by_name[name] for name in step.after]
+                    if stopped or any(dep.status in (FAILED, CANCELLED, SKIPPED) and not dep.succeeded
+                                      for dep in dependencies):
+                        step.status = SKIPPED
+                    elif all(dep.succeeded for dep in dependencies):
+                        step.status = RUNNING
+                        step.started = time.perf_counter() - started
+                        context = contextvars.copy_context()
+                        future = pool.submit(context.run, self._run_step, step, token, on_output)
+                        running[future] = step
+                        
+                if not running:
+                    break
+                    
+                done, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    step.result, step.duration = future.result()
+                    if getattr(step.result, 'cancelled', False):
+                        step.status = CANCELLED
+                    elif step.result[0]:
+                        step.status = SUCCEEDED
+                    else:
+                        step.status = FAILED
+                        
+                    if step.status == CANCELLED or (step.status == FAILED and not step.optional):
+                        stopped = True
+                        if self.fail_fast:
+                            token.cancel()
+                            
+    @staticmethod
+    def _run_step(step, token, on_output):
+        """Run one step; returns (result, duration)"""
+        started = time.perf_counter()
+        kwargs = dict(step.kwargs)
+        if step.stream and on_output is not None:
+            kwargs['on_output'] = on_output
+        try:
+            token.raise_if_cancelled()
+            with cancellation_scope(token):
+                result = step.func(*step.args, **kwargs)
+        except CommandCancelled:
+            result = CommandResult(False, "", "Command cancelled", cancelled=True)
+        except Exception as e:
+            result = CommandResult(False, "", f"Unexpected error: {str(e)}")
+        return result, time.perf_counter() - started
\ No newline at end of file
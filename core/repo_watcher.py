@@ -0,0 +1,291 @@
+"""
+File system watching of a git repository
+"""
+
+import os
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal, Slot
+
+from .async_runner import AsyncCommandRunner
+from .command_runner import CommandResult
+from .git_refs import RefReadError, find_git_dirs
+from .git_staging import chunk_paths
+
+class RepoWatcher(QObject):
+    """
+    Reports changes to a repository's refs, index and working tree
+    
+    Uses QFileSystemWatcher (inotify, kqueue or ReadDirectoryChangesW), so
+    nothing is polled. Git updates HEAD, refs and the index by renaming a
+    lock file over them, so watching the git directory and the ref
+    directories catches every update. In the working tree all directories
+    are watched, which catches files being created, deleted or saved by
+    rename; files are watched individually for in-place edits as long as
+    the MAX_WATCHED_PATHS budget allows. The working tree is scanned on
+    the thread pool: the walk stops once the budget is spent and does not
+    enter directories git ignores, so build output does not use up the
+    budget. Ignored directories are remembered for the current repository
+    and not checked again.
+    
+    Bursts of events (a checkout touching thousands of files) are coalesced
+    for DEBOUNCE_MS before head_changed and/or worktree_changed is emitted.
+    """
+    
+    head_changed = Signal()      # HEAD or refs moved
+    worktree_changed = Signal()  # Index or working tree files changed
+    
+    DEBOUNCE_MS = 300
+    MAX_WATCHED_PATHS = 4000
+    
+    # Directories never worth watching in a working tree
+    SKIPPED_DIRECTORIES = {'.git', 'node_modules', '__pycache__', '.venv', '.tox',
+                           '.mypy_cache', '.pytest_cache'}
+                           
+    def __init__(self, parent=None, async_runner=None):
+        super().__init__(parent)
+        self.async_runner = async_runner or AsyncCommandRunner()
+        self.runner = self.async_runner.runner
+        self.repo_path = None
+        self._git_dirs = ()
+        self._watch_id = 0          # Bumped on every watch/stop; older scans are ignored
+        self._ignored = set()       # Directories of this repository git ignores
+        self._index_mtime = None
+        self._head_dirty = False
+        self._worktree_dirty = False
+        
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._flush)
+        
+    def watch(self, repo_path):
+        """
+        Start watching repo_path instead of the previous repository
+        
+        Returns:
+            bool: False if repo_path is not a readable git repository
+        """
+        repo_path = os.path.abspath(repo_path)
+        if repo_path == self.repo_path:
+            return True
+        self.stop()
+        
+        try:
+            git_dir, common_dir = find_git_dirs(repo_path)
+        except (RefReadError, OSError):
+            return False
+            
+        self.repo_path = repo_path
+        self._git_dirs = (str(git_dir), str(common_dir))
+        self._index_mtime = self._stat_index()
+        
+        git_paths = {str(git_dir), str(common_dir)}
+        for refs_root in ('refs/heads', 'refs/remotes', 'refs/tags'):
+            git_paths.update(self._walk_directories([os.path.join(common_dir, refs_root)]))
+        self._watcher.addPaths(sorted(git_paths))
+        
+        self._add_worktree_paths([repo_path], check_roots=False)
+        return True
+        
+    def stop(self):
+        """Stop watching"""
+        self._debounce.stop()
+        watched = self._watcher.files() + self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+        self.repo_path = None
+        self._git_dirs = ()
+        self._watch_id += 1
+        self._ignored = set()
+        self._head_dirty = self._worktree_dirty = False
+        
+    def watched_count(self):
+        """Number of files and directories being watched"""
+        return len(self._watcher.files()) + len(self._watcher.directories())
+        
+    def _budget(self):
+        return self.MAX_WATCHED_PATHS - self.watched_count()
+        
+    def _is_git_path(self, path):
+        return any(path == root or path.startswith(root + os.sep) for root in self._git_dirs)
+        
+    def _stat_index(self):
+        try:
+            return os.stat(os.path.join(self._git_dirs[0], 'index')).st_mtime_ns
+        except (OSError, IndexError):
+            return None
+            
+    def _walk_directories(self, roots, limit=None, exclude=(), find_ignored=None):
+        """
+        Directories below roots, breadth first, skipping SKIPPED_DIRECTORIES
+        
+        Args:
+            roots (list): Directories to start from; they are included
+            limit (int): Stop once this many directories are collected
+            exclude (set): Directories to leave out (and not enter)
+            find_ignored (callable): Given a level's subdirectories, returns
+                those to leave out; called once per level
+                
+        Returns:
+            list: directory paths
+        """
+        directories = []
+        level = list(roots)
+        while level:
+            children = []
+            for path in level:
+                if limit is not None and len(directories) >= limit:
+                    return directories
+                directories.append(path)
+                try:
+                    with os.scandir(path) as entries:
+                        children.extend(
+                            entry.path for entry in entries
+                            if entry.is_dir(follow_symlinks=False)
+                            and entry.name not in self.SKIPPED_DIRECTORIES and entry.path not in exclude
+                        )
+                except OSError:
+                    continue
+            if limit is not None:
+                # Only this many more can be collected; do not check the rest
+                children = children[:limit - len(directories)]
+            if find_ignored is not None and children:
+                ignored = find_ignored(children)
+                children = [path for path in children if path not in ignored]
+            level = children
+        return directories
+        
+    def _ignored_directories(self, repo_path, directories):
+        """The directories, among those given, that git's ignore rules exclude (runs git)"""
+        relative = {}
+        for path in directories:
+            relative[os.path.relpath(path, repo_path).replace(os.sep, '/') + '/'] = path
+        ignored = set()
+        for chunk in chunk_paths(list(relative)):
+            result = self.runner.run_command(
+                ['git', '-c', 'core.quotePath=false', 'check-ignore', '--', *chunk], cwd=repo_path
+            )
+            # Exit status 1 means none of the paths is ignored
+            if result.success:
+                ignored.update(relative[line] for line in result.output.splitlines() if line in relative)
+        return ignored
+        
+    def _scan_worktree(self, repo_path, roots, budget, exclude, check_roots):
+        """
+        Find the directories and files to watch below roots (on the thread pool)
+        
+        Returns:
+            CommandResult: (success: bool, (directories, files, ignored), error: str)
+                where ignored holds the directories git ignores that were met
+        """
+        ignored = set()
+        
+        def find_ignored(paths):
+            found = self._ignored_directories(repo_path, paths)
+            ignored.update(found)
+            return found
+            
+        if check_roots:
+            roots = [root for root in roots if root not in find_ignored(roots)]
+        directories = self._walk_directories(roots, limit=budget, exclude=exclude, find_ignored=find_ignored)
+        
+        files = []
+        room = budget - len(directories)
+        for directory in directories:
+            if len(files) >= room:
+                break
+            try:
+                with os.scandir(directory) as entries:
+                    files.extend(entry.path for entry in entries if entry.is_file(follow_symlinks=False))
+            except OSError:
+                continue
+        return CommandResult(True, (directories, files[:max(room, 0)], ignored), "")
+        
+    def _add_worktree_paths(self, roots, check_roots=True):
+        """Scan the directories below roots in the background, then watch them and their files"""
+        budget = self._budget()
+        if budget <= 0:
+            return
+        # Watched, ignored and git directories are not entered again
+        exclude = set(self._watcher.directories()) | self._ignored | set(self._git_dirs)
+        roots = [root for root in roots if root not in exclude and not self._is_git_path(root)]
+        if not roots:
+            return
+        watch_id = self._watch_id
+        handle = self.async_runner.submit_background(
+            self._scan_worktree, self.repo_path, roots, budget, exclude, check_roots
+        )
+        handle.finished.connect(lambda result: self._on_worktree_scanned(watch_id, result))
+        
+    def _on_worktree_scanned(self, watch_id, result):
+        if watch_id != self._watch_id or not result.success:
+            return
+        directories, files, ignored = result.output
+        self._ignored.update(ignored)
+        
+        watched = set(self._watcher.directories())
+        directories = [path for path in directories if path not in watched][:self._budget()]
+        if directories:
+            self._watcher.addPaths(directories)
+        watched = set(self._watcher.files())
+        files = [path for path in files if path not in watched][:self._budget()]
+        if files:
+            self._watcher.addPaths(files)
+            
+    @Slot(str)
+    def _on_directory_changed(self, path):
+        if self._is_git_path(path):
+            # New ref directories (e.g. refs/heads/feature/) need watching too
+            if os.path.isdir(path) and path not in self._git_dirs:
+                new = [p for p in self._walk_directories([path]) if p not in self._watcher.directories()]
+                if new:
+                    self._watcher.addPaths(new)
+            self._head_dirty = True
+            index_mtime = self._stat_index()
+            if index_mtime != self._index_mtime:
+                self._index_mtime = index_mtime
+                self._worktree_dirty = True
+        else:
+            self._worktree_dirty = True
+            self._add_new_children(path)
+        self._debounce.start()
+        
+    def _add_new_children(self, directory):
+        """Watch subdirectories and files created in an already watched directory"""
+        # Known ignored directories are skipped without running git again
+        skipped = set(self._watcher.directories()) | set(self._watcher.files()) | self._ignored
+        try:
+            with os.scandir(directory) as entries:
+                new = [
+                    entry for entry in entries
+                    if entry.path not in skipped and entry.name not in self.SKIPPED_DIRECTORIES
+                ]
+        except OSError:
+            return
+        directories = []
+        for entry in new:
+            if entry.is_dir(follow_symlinks=False):
+                directories.append(entry.path)
+            elif entry.is_file(follow_symlinks=False) and self._budget() > 0:
+                self._watcher.addPath(entry.path)
+        if directories:
+            self._add_worktree_paths(directories)
+                
+    @Slot(str)
+    def _on_file_changed(self, path):
+        self._worktree_dirty = True
+        self._debounce.start()
+        
+    @Slot()
+    def _flush(self):
+        """Emit the coalesced changes"""
+        head, worktree = self._head_dirty, self._worktree_dirty
+        self._head_dirty = self._worktree_dirty = False
+        if head:
+            self.head_changed.emit()
+        if worktree:
+            self.worktree_changed.emit()
\ No newline at end of file
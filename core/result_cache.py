@@ -0,0 +1,108 @@
+"""
+Short-lived cache for read-only command results
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class ResultCache:
+    """
+    Thread-safe TTL cache of command results keyed by (command, cwd)
+    
+    Entries expire after their TTL and can be dropped early with
+    invalidate(), which mutating git/docker operations call so that the
+    next read reflects their effect. Every invalidation bumps a generation
+    counter; results of reads that were already running when an
+    invalidation happened are not stored, so a slow read can never
+    reinsert data older than the invalidation.
+    """
+    
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        
+    @staticmethod
+    def make_key(cmd, cwd=None):
+        """Build the cache key for a command"""
+        if cwd:
+            cwd = os.path.normcase(os.path.abspath(cwd))
+        return tuple(cmd), cwd
+        
+    @property
+    def generation(self):
+        """Counter incremented by every invalidation"""
+        return self._generation
+        
+    def get(self, cmd, cwd=None):
+        """
+        Look up a cached result
+        
+        Returns:
+            The cached result, or None if missing or expired
+        """
+        key = self.make_key(cmd, cwd)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+            
+    def put(self, cmd, cwd, result, ttl, generation=None):
+        """
+        Store a result for ttl seconds
+        
+        Args:
+            cmd (list): Command and arguments
+            cwd (str): Working directory the command ran in
+            result: Result to cache
+            ttl (float): Time to live in seconds
+            generation (int): Value of generation when the command started;
+                the result is discarded if an invalidation happened since
+        """
+        key = self.make_key(cmd, cwd)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                
+    def invalidate(self, tool=None, cwd=None):
+        """
+        Drop cached results
+        
+        Args:
+            tool (str): Only drop commands starting with this executable
+            cwd (str): Only drop commands that ran in this directory
+        """
+        if cwd:
+            cwd = os.path.normcase(os.path.abspath(cwd))
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                cmd, key_cwd = key
+                if tool is not None and (not cmd or cmd[0] != tool):
+                    continue
+                if cwd is not None and key_cwd != cwd:
+                    continue
+                del self._entries[key]
+                
+    def clear(self):
+        """Drop every cached result"""
+        self.invalidate()
+
+# Shared cache so every CommandRunner sees the same results and invalidations
+result_cache = ResultCache()
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Scheduling of external commands per tool and per resource
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+
+from .cancellation import CommandCancelled, current_token
+
+# Priorities; lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+_current_priority = contextvars.ContextVar('devterm_command_priority', default=INTERACTIVE)
+
+def current_priority():
+    """Priority of commands started from the current context"""
+    return _current_priority.get()
+
+@contextmanager
+def priority_scope(priority):
+    """Run commands started inside the block with the given priority"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+class ResourceQueue:
+    """
+    Priority-ordered admission to a shared resource
+    
+    Holders are either shared (up to max_shared at once) or exclusive
+    (alone). Waiters are admitted strictly in (priority, arrival) order, so
+    a queued exclusive request is not starved by a stream of shared ones and
+    interactive work overtakes queued background work.
+    """
+    
+    def __init__(self, max_shared):
+        self.max_shared = max_shared
+        self.shared = 0
+        self.exclusive = False
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        
+    def acquire(self, exclusive=False, priority=INTERACTIVE, cancel_token=None):
+        """
+        Block until the resource is granted
+        
+        Raises:
+            CommandCancelled: if cancel_token is cancelled while waiting
+        """
+        with self._lock:
+            if not self._waiters and self._can_grant(exclusive):
+                self._grant(exclusive)
+                return
+            waiter = [priority, next(self._sequence), exclusive, threading.Event(), False]
+            heapq.heappush(self._waiters, waiter)
+            
+        unregister = None
+        if cancel_token is not None:
+            unregister = cancel_token.add_callback(lambda: self._abandon(waiter))
+        waiter[3].wait()
+        if unregister is not None:
+            unregister()
+        if waiter[4]:
+            raise CommandCancelled()
+            
+    def _abandon(self, waiter):
+        """Withdraw a queued request whose work was cancelled"""
+        with self._lock:
+            if waiter not in self._waiters:
+                return  # Already granted
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            waiter[4] = True
+            
+            # The withdrawn request may have been blocking others
+            self._admit_waiters()
+        waiter[3].set()
+        
+    def release(self, exclusive=False):
+        """Give the resource back and admit the next waiters"""
+        with self._lock:
+            if exclusive:
+                self.exclusive = False
+            else:
+                self.shared -= 1
+            self._admit_waiters()
+                
+    def waiting(self):
+        """Number of queued requests"""
+        with self._lock:
+            return len(self._waiters)
+            
+    def _admit_waiters(self):
+        """Grant queued requests in order while they fit; caller holds the lock"""
+        while self._waiters and self._can_grant(self._waiters[0][2]):
+            waiter = heapq.heappop(self._waiters)
+            self._grant(waiter[2])
+            waiter[3].set()
+            
+    def _can_grant(self, exclusive):
+        if self.exclusive:
+            return False
+        if exclusive:
+            return self.shared == 0
+        return self.shared < self.max_shared
+        
+    def _grant(self, exclusive):
+        if exclusive:
+            self.exclusive = True
+        else:
+            self.shared += 1
+
+class CommandScheduler:
+    """
+    Admission control for git and docker commands
+    
+    Every command takes a slot from its tool's global queue, capping how
+    many git processes or docker client calls run at once. Commands that
+    name a resource (a repository path) additionally take that resource
+    shared for reads or exclusively for mutations, so two writers never race
+    on the same repository's index.lock while reads still run in parallel.
+    """
+    
+    DEFAULT_TOOL_LIMITS = {'git': 4, 'docker': 3}
+    DEFAULT_LIMIT = 4
+    MAX_RESOURCE_READERS = 4
+    
+    def __init__(self, tool_limits=None, max_resource_readers=None):
+        self.tool_limits = dict(self.DEFAULT_TOOL_LIMITS)
+        if tool_limits:
+            self.tool_limits.update(tool_limits)
+        self.max_resource_readers = max_resource_readers or self.MAX_RESOURCE_READERS
+        self._tools = {}
+        self._resources = {}
+        self._lock = threading.Lock()
+        self._held = threading.local()
+        
+    def _tool_queue(self, tool):
+        with self._lock:
+            queue = self._tools.get(tool)
+            if queue is None:
+                queue = ResourceQueue(self.tool_limits.get(tool, self.DEFAULT_LIMIT))
+                self._tools[tool] = queue
+            return queue
+            
+    def _resource_queue(self, resource):
+        with self._lock:
+            queue = self._resources.get(resource)
+            if queue is None:
+                queue = ResourceQueue(self.max_resource_readers)
+                self._resources[resource] = queue
+            return queue
+            
+    @staticmethod
+    def tool_name(cmd):
+        """Tool a command belongs to, e.g. 'git' for ['git', 'status']"""
+        if not cmd:
+            return ''
+        name = os.path.basename(str(cmd[0])).lower()
+        return name[:-4] if name.endswith('.exe') else name
+        
+    @contextmanager
+    def slot(self, tool, resource=None, exclusive=False, priority=None, cancel_token=None):
+        """
+        Hold a tool slot, and optionally a resource, for the duration of
+        the block
+        
+        Args:
+            tool (str): Tool name, e.g. 'git'
+            resource (str): Resource the command touches, e.g. a repo path
+            exclusive (bool): Whether the command mutates the resource
+            priority (int): INTERACTIVE or BACKGROUND; defaults to the
+                priority of the current context
+            cancel_token (CancellationToken): Abandons the wait for a slot
+                when cancelled; defaults to the current context's token
+                
+        Raises:
+            CommandCancelled: if cancelled while queued
+        """
+        if priority is None:
+            priority = current_priority()
+        if cancel_token is None:
+            cancel_token = current_token()
+        if resource:
+            resource = os.path.normcase(os.path.abspath(resource))
+            
+        # A thread already holding the resource (nested call) must not
+        # queue behind itself
+        held = getattr(self._held, 'resources', None)
+        if held is None:
+            held = self._held.resources = set()
+        resource_queue = None
+        if resource and resource not in held:
+            resource_queue = self._resource_queue(resource)
+            resource_queue.acquire(exclusive, priority, cancel_token)
+            held.add(resource)
+            
+        tool_queue = self._tool_queue(tool)
+        try:
+            tool_queue.acquire(False, priority, cancel_token)
+            try:
+                yield
+            finally:
+                tool_queue.release(False)
+        finally:
+            if resource_queue is not None:
+                held.discard(resource)
+                resource_queue.release(exclusive)
+                
+    def run(self, func, tool, resource=None, exclusive=False, priority=None):
+        """Run func while holding the slot described by the other arguments"""
+        with self.slot(tool, resource=resource, exclusive=exclusive, priority=priority):
+            return func()
+            
+    def stats(self):
+        """Snapshot of running and queued commands per tool"""
+        with self._lock:
+            tools = dict(self._tools)
+        return {
+            tool: {'running': queue.shared, 'queued': queue.waiting(), 'limit': queue.max_shared}
+            for tool, queue in tools.items()
+        }
+
+# Shared scheduler so limits apply across every CommandRunner
+command_scheduler = CommandScheduler()
\ No newline at end of file
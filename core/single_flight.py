@@ -0,0 +1,77 @@
+"""
+Deduplication of identical concurrent calls
+"""
+
+import threading
+
+class _Call:
+    """A call in progress and the callers waiting for it"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution
+    
+    The first caller for a key runs the function; callers arriving while it
+    is still running block and receive the same result (or exception)
+    instead of starting their own.
+    """
+    
+    def __init__(self):
+        self.executed = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+        
+    def do(self, key, func):
+        """
+        Run func once for all concurrent callers using key
+        
+        Args:
+            key: Hashable identity of the call
+            func (callable): Zero-argument callable producing the result
+            
+        Returns:
+            The result of func
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+                
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+            
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+        
+    def in_flight(self):
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+# Shared instance so identical queries from any CommandRunner are merged
+command_flights = SingleFlight()
\ No newline at end of file
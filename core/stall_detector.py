@@ -0,0 +1,159 @@
+"""
+Detection of Qt event-loop stalls
+"""
+
+import sys
+import threading
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+
+from .tracing import tracer
+
+class StallRecord:
+    """One period during which the GUI thread did not service its event loop"""
+    
+    def __init__(self, started, duration, culprit, command, stack):
+        self.started = started
+        self.duration = duration
+        self.culprit = culprit
+        self.command = command
+        self.stack = stack
+        
+    def describe(self):
+        """One-line summary, e.g. 'GitTab.refresh_branches running git branch -a'"""
+        text = self.culprit or "unknown"
+        if self.command:
+            text += f" running {self.command}"
+        return text
+        
+    def __repr__(self):
+        return f"StallRecord({self.duration * 1000:.0f} ms, {self.describe()!r})"
+
+def describe_frame(frame):
+    """
+    Find the slot and command responsible for a GUI thread stack
+    
+    Returns:
+        tuple: (culprit, command, stack) where culprit is the qualified name
+            of the outermost UI function on the stack, command the command
+            line of any run_command call in progress and stack a list of
+            'file:line function' strings, outermost first
+    """
+    chain = []
+    while frame is not None:
+        chain.append(frame)
+        frame = frame.f_back
+    chain.reverse()
+    
+    culprit = None
+    command = None
+    stack = []
+    for frame in chain:
+        code = frame.f_code
+        name = getattr(code, 'co_qualname', code.co_name)
+        stack.append(f"{code.co_filename}:{frame.f_lineno} {name}")
+        
+        if culprit is None and frame.f_globals.get('__name__', '').startswith('ui.'):
+            culprit = name
+        if command is None and code.co_name == 'run_command':
+            try:
+                command = ' '.join(str(arg) for arg in frame.f_locals.get('cmd') or ())
+            except Exception:
+                pass
+    return culprit, command, stack
+
+class StallDetector(QObject):
+    """
+    Watchdog measuring how late the Qt event loop services a heartbeat timer
+    
+    A heartbeat fires on the GUI thread every HEARTBEAT_INTERVAL seconds and
+    records how late it ran. A watchdog thread notices when no heartbeat
+    arrived for longer than the stall threshold and captures the GUI
+    thread's Python stack while it is still stuck, so the slot (and any
+    command) responsible can be named once the loop recovers and
+    stall_detected is emitted.
+    """
+    
+    stall_detected = Signal(object)
+    
+    HEARTBEAT_INTERVAL = 0.05
+    STALL_THRESHOLD = 0.2
+    
+    def __init__(self, parent=None, threshold=None):
+        super().__init__(parent)
+        self.threshold = threshold or self.STALL_THRESHOLD
+        self.stall_count = 0
+        self.worst_latency = 0.0
+        self.last_stall = None
+        self.stalls = []
+        self._gui_thread = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._capture = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watchdog = None
+        
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(self.HEARTBEAT_INTERVAL * 1000))
+        self._timer.timeout.connect(self._on_heartbeat)
+        
+    def start(self):
+        """Start measuring; must be called on the GUI thread"""
+        self._gui_thread = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._timer.start()
+        self._watchdog = threading.Thread(target=self._watch, name='stall-watchdog', daemon=True)
+        self._watchdog.start()
+        
+    def stop(self):
+        """Stop measuring"""
+        self._timer.stop()
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(1)
+            self._watchdog = None
+            
+    @Slot()
+    def _on_heartbeat(self):
+        """Runs on the GUI thread; measures how late this beat is"""
+        now = time.perf_counter()
+        with self._lock:
+            gap = now - self._last_beat
+            self._last_beat = now
+            capture = self._capture
+            self._capture = None
+            
+        latency = max(0.0, gap - self.HEARTBEAT_INTERVAL)
+        self.worst_latency = max(self.worst_latency, latency)
+        if latency < self.threshold:
+            return
+            
+        culprit, command, stack = capture if capture else (None, None, [])
+        record = StallRecord(now - gap, latency, culprit, command, stack)
+        self.stall_count += 1
+        self.last_stall = record
+        self.stalls.append(record)
+        del self.stalls[:-50]  # Keep only recent stalls
+        
+        tracer.complete('event loop stall', 'stall', now - latency, latency,
+                        {'culprit': culprit, 'command': command})
+        self.stall_detected.emit(record)
+        
+    def _watch(self):
+        """Watchdog thread: capture the GUI stack while a stall is ongoing"""
+        while not self._stop.wait(self.HEARTBEAT_INTERVAL):
+            with self._lock:
+                last_beat = self._last_beat
+                overdue = time.perf_counter() - last_beat - self.HEARTBEAT_INTERVAL
+                if overdue < self.threshold or self._capture is not None:
+                    continue
+            frame = sys._current_frames().get(self._gui_thread)
+            if frame is None:
+                continue
+            capture = describe_frame(frame)
+            del frame
+            with self._lock:
+                if self._last_beat == last_beat:  # Still the same stall
+                    self._capture = capture
\ No newline at end of file
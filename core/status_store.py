@@ -0,0 +1,172 @@
+"""
+Compact column store of status entries for views over very large change sets
+"""
+
+from array import array
+
+from .git_status import StatusEntry
+
+KINDS = ('changed', 'renamed', 'unmerged', 'untracked', 'ignored')
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+_CHANGED, _RENAMED, _UNMERGED, _UNTRACKED, _IGNORED = range(len(KINDS))
+
+# Categories understood by StatusStore.filter
+ALL = 'all'
+STAGED = 'staged'
+UNSTAGED = 'unstaged'
+UNTRACKED = 'untracked'
+CONFLICTED = 'conflicted'
+CATEGORIES = (ALL, STAGED, UNSTAGED, UNTRACKED, CONFLICTED)
+
+# Sort keys understood by StatusStore.sort
+SORT_PATH = 'path'
+SORT_STATUS = 'status'
+
+class StatusStore:
+    """
+    Status entries kept column by column
+    
+    Instead of one object per entry, the store keeps the paths in a list
+    and everything else in flat arrays: the kind as one byte, the X and Y
+    status letters as two bytes, and the directory as an index into a
+    table of distinct directories. Rows are entry numbers in the order git
+    reported them; filter and sort return arrays of rows, so views work on
+    100k+ entries without materialising a StatusEntry per row (entry()
+    builds one on demand).
+    """
+    
+    def __init__(self):
+        self.paths = []
+        self.kinds = array('B')
+        self.codes = bytearray()    # X and Y letter of each row
+        self.dir_ids = array('I')
+        self.directories = []       # Distinct directories, '' for the top level
+        self.orig_paths = {}        # Row -> source path of renames and copies
+        self._directory_ids = {}
+        
+    @classmethod
+    def from_entries(cls, entries):
+        """Build a store from StatusEntry tuples, e.g. RepoSnapshot.entries"""
+        store = cls()
+        for entry in entries:
+            store.append(entry.kind, entry.index, entry.worktree, entry.path, entry.orig_path)
+        return store
+        
+    def __len__(self):
+        return len(self.paths)
+        
+    def append(self, kind, index, worktree, path, orig_path=None):
+        """Add one entry; arguments as in StatusEntry"""
+        row = len(self.paths)
+        directory, _, _ = path.rstrip('/').rpartition('/')
+        dir_id = self._directory_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._directory_ids[directory] = len(self.directories)
+            self.directories.append(directory)
+            
+        self.paths.append(path)
+        self.kinds.append(_KIND_CODES[kind])
+        self.codes += f"{index}{worktree}".encode('ascii', errors='replace')
+        self.dir_ids.append(dir_id)
+        if orig_path:
+            self.orig_paths[row] = orig_path
+            
+    def entry(self, row):
+        """StatusEntry of a row"""
+        return StatusEntry(
+            KINDS[self.kinds[row]], chr(self.codes[2 * row]), chr(self.codes[2 * row + 1]),
+            self.paths[row], self.orig_paths.get(row)
+        )
+        
+    def directory(self, row):
+        return self.directories[self.dir_ids[row]]
+        
+    def name(self, row):
+        """File name of a row without its directory"""
+        path = self.paths[row]
+        return path[path.rfind('/', 0, len(path) - 1) + 1:]
+        
+    def status(self, row):
+        """Two-letter code as in `git status --short`, e.g. 'M ', ' D', '??'"""
+        return self.codes[2 * row:2 * row + 2].decode('ascii').replace('.', ' ')
+        
+    def is_stageable(self, row):
+        """Whether `git add` would change the index (see git_staging.paths_to_stage)"""
+        kind = self.kinds[row]
+        if kind == _IGNORED:
+            return False
+        return kind in (_UNTRACKED, _UNMERGED) or self.codes[2 * row + 1] != ord('.')
+        
+    def _category_test(self, category):
+        kinds, codes = self.kinds, self.codes
+        unchanged = ord('.')
+        if category == STAGED:
+            return lambda row: kinds[row] <= _RENAMED and codes[2 * row] != unchanged
+        if category == UNSTAGED:
+            return lambda row: kinds[row] <= _RENAMED and codes[2 * row + 1] != unchanged
+        if category == UNTRACKED:
+            return lambda row: kinds[row] == _UNTRACKED
+        if category == CONFLICTED:
+            return lambda row: kinds[row] == _UNMERGED
+        if category == ALL:
+            return lambda row: kinds[row] != _IGNORED
+        raise ValueError(f"Unknown status category: {category}")
+        
+    def filter(self, query='', category=ALL):
+        """
+        Rows in a category whose path contains query
+        
+        Args:
+            query (str): Case-insensitive substring of the path; empty matches all
+            category (str): One of CATEGORIES; ALL leaves out ignored files
+            
+        Returns:
+            array: matching rows in git's order
+        """
+        test = self._category_test(category)
+        query = query.strip().lower()
+        paths = self.paths
+        if query:
+            return array('I', (row for row in range(len(paths)) if query in paths[row].lower() and test(row)))
+        return array('I', (row for row in range(len(paths)) if test(row)))
+        
+    def sort(self, rows, key=SORT_PATH, descending=False):
+        """
+        Order rows by path or by status code (then path)
+        
+        Returns:
+            array: the rows in the new order
+        """
+        if key not in (SORT_PATH, SORT_STATUS):
+            raise ValueError(f"Unknown sort key: {key}")
+        order = sorted(rows, key=self.paths.__getitem__, reverse=descending)
+        if key == SORT_STATUS:
+            # Stable second pass: rows with equal codes stay in path order
+            codes = self.codes
+            order.sort(key=lambda row: codes[2 * row] << 8 | codes[2 * row + 1], reverse=descending)
+        return array('I', order)
+        
+    def group_by_directory(self, rows):
+        """
+        Split rows by directory, keeping their order within each directory
+        
+        Returns:
+            list: (directory id, array of rows) in order of first appearance
+        """
+        groups = {}
+        dir_ids = self.dir_ids
+        for row in rows:
+            dir_id = dir_ids[row]
+            group = groups.get(dir_id)
+            if group is None:
+                group = groups[dir_id] = array('I')
+            group.append(row)
+        return list(groups.items())
+        
+    def kind_counts(self, rows):
+        """Number of rows per kind, e.g. {'changed': 120, 'untracked': 3}"""
+        counts = [0] * len(KINDS)
+        kinds = self.kinds
+        for row in rows:
+            counts[kinds[row]] += 1
+        return {kind: count for kind, count in zip(KINDS, counts) if count}
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+In-process resolution of external tools such as git and docker
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+
+class ToolInfo:
+    """Resolved location and version of an external tool"""
+    
+    def __init__(self, name, path, version=None):
+        self.name = name
+        self.path = path
+        self.version = version
+        
+    @property
+    def available(self):
+        return self.path is not None
+        
+    def __repr__(self):
+        return f"ToolInfo({self.name!r}, path={self.path!r}, version={self.version!r})"
+
+class ToolResolver:
+    """
+    Memoized replacement for spawning which/where
+    
+    Lookups are cached per command and keyed on the current PATH (and
+    PATHEXT on Windows); the cache is dropped automatically as soon as
+    either variable changes. Versions are queried at most once per
+    resolved binary for the lifetime of the process.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._env_key = None
+        self._paths = {}
+        self._versions = {}
+        
+    def _env(self):
+        """Environment values that affect resolution"""
+        return os.environ.get('PATH', ''), os.environ.get('PATHEXT', '')
+        
+    def which(self, command):
+        """
+        Resolve a command to the absolute path of its executable
+        
+        Args:
+            command (str): Command name, e.g. 'git'
+            
+        Returns:
+            str: Path to the executable, or None if not found
+        """
+        env_key = self._env()
+        with self._lock:
+            if env_key != self._env_key:
+                self._paths.clear()
+                self._env_key = env_key
+            if command in self._paths:
+                return self._paths[command]
+                
+        path = shutil.which(command, path=env_key[0])
+        
+        with self._lock:
+            if env_key == self._env_key:
+                self._paths[command] = path
+        return path
+        
+    def is_available(self, command):
+        """Check if a command can be found on PATH"""
+        return self.which(command) is not None
+        
+    def version(self, command):
+        """
+        Return the first line of `<command> --version`
+        
+        The version is queried once per resolved binary and cached for the
+        rest of the session.
+        """
+        path = self.which(command)
+        if path is None:
+            return None
+            
+        with self._lock:
+            if path in self._versions:
+                return self._versions[path]
+                
+        try:
+            result = subprocess.run(
+                [path, '--version'],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            lines = (result.stdout or result.stderr).strip().splitlines()
+            version = lines[0] if lines else None
+        except Exception:
+            version = None
+            
+        with self._lock:
+            self._versions[path] = version
+        return version
+        
+    def info(self, command):
+        """Return a ToolInfo with the resolved path and version"""
+        return ToolInfo(command, self.which(command), self.version(command))
+        
+    def invalidate(self):
+        """Forget all cached paths and versions"""
+        with self._lock:
+            self._paths.clear()
+            self._versions.clear()
+            self._env_key = None
+
+# Shared resolver so every CommandRunner benefits from the same cache
+tool_resolver = ToolResolver()
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Chrome trace-event recording of UI actions and commands
+"""
+
+import collections
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Environment variable naming the file a trace is written to on exit
+TRACE_ENV_VAR = 'DEVTERM_TRACE'
+
+class Tracer:
+    """
+    Recorder of spans in the Chrome/Perfetto trace-event format
+    
+    While disabled, span() and traced functions cost a single attribute
+    check. While enabled, each span becomes a complete ("X") event carrying
+    the thread it ran on, so a trace loaded into chrome://tracing or
+    ui.perfetto.dev shows button handlers, background tasks, subprocesses
+    and log panel updates on one timeline. At most max_events are kept; the
+    oldest are dropped first.
+    """
+    
+    def __init__(self, max_events=500000):
+        self.enabled = False
+        self._events = collections.deque(maxlen=max_events)
+        self._threads = {}
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        
+    def start(self):
+        """Begin recording, discarding any previous trace"""
+        with self._lock:
+            self._events.clear()
+            self._threads.clear()
+            self._origin = time.perf_counter()
+        self.enabled = True
+        
+    def stop(self):
+        """Stop recording; recorded events are kept until the next start()"""
+        self.enabled = False
+        
+    def complete(self, name, category, start, duration, args=None):
+        """
+        Record a finished span
+        
+        Args:
+            name (str): Span name
+            category (str): Category, e.g. 'ui' or 'subprocess'
+            start (float): time.perf_counter() value when the span began
+            duration (float): Span length in seconds
+            args (dict): Extra values shown with the span
+        """
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self._origin) * 1e6,
+            'dur': duration * 1e6,
+            'pid': self._pid,
+            'tid': thread.ident,
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append(event)
+            
+    @contextmanager
+    def _span(self, name, category, args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start, time.perf_counter() - start, args)
+            
+    def span(self, name, category='app', **args):
+        """Context manager recording the enclosed block as a span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, args)
+        
+    def events(self):
+        """Recorded events, including thread name metadata"""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in threads.items()
+        ]
+        return metadata + events
+        
+    def to_json(self):
+        """Trace as a JSON document for chrome://tracing or Perfetto"""
+        return json.dumps({'traceEvents': self.events(), 'displayTimeUnit': 'ms'})
+        
+    def write(self, path):
+        """Write the trace to path"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+
+class _NullSpan:
+    """Reusable no-op context manager used while tracing is off"""
+    
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+# Shared tracer used throughout the application
+tracer = Tracer()
+
+def traced(func=None, name=None, category='ui'):
+    """
+    Decorator recording every call of func as a span
+    
+    Usable bare (@traced) or with arguments (@traced(category='slot')).
+    The span is named after the function's qualified name by default.
+    """
+    if func is None:
+        return functools.partial(traced, name=name, category=category)
+        
+    span_name = name or func.__qualname__
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not tracer.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.complete(span_name, category, start, time.perf_counter() - start)
+            
+    return wrapper
+
+def trace_from_environment():
+    """
+    Start tracing if DEVTERM_TRACE names an output file
+    
+    Returns:
+        str: The output path, or None if tracing was not requested
+    """
+    path = os.environ.get(TRACE_ENV_VAR)
+    if not path:
+        return None
+    tracer.start()
+    return path
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Branch picker for repositories with tens of thousands of branches
+"""
+
+import datetime
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListView, QAbstractItemView
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer, Signal
+from PySide6.QtGui import QBrush, QColor, QFont
+
+from core.branch_index import BranchIndex, display_name
+
+class BranchListModel(QAbstractListModel):
+    """
+    List model over a BranchIndex
+    
+    Rows are exposed to the view in FETCH_BATCH chunks through
+    canFetchMore/fetchMore, so appending or filtering 40k branches only
+    creates view rows for what has actually been scrolled to.
+    """
+    
+    FETCH_BATCH = 200
+    BranchRole = Qt.UserRole + 1
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index_ = BranchIndex()
+        self._rows = []     # Rows of index_ matching the filter, in display order
+        self._exposed = 0   # Number of _rows the view has been told about
+        self._query = ''
+        self._bold = QFont()
+        self._bold.setBold(True)
+        self._remote_brush = QBrush(QColor('#6c757d'))
+        
+    def total_count(self):
+        """Number of branches loaded, regardless of the filter"""
+        return len(self.index_)
+        
+    def match_count(self):
+        """Number of branches matching the filter"""
+        return len(self._rows)
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._exposed
+        
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._exposed < len(self._rows)
+        
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH, len(self._rows) - self._exposed)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._exposed, self._exposed + count - 1)
+        self._exposed += count
+        self.endInsertRows()
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._exposed:
+            return None
+        branch = self.index_.branches[self._rows[index.row()]]
+        if role == Qt.DisplayRole:
+            return display_name(branch)
+        if role == self.BranchRole:
+            return branch
+        if role == Qt.ToolTipRole:
+            committed = datetime.datetime.fromtimestamp(branch.committed).strftime('%Y-%m-%d %H:%M')
+            return f"{branch.refname}\nLast commit: {committed}"
+        if role == Qt.FontRole and branch.is_head:
+            return self._bold
+        if role == Qt.ForegroundRole and branch.remote:
+            return self._remote_brush
+        return None
+        
+    def clear(self):
+        self.beginResetModel()
+        self.index_.clear()
+        self._rows = []
+        self._exposed = 0
+        self.endResetModel()
+        
+    def append(self, branches):
+        """Add streamed branches; matching ones become fetchable rows"""
+        matches = self.index_.add(branches)
+        if not matches:
+            return
+        if self._query:
+            # Keep ranking stable: re-rank the whole result set
+            self.set_filter(self._query, force=True)
+        else:
+            self._rows.extend(matches)
+            if self._exposed < self.FETCH_BATCH:
+                self.fetchMore()
+                
+    def set_filter(self, query, force=False):
+        """Show only branches fuzzy-matching query"""
+        query = query.strip()
+        if query == self._query and not force:
+            return
+        self._query = query
+        self.beginResetModel()
+        self._rows = self.index_.search(query)
+        self._exposed = min(self.FETCH_BATCH, len(self._rows))
+        self.endResetModel()
+
+class BranchPicker(QWidget):
+    """
+    Text field filtering a lazily populated branch list
+    
+    The text doubles as a new branch name for "Create Branch"; the list
+    selection (or, without one, the text) is the branch to switch to.
+    """
+    
+    # Milliseconds of typing to coalesce before filtering
+    FILTER_DELAY = 60
+    
+    branch_activated = Signal(object)  # BranchRef double-clicked
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+        
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter branches or type a new branch name...")
+        self.filter_input.setObjectName("branchFilter")
+        layout.addWidget(self.filter_input)
+        
+        self.model = BranchListModel(self)
+        self.list_view = QListView()
+        self.list_view.setObjectName("branchList")
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setMinimumHeight(140)
+        self.list_view.doubleClicked.connect(self._on_double_clicked)
+        layout.addWidget(self.list_view)
+        
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(self.FILTER_DELAY)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self.filter_input.textChanged.connect(self._filter_timer.start)
+        
+    def _apply_filter(self):
+        self.model.set_filter(self.filter_input.text())
+        if self.model.rowCount():
+            self.list_view.setCurrentIndex(self.model.index(0))
+            
+    def _on_double_clicked(self, index):
+        self.branch_activated.emit(self.model.data(index, BranchListModel.BranchRole))
+        
+    def text(self):
+        """Text typed into the filter field"""
+        return self.filter_input.text().strip()
+        
+    def selected_branch(self):
+        """Selected BranchRef, or None"""
+        index = self.list_view.currentIndex()
+        if not index.isValid():
+            return None
+        return self.model.data(index, BranchListModel.BranchRole)
+        
+    def clear(self):
+        self.model.clear()
+        
+    def append(self, branches):
+        self.model.append(branches)
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Diagnostics Tab showing command latency metrics
+"""
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+    QGroupBox, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt, QTimer
+
+from core.metrics import command_metrics
+from core.result_cache import result_cache
+from core.scheduler import command_scheduler
+from core.single_flight import command_flights
+from core.tracing import traced
+
+class DiagnosticsTab(QWidget):
+    """Live view of where time goes: git, the docker daemon or the GUI"""
+    
+    # Milliseconds between refreshes while the tab is visible
+    REFRESH_INTERVAL = 2000
+    
+    COMMAND_COLUMNS = ["Command", "Runs", "p50", "p95", "Max", "Queued p95",
+                       "Failures", "Timeouts", "Cache hits", "Output"]
+    TASK_COLUMNS = ["Task", "Runs", "p50", "p95", "Max", "GUI delivery p95"]
+    
+    def __init__(self, log_panel=None, metrics=None):
+        super().__init__()
+        self.log_panel = log_panel
+        self.metrics = metrics or command_metrics
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        
+        self.init_ui()
+        
+    def init_ui(self):
+        """Initialize the diagnostics layout"""
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(30, 30, 30, 30)
+        main_layout.setSpacing(20)
+        
+        # Toolbar
+        toolbar = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.summary_label.setObjectName("fieldLabel")
+        toolbar.addWidget(self.summary_label)
+        toolbar.addStretch()
+        
+        refresh_button = QPushButton("🔄 Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        toolbar.addWidget(refresh_button)
+        
+        json_button = QPushButton("💾 Export JSON")
+        json_button.clicked.connect(self.export_json)
+        toolbar.addWidget(json_button)
+        
+        prometheus_button = QPushButton("💾 Export Prometheus")
+        prometheus_button.clicked.connect(self.export_prometheus)
+        toolbar.addWidget(prometheus_button)
+        
+        reset_button = QPushButton("🗑️ Reset")
+        reset_button.clicked.connect(self.reset)
+        toolbar.addWidget(reset_button)
+        
+        main_layout.addLayout(toolbar)
+        
+        # Per-command table
+        command_group = QGroupBox("⚙️ Commands (process run time)")
+        command_layout = QVBoxLayout(command_group)
+        self.command_table = self.create_table(self.COMMAND_COLUMNS)
+        command_layout.addWidget(self.command_table)
+        main_layout.addWidget(command_group)
+        
+        # Per-task table
+        task_group = QGroupBox("🖥️ Tasks (submit to result shown)")
+        task_layout = QVBoxLayout(task_group)
+        self.task_table = self.create_table(self.TASK_COLUMNS)
+        task_layout.addWidget(self.task_table)
+        main_layout.addWidget(task_group)
+        
+        self.refresh()
+        
+    def create_table(self, columns):
+        """Create a read-only metrics table"""
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.setMinimumHeight(180)
+        return table
+        
+    def showEvent(self, event):
+        """Refresh periodically only while visible"""
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+        
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+        
+    def refresh(self):
+        """Reload both tables from the metrics registry"""
+        snapshot = self.metrics.snapshot()
+        
+        rows = []
+        for name, stats in snapshot['commands'].items():
+            latency = stats['latency_seconds']
+            rows.append([
+                name,
+                str(stats['runs']),
+                self.format_seconds(latency['p50']),
+                self.format_seconds(latency['p95']),
+                self.format_seconds(latency['max']),
+                self.format_seconds(stats['queue_seconds']['p95']),
+                str(stats['failures']),
+                str(stats['timeouts']),
+                str(stats['cache_hits']),
+                self.format_bytes(stats['output_bytes']),
+            ])
+        self.fill_table(self.command_table, rows)
+        
+        rows = []
+        for name, stats in snapshot['tasks'].items():
+            total = stats['total_seconds']
+            rows.append([
+                name,
+                str(total['count']),
+                self.format_seconds(total['p50']),
+                self.format_seconds(total['p95']),
+                self.format_seconds(total['max']),
+                self.format_seconds(stats['delivery_seconds']['p95']),
+            ])
+        self.fill_table(self.task_table, rows)
+        
+        tools = command_scheduler.stats().values()
+        running = sum(tool['running'] for tool in tools)
+        queued = sum(tool['queued'] for tool in tools)
+        self.summary_label.setText(
+            f"Running: {running} · Queued: {queued} · "
+            f"Cache: {result_cache.hits} hits / {result_cache.misses} misses · "
+            f"Shared in-flight: {command_flights.coalesced}"
+        )
+        
+    def fill_table(self, table, rows):
+        """Replace the contents of a table"""
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+                
+    @staticmethod
+    def format_seconds(seconds):
+        if seconds < 1:
+            return f"{seconds * 1000:.0f} ms"
+        return f"{seconds:.2f} s"
+        
+    @staticmethod
+    def format_bytes(count):
+        for unit in ("B", "KB", "MB"):
+            if count < 1024:
+                return f"{count:.0f} {unit}"
+            count /= 1024
+        return f"{count:.1f} GB"
+        
+    def export_json(self):
+        """Save the metrics as JSON"""
+        self.export("devterm-metrics.json", "JSON (*.json)", self.metrics.to_json())
+        
+    def export_prometheus(self):
+        """Save the metrics in Prometheus text format"""
+        self.export("devterm-metrics.prom", "Prometheus (*.prom *.txt)", self.metrics.to_prometheus())
+        
+    def export(self, default_name, file_filter, content):
+        """Ask for a file name and write content to it"""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", default_name, file_filter)
+        if not path:
+            return
+            
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not write {path}:\n{e}")
+            return
+            
+        self.log_message(f"📊 Metrics exported to {path}", "#28a745")
+        
+    def reset(self):
+        """Clear collected metrics"""
+        self.metrics.reset()
+        self.refresh()
+        
+    @traced(name='log_panel.append', category='log')
+    def log_message(self, message, color="#6c757d"):
+        """Log message to console if available"""
+        if self.log_panel:
+            import datetime
+            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+            self.log_panel.append(f'<span style="color: #6c757d;">[{timestamp}]</span> <span style="color: {color};">{message}</span>')
\ No newline at end of file
@@ -0,0 +1,363 @@
+"""
+Review of uncommitted changes, one file at a time
+"""
+
+import os
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QSplitter, QListView, QPlainTextEdit, QLabel,
+    QPushButton, QAbstractItemView
+)
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PySide6.QtGui import QBrush, QColor, QFont, QSyntaxHighlighter, QTextCharFormat
+
+from core.command_runner import CommandResult
+from core.git_diff import DiffCache, DiffFile
+
+class DiffFileModel(QAbstractListModel):
+    """Changed files with their line counts; excluded ones are greyed out"""
+    
+    FileRole = Qt.UserRole + 1
+    
+    def __init__(self, excluded=None, parent=None):
+        super().__init__(parent)
+        self.files = []
+        self.excluded = excluded if excluded is not None else set()
+        self._excluded_brush = QBrush(QColor('#adb5bd'))
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.files)
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        diff_file = self.files[index.row()]
+        if role == Qt.DisplayRole:
+            if diff_file.binary:
+                counts = "binary"
+            elif diff_file.untracked:
+                counts = "new"
+            else:
+                counts = f"+{diff_file.added} −{diff_file.deleted}"
+            return f"{diff_file.path}  ({counts})"
+        if role == self.FileRole:
+            return diff_file
+        if role == Qt.ToolTipRole:
+            tip = f"{diff_file.orig_path} → {diff_file.path}" if diff_file.orig_path else diff_file.path
+            if diff_file.path in self.excluded:
+                tip += "\nExcluded from the commit"
+            return tip
+        if role == Qt.ForegroundRole and diff_file.path in self.excluded:
+            return self._excluded_brush
+        return None
+        
+    def set_files(self, files):
+        self.beginResetModel()
+        self.files = files
+        self.endResetModel()
+        
+    def row_of(self, path):
+        """Row of the file with this path, or None"""
+        for row, diff_file in enumerate(self.files):
+            if diff_file.path == path:
+                return row
+        return None
+
+class DiffHighlighter(QSyntaxHighlighter):
+    """Colours added, removed, hunk header and file header lines"""
+    
+    def __init__(self, document):
+        super().__init__(document)
+        self._formats = {}
+        for key, color, bold in (('+', '#1e7e34', False), ('-', '#c82333', False),
+                                 ('@', '#6f42c1', False), ('header', '#495057', True)):
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(color))
+            if bold:
+                text_format.setFontWeight(QFont.Bold)
+            self._formats[key] = text_format
+            
+    def highlightBlock(self, text):
+        if text.startswith(('diff --git', '+++', '---', 'index ', 'new file', 'deleted file',
+                            'rename ', 'similarity ')):
+            key = 'header'
+        elif text.startswith('@@'):
+            key = '@'
+        elif text.startswith(('+', '-')):
+            key = text[0]
+        else:
+            return
+        self.setFormat(0, len(text), self._formats[key])
+
+class DiffView(QWidget):
+    """
+    File list from `git diff --numstat`, hunks loaded per selected file
+    
+    Opening the view only reads line counts. A file's diff is read when
+    it is selected, and at most MAX_BYTES of it, so one huge file cannot
+    flood the editor. Binary files are never read. Files with more than
+    LARGE_CHANGE_LINES changed lines (or untracked files over
+    LARGE_FILE_BYTES) are skipped until "Load anyway" is clicked, which
+    reads up to FORCED_MAX_BYTES. Loaded diffs are kept in a DiffCache
+    keyed by the working tree file's stat, so going back to a file is
+    instant while edits are picked up; the cache is dropped whenever
+    the commit compared against changes.
+    
+    Args:
+        git_ops (GitOperations): Source of file lists and diffs
+        async_runner (AsyncCommandRunner): Runs git off the UI thread
+        excluded (set): Paths left out of the commit; shown greyed out
+    """
+    
+    MAX_BYTES = 256 * 1024
+    FORCED_MAX_BYTES = 4 * 1024 * 1024
+    LARGE_CHANGE_LINES = 5000
+    LARGE_FILE_BYTES = 1024 * 1024
+    
+    def __init__(self, git_ops, async_runner, excluded=None, parent=None):
+        super().__init__(parent)
+        self.git_ops = git_ops
+        self.async_runner = async_runner
+        self.repo_path = None
+        self.top_level = None       # Working tree root; git reports paths relative to it
+        self.revision = 'HEAD'
+        self.cache = DiffCache()
+        self._base = None           # (repo, revision, HEAD oid) the cached diffs were read against
+        self._generation = 0        # Bumped on every load; older results are ignored
+        self._files_handle = None
+        self._diff_handle = None
+        self._shown = None          # DiffFile whose diff is wanted in the editor
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+        
+        splitter = QSplitter(Qt.Horizontal)
+        self.model = DiffFileModel(excluded, self)
+        self.file_list = QListView()
+        self.file_list.setObjectName("diffFileList")
+        self.file_list.setModel(self.model)
+        self.file_list.setUniformItemSizes(True)
+        self.file_list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.file_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.file_list.selectionModel().currentChanged.connect(self._on_current_changed)
+        splitter.addWidget(self.file_list)
+        
+        diff_panel = QWidget()
+        diff_layout = QVBoxLayout(diff_panel)
+        diff_layout.setContentsMargins(0, 0, 0, 0)
+        diff_layout.setSpacing(6)
+        header_layout = QHBoxLayout()
+        self.file_label = QLabel("Select a file to see its changes")
+        self.file_label.setObjectName("diffFileLabel")
+        header_layout.addWidget(self.file_label, 1)
+        self.load_anyway_button = QPushButton("Load anyway")
+        self.load_anyway_button.setObjectName("secondaryButton")
+        self.load_anyway_button.clicked.connect(lambda: self.show_file(self._shown, force=True))
+        self.load_anyway_button.hide()
+        header_layout.addWidget(self.load_anyway_button)
+        diff_layout.addLayout(header_layout)
+        
+        self.diff_text = QPlainTextEdit()
+        self.diff_text.setObjectName("diffText")
+        self.diff_text.setReadOnly(True)
+        self.diff_text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        mono = QFont('monospace')
+        mono.setStyleHint(QFont.Monospace)
+        self.diff_text.setFont(mono)
+        self.highlighter = DiffHighlighter(self.diff_text.document())
+        diff_layout.addWidget(self.diff_text)
+        splitter.addWidget(diff_panel)
+        splitter.setStretchFactor(0, 1)
+        splitter.setStretchFactor(1, 3)
+        splitter.setMinimumHeight(300)
+        layout.addWidget(splitter)
+        
+        self.summary_label = QLabel("Changes not loaded")
+        self.summary_label.setObjectName("diffSummary")
+        layout.addWidget(self.summary_label)
+        
+    def load(self, repo_path, untracked_paths=(), revision='HEAD'):
+        """
+        Read the list of changed files
+        
+        Args:
+            repo_path (str): Path to repository
+            untracked_paths (iterable): Untracked paths to list as new files
+            revision (str): Commit to compare the working tree against
+        """
+        head = self.git_ops.read_head(repo_path)
+        base = (repo_path, revision, head[1]) if head is not None else None
+        if base is None or base != self._base:
+            self.cache.clear()
+        self._base = base
+        self.cancel()
+        self.repo_path = repo_path
+        self.revision = revision
+        untracked_paths = list(untracked_paths)
+        self.summary_label.setText("Loading changed files...")
+        
+        generation = self._generation
+        self._files_handle = self.async_runner.submit(self._read_changes, repo_path, revision)
+        self._files_handle.finished.connect(
+            lambda result: self._on_files_loaded(generation, untracked_paths, result)
+        )
+        
+    def _read_changes(self, repo_path, revision):
+        """Resolve the top level and list the changed files; runs off the UI thread"""
+        top = self.git_ops.top_level(repo_path)
+        if not top.success:
+            return top
+        result = self.git_ops.diff_files(repo_path, revision)
+        if not result.success:
+            return result
+        return CommandResult(True, (top.output.strip(), result.output), result.error)
+        
+    def cancel(self):
+        """Stop reading the file list and the diff in progress"""
+        self._generation += 1
+        for handle in (self._files_handle, self._diff_handle):
+            if handle is not None:
+                handle.cancel()
+        self._files_handle = self._diff_handle = None
+        
+    def _on_files_loaded(self, generation, untracked_paths, result):
+        if generation != self._generation:
+            return
+        self._files_handle = None
+        success, changes, error = result
+        if not success:
+            self.model.set_files([])
+            self.summary_label.setText(f"Changes could not be read: {error.strip()}")
+            return
+        self.top_level, files = changes
+            
+        tracked = {diff_file.path for diff_file in files}
+        files = files + [
+            DiffFile(path, None, None, None, False, True) for path in untracked_paths if path not in tracked
+        ]
+        current = self._shown.path if self._shown is not None else None
+        self.model.set_files(files)
+        added = sum(diff_file.added or 0 for diff_file in files)
+        deleted = sum(diff_file.deleted or 0 for diff_file in files)
+        self.summary_label.setText(f"{len(files):,} files changed, +{added:,} −{deleted:,}")
+        
+        if current is not None and not self.select_path(current):
+            self._shown = None
+            self._show_message("Select a file to see its changes", "")
+            
+    def select_path(self, path):
+        """
+        Select a file in the list, loading its diff
+        
+        Returns:
+            bool: False if the path is not among the changed files
+        """
+        row = self.model.row_of(path)
+        if row is None:
+            return False
+        index = self.model.index(row)
+        if self.file_list.currentIndex() == index:
+            self._on_current_changed(index, index)
+        else:
+            self.file_list.setCurrentIndex(index)
+        return True
+        
+    def _on_current_changed(self, current, _previous):
+        diff_file = self.model.data(current, DiffFileModel.FileRole)
+        if diff_file is not None:
+            self.show_file(diff_file)
+            
+    def _cache_key(self, diff_file, force):
+        # The diff is of the working tree file against the base, which
+        # load() keeps fixed for the cache's lifetime; a file git reports
+        # as deleted has no stat and no content that could change
+        try:
+            stat = os.stat(os.path.join(self.top_level or self.repo_path, diff_file.path))
+            identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+        except FileNotFoundError:
+            if diff_file.untracked:
+                return None
+            identity = None
+        except OSError:
+            return None
+        return (diff_file.path, diff_file.orig_path, identity, force)
+        
+    def _is_large(self, diff_file):
+        if diff_file.untracked:
+            try:
+                return os.path.getsize(os.path.join(self.top_level or self.repo_path, diff_file.path)) > self.LARGE_FILE_BYTES
+            except OSError:
+                return False
+        return (diff_file.added or 0) + (diff_file.deleted or 0) > self.LARGE_CHANGE_LINES
+        
+    def show_file(self, diff_file, force=False):
+        """Show the diff of diff_file, from the cache or read on demand"""
+        if diff_file is None:
+            return
+        self._shown = diff_file
+        self.load_anyway_button.hide()
+        if self._diff_handle is not None:
+            self._diff_handle.cancel()
+            self._diff_handle = None
+            
+        title = f"{diff_file.orig_path} → {diff_file.path}" if diff_file.orig_path else diff_file.path
+        if diff_file.binary:
+            self._show_message(title, "Binary file, not shown")
+            return
+        if diff_file.untracked and diff_file.path.endswith('/'):
+            self._show_message(title, "Untracked directory: all files in it are added on commit")
+            return
+        if not force and self._is_large(diff_file):
+            if diff_file.untracked:
+                size = "a large new file"
+            else:
+                size = f"{diff_file.added + diff_file.deleted:,} changed lines"
+            self._show_message(title, f"Large diff ({size}), not loaded automatically")
+            self.load_anyway_button.show()
+            return
+            
+        key = self._cache_key(diff_file, force)
+        cached = self.cache.get(key) if key is not None else None
+        if cached is not None:
+            self._render(title, cached, force)
+            return
+            
+        self._show_message(title, "Loading diff...")
+        generation = self._generation
+        self._diff_handle = self.async_runner.submit(
+            self.git_ops.file_diff, self.repo_path, diff_file.path, self.revision, diff_file.orig_path,
+            diff_file.untracked, self.FORCED_MAX_BYTES if force else self.MAX_BYTES
+        )
+        self._diff_handle.finished.connect(
+            lambda result: self._on_diff_loaded(generation, diff_file, key, title, force, result)
+        )
+        
+    def _on_diff_loaded(self, generation, diff_file, key, title, force, result):
+        if generation != self._generation or diff_file is not self._shown or result.cancelled:
+            return
+        self._diff_handle = None
+        success, diff, error = result
+        if not success:
+            self._show_message(title, f"Diff could not be read: {error.strip()}")
+            return
+        if key is not None:
+            self.cache.put(key, diff)
+        self._render(title, diff, force)
+        
+    def _render(self, title, diff, force):
+        if diff.binary:
+            self._show_message(title, "Binary file, not shown")
+            return
+        text = diff.text
+        if diff.truncated:
+            limit = (self.FORCED_MAX_BYTES if force else self.MAX_BYTES) // 1024
+            text += f"\n\n... diff cut off after {limit} KiB"
+            if not force:
+                self.load_anyway_button.show()
+        self.file_label.setText(title)
+        self.diff_text.setPlainText(text or "No textual changes")
+        
+    def _show_message(self, title, message):
+        self.file_label.setText(title)
+        self.diff_text.setPlainText(message)
\ No newline at end of file
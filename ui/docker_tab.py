@@ -2,28 +2,33 @@
 Professional Docker Management Tab with Clean Layout
 """
 
+import html
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
     QLabel, QLineEdit, QComboBox, QFileDialog, QMessageBox,
     QGroupBox, QListWidget, QSpinBox, QGridLayout, QFrame,
-    QSizePolicy, QTextEdit
+    QSizePolicy, QTextEdit, QAbstractItemView
 )
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QFont
 
 from core.docker_operations import DockerOperations
-from core.command_runner import CommandRunner
+from core.async_runner import AsyncCommandRunner
+from core.tracing import traced
 
 class DockerTab(QWidget):
     """Professional Docker management tab with clean, organized layout"""
     
-    def __init__(self, log_panel=None):
+    def __init__(self, log_panel=None, docker_ops=None):
         super().__init__()
         self.log_panel = log_panel
-        self.docker_ops = DockerOperations()
-        self.command_runner = CommandRunner()
+        self.docker_ops = docker_ops or DockerOperations()
+        self.async_runner = AsyncCommandRunner(self.docker_ops.runner)
+        self.build_handle = None
         
         self.init_ui()
+        self.report_tool_info()
         
     def init_ui(self):
         """Initialize the professional UI layout"""
@@ -41,7 +46,7 @@ class DockerTab(QWidget):
         main_layout.addStretch()
         
         # Load initial data
-        self.refresh_containers()
+        self.refresh_containers(background=True)
         
     def create_build_section(self, parent_layout):
         """Create the image building section"""
@@ -238,6 +243,7 @@ class DockerTab(QWidget):
         self.container_list = QListWidget()
         self.container_list.setObjectName("containerList")
         self.container_list.setMinimumHeight(150)
+        self.container_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         grid_layout.addWidget(self.container_list, 1, 0, 1, 3)
         
         # Action buttons
@@ -369,6 +375,7 @@ class DockerTab(QWidget):
             }
         """)
         
+    @traced
     def browse_dockerfile(self):
         """Browse for Dockerfile or directory"""
         # Try to select a Dockerfile first
@@ -392,8 +399,14 @@ class DockerTab(QWidget):
                 self.dockerfile_input.setText(directory_path)
                 self.log_message(f"📁 Selected directory: {directory_path}", "#17a2b8")
                 
+    @traced
     def build_image(self):
-        """Build Docker image with detailed progress"""
+        """Build Docker image with detailed progress, or cancel a running build"""
+        if self.build_handle is not None:
+            self.log_message("⏹️ Cancelling build...", "#ffc107")
+            self.build_handle.cancel()
+            return
+            
         image_name = self.image_name_input.text().strip()
         dockerfile_path = self.dockerfile_input.text().strip()
         build_options = self.build_options_input.text().strip()
@@ -406,51 +419,60 @@ class DockerTab(QWidget):
             QMessageBox.warning(self, "Input Required", "Please select Dockerfile path")
             return
             
-        # Update UI state
-        self.build_button.setEnabled(False)
-        self.build_button.setText("🔨 Building...")
+        # Update UI state; the button cancels the build while it runs
+        self.build_button.setText("⏹️ Cancel Build")
         
         self.log_message(f"🏗️ Starting build for image: {image_name}", "#17a2b8")
         self.log_message(f"📄 Using Dockerfile: {dockerfile_path}", "#6c757d")
         
-        # Build command
-        cmd = ["docker", "build", "-t", image_name]
-        
         # Add build options if provided
+        extra_args = None
         if build_options:
-            cmd.extend(build_options.split())
+            extra_args = build_options.split()
             self.log_message(f"⚙️ Build options: {build_options}", "#6c757d")
             
-        cmd.append(dockerfile_path)
+        # Run build command in the background
+        handle = self.async_runner.submit_streaming(
+            self.docker_ops.build_image, image_name, dockerfile_path, extra_args=extra_args
+        )
+        handle.output.connect(self.log_output)
+        handle.finished.connect(self.on_build_finished)
+        self.build_handle = handle
         
-        # Run build command
-        success, output, error = self.command_runner.run_command(cmd, timeout=600)
+    def on_build_finished(self, result):
+        """Report the outcome of build_image"""
+        success, output, error = result
         
         # Reset UI state
-        self.build_button.setEnabled(True)
+        self.build_handle = None
         self.build_button.setText("🔨 Build Image")
         
         if success:
             self.log_message("✅ Image built successfully!", "#28a745")
-            if output:
-                # Show last few lines of build output
-                lines = output.strip().split('\n')
-                for line in lines[-5:]:
-                    if line.strip():
-                        self.log_message(f"  {line}", "#6c757d")
+        elif getattr(result, 'cancelled', False):
+            self.log_message("⏹️ Build cancelled", "#ffc107")
         else:
-            self.log_message(f"❌ Build failed: {error}", "#dc3545")
+            # Full build output has already been streamed to the console
+            reason = error.strip().split('\n')[-1] if error.strip() else "unknown error"
+            self.log_message(f"❌ Build failed: {reason}", "#dc3545")
             
+    @traced
     def refresh_images(self):
         """Refresh available Docker images"""
         self.log_message("🔄 Refreshing Docker images...", "#17a2b8")
         
-        success, output, error = self.command_runner.run_command(
-            ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"]
-        )
+        self.refresh_images_button.setEnabled(False)
+        handle = self.async_runner.submit(self.docker_ops.list_images)
+        handle.finished.connect(self.on_images_loaded)
+        
+    def on_images_loaded(self, result):
+        """Show the images found by refresh_images"""
+        self.refresh_images_button.setEnabled(True)
+        success, output, error = result
         
         if success:
-            images = [line.strip() for line in output.split('\n') if line.strip() and line.strip() != "<none>:<none>"]
+            images = [line.split('|')[0].strip() for line in output.split('\n') if line.strip()]
+            images = [image for image in images if image != "<none>:<none>"]
             if images:
                 # Update the input with first image as suggestion
                 self.run_image_input.setText(images[0])
@@ -465,6 +487,7 @@ class DockerTab(QWidget):
         else:
             self.log_message(f"❌ Failed to get images: {error}", "#dc3545")
             
+    @traced
     def run_container(self):
         """Run Docker container with comprehensive options"""
         image = self.run_image_input.text().strip()
@@ -484,23 +507,29 @@ class DockerTab(QWidget):
         self.log_message(f"🚀 Starting container from image: {image}", "#17a2b8")
         self.log_message(f"🔌 Port mapping: {host_port} → {container_port}", "#6c757d")
         
-        # Build run command
-        cmd = ["docker", "run", "-d", "-p", f"{host_port}:{container_port}"]
-        
         # Add container name if provided
         if container_name:
-            cmd.extend(["--name", container_name])
             self.log_message(f"🏷️ Container name: {container_name}", "#6c757d")
             
         # Add additional options if provided
+        extra_args = None
         if options:
-            cmd.extend(options.split())
+            extra_args = options.split()
             self.log_message(f"⚙️ Additional options: {options}", "#6c757d")
             
-        cmd.append(image)
+        # Run command in the background
+        handle = self.async_runner.submit(
+            self.docker_ops.run_container,
+            image,
+            ports={host_port: container_port},
+            name=container_name or None,
+            extra_args=extra_args
+        )
+        handle.finished.connect(lambda result: self.on_container_started(result, host_port))
         
-        # Run command
-        success, output, error = self.command_runner.run_command(cmd)
+    def on_container_started(self, result, host_port):
+        """Report the outcome of run_container"""
+        success, output, error = result
         
         # Reset UI state
         self.run_button.setEnabled(True)
@@ -511,21 +540,27 @@ class DockerTab(QWidget):
             self.log_message(f"✅ Container started successfully!", "#28a745")
             self.log_message(f"🆔 Container ID: {container_id}", "#6c757d")
             self.log_message(f"🌐 Access at: http://localhost:{host_port}", "#17a2b8")
-            self.refresh_containers()
+            self.refresh_containers(background=True)
         else:
             self.log_message(f"❌ Failed to run container: {error}", "#dc3545")
             
-    def refresh_containers(self):
+    @traced
+    def refresh_containers(self, background=False):
         """Refresh running containers list"""
-        success, output, error = self.command_runner.run_command([
-            "docker", "ps", 
-            "--format", "{{.ID}} | {{.Image}} | {{.Status}} | {{.Names}} | {{.Ports}}"
-        ])
+        self.refresh_containers_button.setEnabled(False)
+        submit = self.async_runner.submit_background if background else self.async_runner.submit
+        handle = submit(self.docker_ops.list_containers)
+        handle.finished.connect(self.on_containers_loaded)
+        
+    def on_containers_loaded(self, result):
+        """Populate the container list from refresh_containers"""
+        self.refresh_containers_button.setEnabled(True)
+        success, output, error = result
         
         self.container_list.clear()
         
         if success:
-            containers = [line.strip() for line in output.split('\n') if line.strip()]
+            containers = [' | '.join(line.strip().split('|')) for line in output.split('\n') if line.strip()]
             for container in containers:
                 self.container_list.addItem(container)
                 
@@ -537,26 +572,51 @@ class DockerTab(QWidget):
             self.container_list.addItem(f"Error: {error}")
             self.log_message(f"❌ Failed to list containers: {error}", "#dc3545")
             
+    def selected_container_ids(self):
+        """IDs of the selected containers, ignoring placeholder rows"""
+        items = self.container_list.selectedItems()
+        if not items and self.container_list.currentItem():
+            items = [self.container_list.currentItem()]
+            
+        container_ids = []
+        for item in items:
+            text = item.text()
+            if text in ["No running containers", ""] or text.startswith("Error:"):
+                continue
+            container_ids.append(text.split(' | ')[0])
+        return container_ids
+        
+    @traced
     def stop_container(self):
-        """Stop selected container"""
-        current_item = self.container_list.currentItem()
-        if not current_item or current_item.text() in ["No running containers", ""] or current_item.text().startswith("Error:"):
+        """Stop the selected containers in parallel"""
+        container_ids = self.selected_container_ids()
+        if not container_ids:
             QMessageBox.warning(self, "Selection Required", "Please select a container to stop")
             return
             
-        container_info = current_item.text()
-        container_id = container_info.split(' | ')[0]
+        self.log_message(f"⏹️ Stopping container: {', '.join(container_ids)}", "#ffc107")
         
-        self.log_message(f"⏹️ Stopping container: {container_id}", "#ffc107")
+        pipeline = self.docker_ops.stop_containers_pipeline(container_ids)
+        handle = self.async_runner.submit(pipeline.run)
+        handle.finished.connect(self.on_container_stopped)
         
-        success, output, error = self.command_runner.run_command(["docker", "stop", container_id])
-        
-        if success:
-            self.log_message(f"✅ Container stopped: {container_id}", "#28a745")
-            self.refresh_containers()
-        else:
-            self.log_message(f"❌ Failed to stop container: {error}", "#dc3545")
+    def on_container_stopped(self, result):
+        """Report the outcome of stop_container"""
+        if not hasattr(result, 'steps'):
+            self.log_message(f"❌ Failed to stop container: {result[2]}", "#dc3545")
+            return
             
+        for step in result.steps:
+            container_id = step.name.split(' ', 1)[1]
+            if step.status == 'succeeded':
+                self.log_message(f"✅ Container stopped: {container_id}", "#28a745")
+            else:
+                self.log_message(f"❌ Failed to stop container {container_id}: {step.result[2]}", "#dc3545")
+                
+        self.log_message(f"⏱️ {result.timing_summary()}", "#6c757d")
+        self.refresh_containers(background=True)
+            
+    @traced
     def restart_container(self):
         """Restart selected container"""
         current_item = self.container_list.currentItem()
@@ -569,45 +629,64 @@ class DockerTab(QWidget):
         
         self.log_message(f"🔄 Restarting container: {container_id}", "#17a2b8")
         
-        success, output, error = self.command_runner.run_command(["docker", "restart", container_id])
+        handle = self.async_runner.submit(self.docker_ops.restart_container, container_id)
+        handle.finished.connect(lambda result: self.on_container_restarted(result, container_id))
+        
+    def on_container_restarted(self, result, container_id):
+        """Report the outcome of restart_container"""
+        success, output, error = result
         
         if success:
             self.log_message(f"✅ Container restarted: {container_id}", "#28a745")
-            self.refresh_containers()
+            self.refresh_containers(background=True)
         else:
             self.log_message(f"❌ Failed to restart container: {error}", "#dc3545")
             
+    @traced
     def remove_container(self):
-        """Remove selected container"""
-        current_item = self.container_list.currentItem()
-        if not current_item or current_item.text() in ["No running containers", ""] or current_item.text().startswith("Error:"):
+        """Stop and remove the selected containers"""
+        container_ids = self.selected_container_ids()
+        if not container_ids:
             QMessageBox.warning(self, "Selection Required", "Please select a container to remove")
             return
             
-        container_info = current_item.text()
-        container_id = container_info.split(' | ')[0]
-        
         reply = QMessageBox.question(
             self,
             "Confirm Removal",
-            f"Are you sure you want to remove container {container_id}?\n\nThis action cannot be undone.",
+            f"Are you sure you want to remove container {', '.join(container_ids)}?\n\nThis action cannot be undone.",
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
         )
         
         if reply == QMessageBox.Yes:
-            self.log_message(f"🗑️ Removing container: {container_id}", "#dc3545")
+            self.log_message(f"🗑️ Removing container: {', '.join(container_ids)}", "#dc3545")
             
-            # Stop first, then remove
-            self.command_runner.run_command(["docker", "stop", container_id])
-            success, output, error = self.command_runner.run_command(["docker", "rm", container_id])
+            # Each container is stopped first, then removed
+            pipeline = self.docker_ops.remove_containers_pipeline(container_ids)
+            handle = self.async_runner.submit(pipeline.run)
+            handle.finished.connect(self.on_container_removed)
             
-            if success:
+    def on_container_removed(self, result):
+        """Report the outcome of remove_container"""
+        if not hasattr(result, 'steps'):
+            self.log_message(f"❌ Failed to remove container: {result[2]}", "#dc3545")
+            return
+            
+        for step in result.steps:
+            action, container_id = step.name.split(' ', 1)
+            if action != 'rm':
+                continue
+            if step.status == 'succeeded':
                 self.log_message(f"✅ Container removed: {container_id}", "#28a745")
-                self.refresh_containers()
+            elif step.result is not None:
+                self.log_message(f"❌ Failed to remove container {container_id}: {step.result[2]}", "#dc3545")
             else:
-                self.log_message(f"❌ Failed to remove container: {error}", "#dc3545")
+                self.log_message(f"❌ Container {container_id} was not removed ({step.status})", "#dc3545")
                 
+        self.log_message(f"⏱️ {result.timing_summary()}", "#6c757d")
+        self.refresh_containers(background=True)
+            
+    @traced
     def view_logs(self):
         """View logs for selected container"""
         current_item = self.container_list.currentItem()
@@ -620,21 +699,44 @@ class DockerTab(QWidget):
         
         self.log_message(f"📋 Fetching logs for container: {container_id}", "#17a2b8")
         
-        success, output, error = self.command_runner.run_command([
-            "docker", "logs", "--tail", "50", container_id
-        ])
+        self.log_message("--- Container Logs (Last 50 lines) ---", "#6c757d")
+        handle = self.async_runner.submit_streaming(
+            self.docker_ops.get_container_logs, container_id, tail=50
+        )
+        handle.output.connect(self.log_output)
+        handle.finished.connect(self.on_logs_loaded)
+        
+    def on_logs_loaded(self, result):
+        """Close the log block started by view_logs"""
+        success, output, error = result
         
         if success:
-            self.log_message("--- Container Logs (Last 50 lines) ---", "#6c757d")
-            if output.strip():
-                for line in output.strip().split('\n'):
-                    self.log_message(f"  {line}", "#6c757d")
-            else:
+            if not output.strip() and not error.strip():
                 self.log_message("  (No logs available)", "#6c757d")
             self.log_message("--- End of Logs ---", "#6c757d")
         else:
             self.log_message(f"❌ Failed to get logs: {error}", "#dc3545")
             
+    def report_tool_info(self):
+        """Log which docker executable will be used"""
+        handle = self.async_runner.submit_background(self.docker_ops.get_tool_info)
+        handle.finished.connect(self.on_tool_info_loaded)
+        
+    def on_tool_info_loaded(self, info):
+        """Show the result of report_tool_info"""
+        if getattr(info, 'available', False):
+            self.log_message(f"🔧 Using {info.version or info.name} ({info.path})", "#6c757d")
+        else:
+            self.log_message("⚠️ docker was not found in PATH", "#ffc107")
+            
+    @traced(name='log_panel.append', category='log')
+    def log_output(self, lines, color="#6c757d"):
+        """Append a batch of raw command output lines to the console"""
+        if self.log_panel and lines:
+            body = '<br>'.join(f'&nbsp;&nbsp;{html.escape(line)}' for line in lines)
+            self.log_panel.append(f'<span style="color: {color};">{body}</span>')
+            
+    @traced(name='log_panel.append', category='log')
     def log_message(self, message, color="#6c757d"):
         """Log message to console if available"""
         if self.log_panel:
@@ -2,27 +2,54 @@
 Professional Git Operations Tab with Clean Layout
 """
 
+import html
+import os
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
     QLabel, QLineEdit, QComboBox, QFileDialog, QMessageBox,
-    QGroupBox, QGridLayout, QFrame, QSizePolicy
+    QGroupBox, QGridLayout, QFrame, QSizePolicy, QSpinBox, QCheckBox, QProgressBar
 )
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QFont
 
-from core.git_operations import GitOperations
-from core.command_runner import CommandRunner
+from core.git_diff import EMPTY_TREE
+from core.git_operations import CloneOptions, GitOperations
+from core.git_progress import GitProgress
+from core.git_staging import paths_to_stage
+from core.pipeline import FAILED
+from core.async_runner import AsyncCommandRunner
+from core.branch_index import display_name
+from core.repo_watcher import RepoWatcher
+from core.tracing import traced
+from ui.branch_picker import BranchPicker
+from ui.diff_view import DiffView
+from ui.history_view import HistoryView
+from ui.status_view import StatusView
 
 class GitTab(QWidget):
     """Professional Git operations tab with clean, organized layout"""
     
-    def __init__(self, log_panel=None):
+    def __init__(self, log_panel=None, git_ops=None):
         super().__init__()
         self.log_panel = log_panel
-        self.git_ops = GitOperations()
-        self.command_runner = CommandRunner()
+        self.git_ops = git_ops or GitOperations()
+        self.async_runner = AsyncCommandRunner(self.git_ops.runner)
+        self.clone_handle = None
+        self.commit_handle = None
+        self.branches_handle = None
+        self.clone_progress = GitProgress()
+        self.excluded_paths = set()  # Changes the user unticked in the changes list
+        self.snapshot = None  # Latest RepoSnapshot of the working directory
+        self.snapshot_path = None  # Absolute path of the repository self.snapshot describes
+        
+        # Keeps the branch display current when the repository changes outside DevTerm
+        self.repo_watcher = RepoWatcher(self, async_runner=self.async_runner)
+        self.repo_watcher.head_changed.connect(self.on_repo_head_changed)
+        self.repo_watcher.worktree_changed.connect(self.on_repo_worktree_changed)
         
         self.init_ui()
+        self.report_tool_info()
         
     def init_ui(self):
         """Initialize the professional UI layout"""
@@ -35,6 +62,7 @@ class GitTab(QWidget):
         self.create_clone_section(main_layout)
         self.create_commit_section(main_layout)
         self.create_branch_section(main_layout)
+        self.create_history_section(main_layout)
         
         # Add stretch to push content to top
         main_layout.addStretch()
@@ -76,12 +104,59 @@ class GitTab(QWidget):
         self.browse_button.clicked.connect(self.browse_folder)
         grid_layout.addWidget(self.browse_button, 3, 2)
         
+        # Shallow, partial and sparse clone options
+        options_layout = QHBoxLayout()
+        options_layout.setSpacing(15)
+        
+        depth_label = QLabel("Depth:")
+        depth_label.setObjectName("fieldLabel")
+        options_layout.addWidget(depth_label)
+        
+        self.depth_input = QSpinBox()
+        self.depth_input.setRange(0, 1000000)
+        self.depth_input.setSpecialValueText("Full history")
+        self.depth_input.setToolTip("Number of commits to fetch (--depth)")
+        options_layout.addWidget(self.depth_input)
+        
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItem("All objects", None)
+        self.filter_combo.addItem("Blobless (blob:none)", 'blob:none')
+        self.filter_combo.addItem("Treeless (tree:0)", 'tree:0')
+        self.filter_combo.setToolTip("Partial clone: fetch file contents or trees only when needed")
+        options_layout.addWidget(self.filter_combo)
+        
+        self.single_branch_check = QCheckBox("Single branch")
+        self.single_branch_check.setToolTip("Only fetch the default (or given) branch")
+        options_layout.addWidget(self.single_branch_check)
+        
+        self.clone_branch_input = QLineEdit()
+        self.clone_branch_input.setPlaceholderText("Branch (default)")
+        options_layout.addWidget(self.clone_branch_input)
+        
+        self.mirror_check = QCheckBox("Use mirror cache")
+        self.mirror_check.setToolTip(
+            "Keep a mirror under ~/.devterm/mirrors and clone from it, downloading only new objects"
+        )
+        options_layout.addWidget(self.mirror_check)
+        grid_layout.addLayout(options_layout, 4, 0, 1, 3)
+        
+        self.sparse_input = QLineEdit()
+        self.sparse_input.setPlaceholderText("Sparse checkout directories, e.g. src/app docs (empty for everything)")
+        self.sparse_input.setObjectName("sparseInput")
+        grid_layout.addWidget(self.sparse_input, 5, 0, 1, 3)
+        
         # Clone button
         self.clone_button = QPushButton("🚀 Clone Repository")
         self.clone_button.setObjectName("primaryButton")
         self.clone_button.setMinimumHeight(45)
         self.clone_button.clicked.connect(self.clone_repository)
-        grid_layout.addWidget(self.clone_button, 4, 0, 1, 3)
+        grid_layout.addWidget(self.clone_button, 6, 0, 1, 3)
+        
+        self.clone_progress_bar = QProgressBar()
+        self.clone_progress_bar.setRange(0, 100)
+        self.clone_progress_bar.setFormat("%p%")
+        self.clone_progress_bar.hide()
+        grid_layout.addWidget(self.clone_progress_bar, 7, 0, 1, 3)
         
         parent_layout.addWidget(clone_group)
         
@@ -122,6 +197,24 @@ class GitTab(QWidget):
         self.commit_msg_input.setObjectName("commitMsgInput")
         grid_layout.addWidget(self.commit_msg_input, 3, 0, 1, 3)
         
+        # Changes to stage; only ticked paths are added before committing
+        changes_header = QHBoxLayout()
+        changes_label = QLabel("Changes to Commit:")
+        changes_label.setObjectName("fieldLabel")
+        changes_header.addWidget(changes_label)
+        changes_header.addStretch()
+        
+        self.select_all_check = QCheckBox("All")
+        self.select_all_check.setChecked(True)
+        self.select_all_check.clicked.connect(self.select_all_changes)
+        changes_header.addWidget(self.select_all_check)
+        grid_layout.addLayout(changes_header, 4, 0, 1, 3)
+        
+        self.status_view = StatusView(excluded=self.excluded_paths)
+        self.status_view.exclusions_changed.connect(self.on_change_toggled)
+        self.status_view.current_path_changed.connect(self.on_change_selected)
+        grid_layout.addWidget(self.status_view, 5, 0, 1, 3)
+        
         # Action buttons in horizontal layout
         button_layout = QHBoxLayout()
         button_layout.setSpacing(15)
@@ -132,6 +225,22 @@ class GitTab(QWidget):
         self.status_button.clicked.connect(self.check_status)
         button_layout.addWidget(self.status_button)
         
+        # Optimize button
+        self.optimize_button = QPushButton("🧰 Optimize Repository")
+        self.optimize_button.setObjectName("secondaryButton")
+        self.optimize_button.setToolTip(
+            "Enable fsmonitor, untracked cache and manyFiles, repack, and write the "
+            "commit-graph and multi-pack-index"
+        )
+        self.optimize_button.clicked.connect(self.optimize_repository)
+        button_layout.addWidget(self.optimize_button)
+        
+        # Review button
+        self.review_button = QPushButton("🔍 Review Changes")
+        self.review_button.setObjectName("secondaryButton")
+        self.review_button.clicked.connect(self.review_changes)
+        button_layout.addWidget(self.review_button)
+        
         # Commit & Push button
         self.commit_push_button = QPushButton("📤 Commit & Push")
         self.commit_push_button.setObjectName("primaryButton")
@@ -139,7 +248,12 @@ class GitTab(QWidget):
         self.commit_push_button.clicked.connect(self.commit_and_push)
         button_layout.addWidget(self.commit_push_button)
         
-        grid_layout.addLayout(button_layout, 4, 0, 1, 3)
+        grid_layout.addLayout(button_layout, 6, 0, 1, 3)
+        
+        # Diff of the changes, shown by "Review Changes"
+        self.diff_view = DiffView(self.git_ops, self.async_runner, excluded=self.excluded_paths)
+        self.diff_view.hide()
+        grid_layout.addWidget(self.diff_view, 7, 0, 1, 3)
         
         parent_layout.addWidget(commit_group)
         
@@ -168,17 +282,15 @@ class GitTab(QWidget):
         branch_label.setObjectName("fieldLabel")
         grid_layout.addWidget(branch_label, 2, 0, 1, 3)
         
-        self.branch_combo = QComboBox()
-        self.branch_combo.setEditable(True)
-        self.branch_combo.lineEdit().setPlaceholderText("Choose or type branch name...")
-        self.branch_combo.setObjectName("branchCombo")
-        grid_layout.addWidget(self.branch_combo, 3, 0, 1, 2)
+        self.branch_picker = BranchPicker()
+        self.branch_picker.branch_activated.connect(lambda _branch: self.switch_branch())
+        grid_layout.addWidget(self.branch_picker, 3, 0, 1, 2)
         
         self.refresh_branches_button = QPushButton("🔄 Refresh")
         self.refresh_branches_button.setObjectName("secondaryButton")
         self.refresh_branches_button.setFixedWidth(120)
         self.refresh_branches_button.clicked.connect(self.refresh_branches)
-        grid_layout.addWidget(self.refresh_branches_button, 3, 2)
+        grid_layout.addWidget(self.refresh_branches_button, 3, 2, Qt.AlignTop)
         
         # Branch action buttons
         branch_button_layout = QHBoxLayout()
@@ -199,6 +311,25 @@ class GitTab(QWidget):
         
         parent_layout.addWidget(branch_group)
         
+    def create_history_section(self, parent_layout):
+        """Create the commit history section"""
+        history_group = QGroupBox("📜 History")
+        history_group.setObjectName("historyGroup")
+        
+        history_layout = QVBoxLayout(history_group)
+        history_layout.setContentsMargins(25, 30, 25, 25)
+        history_layout.setSpacing(15)
+        
+        self.history_view = HistoryView(self.git_ops, self.async_runner)
+        history_layout.addWidget(self.history_view)
+        
+        self.load_history_button = QPushButton("📜 Load History")
+        self.load_history_button.setObjectName("secondaryButton")
+        self.load_history_button.clicked.connect(self.load_history)
+        history_layout.addWidget(self.load_history_button)
+        
+        parent_layout.addWidget(history_group)
+        
         # Apply section-specific styling
         self.apply_section_styling()
         
@@ -249,6 +380,7 @@ class GitTab(QWidget):
             }
         """)
         
+    @traced
     def browse_folder(self):
         """Browse for destination folder"""
         folder = QFileDialog.getExistingDirectory(
@@ -261,6 +393,7 @@ class GitTab(QWidget):
             self.folder_input.setText(folder)
             self.log_message(f"📁 Selected destination: {folder}", "#17a2b8")
             
+    @traced
     def browse_workdir(self):
         """Browse for working directory"""
         folder = QFileDialog.getExistingDirectory(
@@ -275,20 +408,87 @@ class GitTab(QWidget):
             self.update_current_branch()
             
     def update_current_branch(self):
-        """Update the current branch display"""
+        """Refresh the repository snapshot and the current branch display"""
         workdir = self.workdir_input.text().strip()
         if not workdir:
+            self.snapshot = self.snapshot_path = None
+            self.repo_watcher.stop()
             self.current_branch_display.setText("No repository selected")
             return
             
-        success, output, error = self.command_runner.run_command(
-            ["git", "branch", "--show-current"], 
-            cwd=workdir
-        )
-        
-        if success and output.strip():
-            branch_name = output.strip()
-            self.current_branch_display.setText(f"🌿 {branch_name}")
+        self.repo_watcher.watch(workdir)
+        self.show_head(workdir)
+        self.refresh_snapshot(workdir)
+        
+    def show_head(self, workdir):
+        """Show the HEAD branch read directly from .git, if possible"""
+        # The branch name is read from .git directly and shown at once; the
+        # snapshot then fills in upstream and change counts
+        head = self.git_ops.read_head(workdir)
+        if head is not None:
+            branch, oid = head
+            self.current_branch_display.setText(
+                f"🌿 {branch}" if branch else f"🌿 detached at {(oid or '')[:7]}"
+            )
+            
+    def refresh_snapshot(self, workdir):
+        """Load a new snapshot for the branch display"""
+        handle = self.async_runner.submit(self.git_ops.snapshot, workdir)
+        handle.finished.connect(lambda result: self.on_current_branch_loaded(workdir, result))
+        
+    def on_repo_head_changed(self):
+        """HEAD or refs changed on disk: update the branch, then ahead/behind"""
+        workdir = self.repo_watcher.repo_path
+        if workdir:
+            self.git_ops.runner.invalidate_cache(tool='git', cwd=workdir)
+            self.show_head(workdir)
+            self.refresh_snapshot(workdir)
+            self.refresh_history(workdir)
+            
+    def refresh_history(self, workdir):
+        """Reload a loaded history of workdir if HEAD moved to another commit"""
+        if self.history_view.repo_path is None or os.path.abspath(self.history_view.repo_path) != workdir:
+            return
+        head = self.git_ops.read_head(workdir)
+        if head is not None and head[1] != self.history_view.head_oid:
+            self.history_view.load(self.history_view.repo_path, head_oid=head[1])
+            
+    def load_history(self):
+        """Show the commit history of the working directory"""
+        workdir = self.workdir_input.text().strip()
+        if not workdir:
+            QMessageBox.warning(self, "Warning", "Please select a working directory")
+            return
+            
+        head = self.git_ops.read_head(workdir)
+        if head is not None and head[1] is None:
+            self.history_view.clear("No commits yet")
+            return
+        self.history_view.load(workdir, head_oid=head[1] if head else None)
+        
+    def on_repo_worktree_changed(self):
+        """Index or working tree changed on disk: update the change count"""
+        workdir = self.repo_watcher.repo_path
+        if workdir:
+            self.git_ops.runner.invalidate_cache(tool='git', cwd=workdir)
+            self.refresh_snapshot(workdir)
+        
+    def on_current_branch_loaded(self, workdir, result):
+        """Store the snapshot from update_current_branch and show it"""
+        success, snapshot, error = result
+        self.show_snapshot(snapshot if success else None, workdir)
+        
+    def show_snapshot(self, snapshot, workdir):
+        """Show branch, ahead/behind and change count of the RepoSnapshot of workdir"""
+        self.snapshot = snapshot
+        self.snapshot_path = os.path.abspath(workdir) if snapshot is not None else None
+        
+        if snapshot is not None:
+            text = f"🌿 {snapshot.branch_label()}"
+            if snapshot.entries:
+                text += f" · {len(snapshot.entries)} changes"
+            self.current_branch_display.setText(text)
+            self.show_changes(snapshot)
             self.current_branch_display.setStyleSheet("""
                 background-color: #d4edda;
                 color: #155724;
@@ -310,6 +510,46 @@ class GitTab(QWidget):
                 border: 2px solid #f5c6cb;
             """)
             
+    def show_changes(self, snapshot):
+        """Show the changes of a snapshot, keeping the user's selection"""
+        self.status_view.set_snapshot(snapshot)
+        self.select_all_check.setChecked(not self.excluded_paths)
+        if self.diff_view.isVisible() and self.diff_view.repo_path == self.snapshot_path:
+            self.load_diff(self.diff_view.repo_path, snapshot)
+            
+    def on_change_toggled(self):
+        """Keep the "All" box in step with the changes the user excluded"""
+        self.select_all_check.setChecked(not self.excluded_paths)
+        self.diff_view.file_list.viewport().update()
+        
+    def on_change_selected(self, path):
+        """Show the diff of the change selected in the status view"""
+        if self.diff_view.isVisible():
+            self.diff_view.select_path(path)
+            
+    def review_changes(self):
+        """Show the files about to be committed and their diffs"""
+        workdir = self.workdir_input.text().strip()
+        if not workdir:
+            QMessageBox.warning(self, "Warning", "Please select a working directory")
+            return
+            
+        workdir = os.path.abspath(workdir)
+        snapshot = self.snapshot if self.snapshot_path == workdir else None
+        self.diff_view.show()
+        self.load_diff(workdir, snapshot)
+        
+    def load_diff(self, workdir, snapshot):
+        """Load the diff view's file list; untracked files come from the snapshot"""
+        untracked = [entry.path for entry in snapshot.untracked] if snapshot is not None else []
+        revision = EMPTY_TREE if snapshot is not None and snapshot.is_initial else 'HEAD'
+        self.diff_view.load(workdir, untracked, revision)
+        
+    def select_all_changes(self, checked):
+        """Tick or untick every change that can still be staged"""
+        self.status_view.set_all_checked(checked)
+        
+    @traced
     def check_status(self):
         """Check git status"""
         workdir = self.workdir_input.text().strip()
@@ -319,28 +559,76 @@ class GitTab(QWidget):
             
         self.log_message("📊 Checking repository status...", "#17a2b8")
         
-        success, output, error = self.command_runner.run_command(
-            ["git", "status", "--porcelain"], 
-            cwd=workdir
-        )
+        self.status_button.setEnabled(False)
+        handle = self.async_runner.submit(self.git_ops.snapshot, workdir)
+        handle.finished.connect(lambda result: self.on_status_loaded(workdir, result))
+        
+    def on_status_loaded(self, workdir, result):
+        """Log the outcome of check_status"""
+        self.status_button.setEnabled(True)
+        success, snapshot, error = result
         
         if success:
-            if output.strip():
-                changes = output.strip().split('\n')
-                self.log_message(f"📝 Found {len(changes)} changes:", "#ffc107")
-                for change in changes[:10]:  # Show first 10 changes
-                    self.log_message(f"  {change}", "#6c757d")
-                if len(changes) > 10:
-                    self.log_message(f"  ... and {len(changes) - 10} more", "#6c757d")
+            self.show_snapshot(snapshot, workdir)
+            if snapshot.entries:
+                # The full list is in the status view; log a summary only
+                counts = [
+                    (len(snapshot.staged), "staged"),
+                    (len(snapshot.unstaged), "unstaged"),
+                    (len(snapshot.untracked), "untracked"),
+                    (len(snapshot.conflicted), "conflicted"),
+                ]
+                summary = ', '.join(f"{count} {label}" for count, label in counts if count)
+                self.log_message(f"📝 Found {len(snapshot.entries)} changes ({summary})", "#ffc107")
             else:
                 self.log_message("✨ Working directory is clean", "#28a745")
         else:
             self.log_message(f"❌ Status check failed: {error}", "#dc3545")
             
+    def optimize_repository(self):
+        """Apply the settings and maintenance that keep large repositories fast"""
+        workdir = self.workdir_input.text().strip()
+        if not workdir:
+            QMessageBox.warning(self, "Warning", "Please select a working directory")
+            return
+            
+        self.log_message("🧰 Optimizing repository (timing git status before and after)...", "#17a2b8")
+        self.optimize_button.setEnabled(False)
+        
+        pipeline = self.git_ops.optimize_pipeline(workdir)
+        handle = self.async_runner.submit(pipeline.run)
+        handle.finished.connect(self.on_optimize_finished)
+        
+    def on_optimize_finished(self, result):
+        """Report the settings changed by optimize_repository and the git status speed-up"""
+        self.optimize_button.setEnabled(True)
+        success, output, error = result
+        
+        self.log_output(output.splitlines())
+        for step in getattr(result, 'steps', ()):
+            if step.optional and step.status == FAILED and step.result is not None:
+                self.log_message(f"⚠️ {step.name} failed: {step.result[2].strip()}", "#ffc107")
+        if not success:
+            failed = getattr(result, 'failed_step', None)
+            step = f" at {failed.name}" if failed is not None else ""
+            self.log_message(f"❌ Optimization failed{step}: {error}", "#dc3545")
+        else:
+            before = result.step('status before').result.seconds
+            after = result.step('status after').result.seconds
+            change = f"{before / after:.1f}x faster" if after < before else "no measurable change"
+            self.log_message(
+                f"✅ Repository optimized: git status {before * 1000:.0f} ms → {after * 1000:.0f} ms ({change})",
+                "#28a745"
+            )
+            
+        if hasattr(result, 'timing_summary'):
+            self.log_message(f"⏱️ {result.timing_summary()}", "#6c757d")
+            
+    @traced
     def create_branch(self):
         """Create a new branch"""
         workdir = self.workdir_input.text().strip()
-        branch_name = self.branch_combo.currentText().strip()
+        branch_name = self.branch_picker.text()
         
         if not workdir:
             QMessageBox.warning(self, "Warning", "Please select a working directory")
@@ -352,20 +640,29 @@ class GitTab(QWidget):
             
         self.log_message(f"➕ Creating branch: {branch_name}", "#17a2b8")
         
-        success, output, error = self.command_runner.run_command(
-            ["git", "checkout", "-b", branch_name], 
-            cwd=workdir
-        )
+        self.create_branch_button.setEnabled(False)
+        handle = self.async_runner.submit(self.git_ops.create_branch, workdir, branch_name)
+        handle.finished.connect(lambda result: self.on_branch_created(result, branch_name))
+        
+    def on_branch_created(self, result, branch_name):
+        """Log the outcome of create_branch"""
+        self.create_branch_button.setEnabled(True)
+        success, output, error = result
         
         if success:
             self.log_message(f"✅ Branch '{branch_name}' created and switched to", "#28a745")
-            self.update_current_branch()
             self.refresh_branches()
         else:
             self.log_message(f"❌ Failed to create branch: {error}", "#dc3545")
             
+    @traced
     def clone_repository(self):
-        """Clone a git repository with progress feedback"""
+        """Clone a git repository with progress feedback, or cancel a running clone"""
+        if self.clone_handle is not None:
+            self.log_message("⏹️ Cancelling clone...", "#ffc107")
+            self.clone_handle.cancel()
+            return
+            
         url = self.url_input.text().strip()
         destination = self.folder_input.text().strip()
         
@@ -377,32 +674,85 @@ class GitTab(QWidget):
             QMessageBox.warning(self, "Input Required", "Please select a destination folder")
             return
             
-        # Update UI state
-        self.clone_button.setEnabled(False)
-        self.clone_button.setText("🔄 Cloning...")
+        options = self.clone_options()
+        
+        # Update UI state; the button cancels the clone while it runs
+        self.clone_button.setText("⏹️ Cancel Clone")
+        self.clone_progress = GitProgress()
+        self.clone_progress_bar.setValue(0)
+        self.clone_progress_bar.setFormat("Starting... %p%")
+        self.clone_progress_bar.show()
         
         self.log_message(f"🚀 Starting clone from: {url}", "#17a2b8")
-        self.log_message(f"📁 Destination: {destination}", "#6c757d")
+        self.log_message(f"📁 Destination: {destination} ({options.describe()})", "#6c757d")
         
-        # Run clone command
-        success, output, error = self.command_runner.run_command(
-            ["git", "clone", url], 
-            cwd=destination
+        # Run clone command in the background
+        handle = self.async_runner.submit_streaming(
+            self.git_ops.clone_repository, url, destination, options=options
         )
+        handle.output.connect(self.on_clone_output)
+        handle.finished.connect(self.on_clone_finished)
+        self.clone_handle = handle
+        
+    def clone_options(self):
+        """CloneOptions from the clone section's inputs"""
+        return CloneOptions(
+            depth=self.depth_input.value(),
+            filter_spec=self.filter_combo.currentData(),
+            single_branch=self.single_branch_check.isChecked(),
+            branch=self.clone_branch_input.text().strip(),
+            sparse_paths=self.sparse_input.text().replace(',', ' ').split(),
+            use_mirror=self.mirror_check.isChecked()
+        )
+        
+    def on_clone_output(self, lines):
+        """Show progress lines on the progress bar and log everything else"""
+        messages = []
+        for line in lines:
+            if line.startswith("Cloning into"):
+                # A mirror update and the clone itself each report their own phases
+                self.clone_progress = GitProgress()
+            # Keep each phase's final "..., done." line in the log
+            if not self.clone_progress.feed(line) or line.rstrip().endswith('done.'):
+                messages.append(line)
+                
+        progress = self.clone_progress
+        if progress.phase is not None:
+            self.clone_progress_bar.setValue(progress.overall)
+            self.clone_progress_bar.setFormat(f"{progress.describe()} · %p%")
+        if messages:
+            self.log_output(messages)
+            
+    def on_clone_finished(self, result):
+        """Report the outcome of clone_repository"""
+        success, output, error = result
         
         # Reset UI state
-        self.clone_button.setEnabled(True)
+        self.clone_handle = None
         self.clone_button.setText("🚀 Clone Repository")
+        self.clone_progress_bar.hide()
         
         if success:
             self.log_message("✅ Repository cloned successfully!", "#28a745")
-            if output:
-                self.log_message(f"Details: {output}", "#6c757d")
+            if self.mirror_check.isChecked():
+                mirrors = self.git_ops.mirror_cache.entries()
+                size = sum(entry.size for entry in mirrors) / 1024 ** 3
+                self.log_message(f"🗄️ Mirror cache: {len(mirrors)} mirrors, {size:.2f} GiB", "#6c757d")
+        elif getattr(result, 'cancelled', False):
+            self.log_message("⏹️ Clone cancelled; partial checkout removed", "#ffc107")
         else:
-            self.log_message(f"❌ Clone failed: {error}", "#dc3545")
+            # Clone output has already been streamed to the console
+            reason = error.strip().split('\n')[-1] if error.strip() else "unknown error"
+            self.log_message(f"❌ Clone failed: {reason}", "#dc3545")
             
+    @traced
     def commit_and_push(self):
-        """Commit changes and push to remote with detailed feedback"""
+        """Commit changes and push to remote, or cancel a run in progress"""
+        if self.commit_handle is not None:
+            self.log_message("⏹️ Cancelling commit and push...", "#ffc107")
+            self.commit_handle.cancel()
+            return
+            
         workdir = self.workdir_input.text().strip()
         message = self.commit_msg_input.text().strip()
         
@@ -414,59 +764,76 @@ class GitTab(QWidget):
             QMessageBox.warning(self, "Input Required", "Please enter a commit message")
             return
             
-        # Update UI state
-        self.commit_push_button.setEnabled(False)
-        self.commit_push_button.setText("📤 Working...")
+        # Stage exactly the ticked changes of the last snapshot of this
+        # repository; without one, fall back to staging everything, but
+        # never while changes are unticked
+        paths = None
+        if self.snapshot is not None and self.snapshot_path == os.path.abspath(workdir):
+            selected = [entry.path for entry in self.snapshot.entries if entry.path not in self.excluded_paths]
+            paths = paths_to_stage(self.snapshot, selected)
+        elif self.excluded_paths:
+            self.log_message("⚠️ The change list is not of this repository; refreshing it before committing", "#ffc107")
+            QMessageBox.warning(
+                self, "Changes Not Loaded",
+                "The unticked changes belong to another status check. Review the change list and commit again."
+            )
+            self.check_status()
+            return
+            
+        # Update UI state; the button cancels the current step while it runs
+        self.commit_push_button.setText("⏹️ Cancel")
         
         self.log_message("📤 Starting commit and push process...", "#17a2b8")
+        adding = "Adding all files" if paths is None else f"Staging {len(paths)} files"
+        self.log_message(f"1️⃣ {adding} → 2️⃣ Creating commit → 3️⃣ Pushing to remote", "#6c757d")
         
-        # Step 1: Add all files
-        self.log_message("1️⃣ Adding files to staging area...", "#6c757d")
-        success, output, error = self.command_runner.run_command(
-            ["git", "add", "."], 
-            cwd=workdir
-        )
+        pipeline = self.git_ops.commit_and_push_pipeline(workdir, message, paths=paths)
+        self.commit_handle = self.async_runner.submit_streaming(pipeline.run)
+        self.commit_handle.output.connect(self.log_output)
+        self.commit_handle.finished.connect(self.on_commit_and_push_finished)
         
-        if not success:
-            self.log_message(f"❌ Failed to add files: {error}", "#dc3545")
-            self.reset_commit_button()
-            return
-            
-        # Step 2: Commit
-        self.log_message("2️⃣ Creating commit...", "#6c757d")
-        success, output, error = self.command_runner.run_command(
-            ["git", "commit", "-m", message], 
-            cwd=workdir
-        )
+    def on_commit_and_push_finished(self, result):
+        """Report the outcome of the commit_and_push pipeline"""
+        success, output, error = result
         
-        if not success:
-            if "nothing to commit" in error.lower():
-                self.log_message("ℹ️ No changes to commit", "#ffc107")
-            else:
-                self.log_message(f"❌ Commit failed: {error}", "#dc3545")
-            self.reset_commit_button()
+        if getattr(result, 'cancelled', False):
+            self.on_commit_cancelled()
             return
             
-        # Step 3: Push
-        self.log_message("3️⃣ Pushing to remote...", "#6c757d")
-        success, output, error = self.command_runner.run_command(
-            ["git", "push"], 
-            cwd=workdir
-        )
-        
         if success:
             self.log_message("✅ Commit and push completed successfully!", "#28a745")
             self.commit_msg_input.clear()
+            self.excluded_paths.clear()
         else:
-            self.log_message(f"❌ Push failed: {error}", "#dc3545")
+            failed = getattr(result, 'failed_step', None)
+            step = failed.name if failed is not None else None
             
+            if step == 'add':
+                self.log_message(f"❌ Failed to add files: {error}", "#dc3545")
+            elif step == 'commit' and "nothing to commit" in error.lower():
+                self.log_message("ℹ️ No changes to commit", "#ffc107")
+            elif step == 'commit':
+                self.log_message(f"❌ Commit failed: {error}", "#dc3545")
+            else:
+                reason = error.strip().split('\n')[-1] if error.strip() else "unknown error"
+                self.log_message(f"❌ Push failed: {reason}", "#dc3545")
+                
+        if hasattr(result, 'timing_summary'):
+            self.log_message(f"⏱️ {result.timing_summary()}", "#6c757d")
+            
+        self.reset_commit_button()
+        
+    def on_commit_cancelled(self):
+        """Report that commit_and_push was cancelled"""
+        self.log_message("⏹️ Commit and push cancelled", "#ffc107")
         self.reset_commit_button()
         
     def reset_commit_button(self):
         """Reset commit button to original state"""
-        self.commit_push_button.setEnabled(True)
+        self.commit_handle = None
         self.commit_push_button.setText("📤 Commit & Push")
         
+    @traced
     def refresh_branches(self):
         """Refresh the list of available branches"""
         workdir = self.workdir_input.text().strip()
@@ -477,54 +844,59 @@ class GitTab(QWidget):
             
         self.log_message("🔄 Refreshing branch list...", "#17a2b8")
         
-        # Get local and remote branches
-        success, output, error = self.command_runner.run_command(
-            ["git", "branch", "-a"], 
-            cwd=workdir
-        )
+        # Stream local and remote branches into the picker as git prints them
+        if self.branches_handle is not None:
+            self.branches_handle.cancel()
+        self.refresh_branches_button.setEnabled(False)
+        self.branch_picker.clear()
+        handle = self.async_runner.submit_streaming(self.git_ops.stream_branches, workdir)
+        handle.output.connect(lambda branches, h=handle: self.on_branches_streamed(h, branches))
+        handle.finished.connect(lambda result, h=handle: self.on_branches_loaded(h, result))
+        self.branches_handle = handle
+        
+    def on_branches_streamed(self, handle, branches):
+        """Add a batch of streamed BranchRefs to the picker"""
+        if handle is not self.branches_handle:
+            return  # Output of a superseded refresh
+        self.branch_picker.append(branches)
+        
+    def on_branches_loaded(self, handle, result):
+        """Finish refresh_branches"""
+        if handle is not self.branches_handle:
+            return
+        self.branches_handle = None
+        self.refresh_branches_button.setEnabled(True)
+        success, output, error = result
         
         if success:
-            branches = set()
-            current_branch = ""
-            
-            for line in output.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                if line.startswith('*'):
-                    current_branch = line[2:].strip()
-                    branches.add(current_branch)
-                elif line.startswith('remotes/origin/'):
-                    branch = line.replace('remotes/origin/', '').strip()
-                    if branch != 'HEAD':
-                        branches.add(branch)
-                elif not line.startswith('remotes/'):
-                    branches.add(line)
-                    
-            # Update combo box
-            self.branch_combo.clear()
-            sorted_branches = sorted(branches)
-            self.branch_combo.addItems(sorted_branches)
-            
-            self.log_message(f"✅ Found {len(sorted_branches)} branches", "#28a745")
-            
-            # Update current branch display
-            self.update_current_branch()
+            model = self.branch_picker.model
+            local = sum(1 for branch in model.index_.branches if branch.remote is None)
+            self.log_message(
+                f"✅ Found {local} local and {model.total_count() - local} remote branches", "#28a745"
+            )
             
-        else:
+            # The listing already marks the current branch; only re-read the
+            # snapshot when it disagrees with the one on display
+            current_branch = next(
+                (branch.name for branch in model.index_.branches if branch.is_head), None
+            )
+            if self.snapshot is None or current_branch != self.snapshot.head:
+                self.update_current_branch()
+                
+        elif not result.cancelled:
             self.log_message(f"❌ Failed to get branches: {error}", "#dc3545")
             
+    @traced
     def switch_branch(self):
-        """Switch to selected branch"""
+        """Switch to the selected (or typed) branch"""
         workdir = self.workdir_input.text().strip()
-        branch = self.branch_combo.currentText().strip()
+        selected = self.branch_picker.selected_branch()
         
         if not workdir:
             QMessageBox.warning(self, "Warning", "Please select a working directory")
             return
             
-        if not branch:
+        if selected is None and not self.branch_picker.text():
             QMessageBox.warning(self, "Warning", "Please select or enter a branch name")
             return
             
@@ -532,13 +904,26 @@ class GitTab(QWidget):
         self.switch_branch_button.setEnabled(False)
         self.switch_branch_button.setText("🔀 Switching...")
         
+        if selected is None:
+            branch = self.branch_picker.text()
+            operation = self.git_ops.checkout_branch
+        elif selected.remote is None or self.branch_picker.model.index_.find(selected.name) is not None:
+            # A local branch, or a remote one that already has a local branch of the same name
+            branch = selected.name
+            operation = self.git_ops.checkout_branch
+        else:
+            branch = display_name(selected)
+            operation = self.git_ops.track_branch
+            
         self.log_message(f"🔀 Switching to branch: {branch}", "#17a2b8")
         
         # Switch branch
-        success, output, error = self.command_runner.run_command(
-            ["git", "checkout", branch], 
-            cwd=workdir
-        )
+        handle = self.async_runner.submit(operation, workdir, branch)
+        handle.finished.connect(lambda result: self.on_branch_switched(result, branch))
+        
+    def on_branch_switched(self, result, branch):
+        """Report the outcome of switch_branch"""
+        success, output, error = result
         
         # Reset UI state
         self.switch_branch_button.setEnabled(True)
@@ -550,6 +935,26 @@ class GitTab(QWidget):
         else:
             self.log_message(f"❌ Branch switch failed: {error}", "#dc3545")
             
+    def report_tool_info(self):
+        """Log which git executable will be used"""
+        handle = self.async_runner.submit_background(self.git_ops.get_tool_info)
+        handle.finished.connect(self.on_tool_info_loaded)
+        
+    def on_tool_info_loaded(self, info):
+        """Show the result of report_tool_info"""
+        if getattr(info, 'available', False):
+            self.log_message(f"🔧 Using {info.version or info.name} ({info.path})", "#6c757d")
+        else:
+            self.log_message("⚠️ git was not found in PATH", "#ffc107")
+            
+    @traced(name='log_panel.append', category='log')
+    def log_output(self, lines, color="#6c757d"):
+        """Append a batch of raw command output lines to the console"""
+        if self.log_panel and lines:
+            body = '<br>'.join(f'&nbsp;&nbsp;{html.escape(line)}' for line in lines)
+            self.log_panel.append(f'<span style="color: {color};">{body}</span>')
+            
+    @traced(name='log_panel.append', category='log')
     def log_message(self, message, color="#6c757d"):
         """Log message to console if available"""
         if self.log_panel:
@@ -0,0 +1,320 @@
+"""
+Commit history for repositories with millions of commits
+"""
+
+import datetime
+from collections import deque
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QAbstractItemView, QHeaderView, QLabel
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from PySide6.QtGui import QBrush, QColor, QFont
+
+from core.git_history import PageCache
+
+class HistoryModel(QAbstractTableModel):
+    """
+    Table of commits read page by page
+    
+    The model never holds the whole history. Rows are added a page at a
+    time as the view scrolls to the end (canFetchMore/fetchMore), or all
+    at once when the total commit count is known, and a row's page is only
+    requested, through page_requested, when the view paints it. Pages live
+    in a PageCache, so rows whose page was evicted show a placeholder
+    until it has been read again.
+    """
+    
+    PAGE_SIZE = 200
+    MAX_PAGES = 50
+    COMMIT_COLUMN, SUBJECT_COLUMN, AUTHOR_COLUMN, DATE_COLUMN = range(4)
+    HEADERS = ("Commit", "Subject", "Author", "Date")
+    CommitRole = Qt.UserRole + 1
+    
+    page_requested = Signal(int)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pages = PageCache(self.PAGE_SIZE, self.MAX_PAGES)
+        self._rows = 0
+        self._total = None      # Commit count, once known
+        self._requested = set()
+        self._failed = set()
+        self._mono = QFont('monospace')
+        self._mono.setStyleHint(QFont.Monospace)
+        self._pending_brush = QBrush(QColor('#adb5bd'))
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+        
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+        
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+        
+    def total_count(self):
+        """Number of commits if known, else None"""
+        return self._total
+        
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._total is not None:
+            return False
+        return self._rows // self.PAGE_SIZE not in self._requested | self._failed
+        
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self.request_page(self._rows // self.PAGE_SIZE)
+            
+    def request_page(self, page):
+        """Ask for a page unless it is cached, already requested or failed"""
+        if page in self.pages or page in self._requested or page in self._failed:
+            return
+        self._requested.add(page)
+        self.page_requested.emit(page)
+        
+    def forget_request(self, page):
+        """A requested page will not arrive (dropped or cancelled); allow asking again"""
+        self._requested.discard(page)
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        commit = self.pages.record(row)
+        if commit is None:
+            page = row // self.PAGE_SIZE
+            self.request_page(page)
+            if role == Qt.DisplayRole and column == self.SUBJECT_COLUMN:
+                return "Failed to load" if page in self._failed else "Loading..."
+            if role == Qt.ForegroundRole:
+                return self._pending_brush
+            return None
+            
+        if role == Qt.DisplayRole:
+            if column == self.COMMIT_COLUMN:
+                return commit.short
+            if column == self.SUBJECT_COLUMN:
+                return commit.subject
+            if column == self.AUTHOR_COLUMN:
+                return commit.author
+            return datetime.datetime.fromtimestamp(commit.timestamp).strftime('%Y-%m-%d %H:%M')
+        if role == self.CommitRole:
+            return commit
+        if role == Qt.ToolTipRole:
+            parents = ' '.join(parent[:7] for parent in commit.parents) or "none"
+            return f"{commit.oid}\n{commit.author} <{commit.email}>\nParents: {parents}"
+        if role == Qt.FontRole and column == self.COMMIT_COLUMN:
+            return self._mono
+        return None
+        
+    def set_page(self, page, records):
+        """Store a page read for page_requested and show its rows"""
+        self._requested.discard(page)
+        self.pages.put(page, records)
+        start = page * self.PAGE_SIZE
+        end = start + len(records)
+        if len(records) < self.PAGE_SIZE and self._total is None:
+            self._total = end  # Short page: the end of history
+        if end > self._rows:
+            self.beginInsertRows(QModelIndex(), self._rows, end - 1)
+            self._rows = end
+            self.endInsertRows()
+        if records and start < self._rows:
+            last = min(end, self._rows) - 1
+            self.dataChanged.emit(self.index(start, 0), self.index(last, self.columnCount() - 1))
+            
+    def set_page_failed(self, page):
+        self._requested.discard(page)
+        self._failed.add(page)
+        if page * self.PAGE_SIZE < self._rows:
+            start = page * self.PAGE_SIZE
+            last = min(start + self.PAGE_SIZE, self._rows) - 1
+            self.dataChanged.emit(self.index(start, 0), self.index(last, self.columnCount() - 1))
+            
+    def set_total(self, total):
+        """Make every commit scrollable once the count is known"""
+        self._total = total
+        if total > self._rows:
+            self.beginInsertRows(QModelIndex(), self._rows, total - 1)
+            self._rows = total
+            self.endInsertRows()
+            
+    def clear(self):
+        self.beginResetModel()
+        self.pages.clear()
+        self._rows = 0
+        self._total = None
+        self._requested.clear()
+        self._failed.clear()
+        self.endResetModel()
+
+class HistoryView(QWidget):
+    """
+    Commit table that reads `git log` pages as they scroll into view
+    
+    At most MAX_IN_FLIGHT pages are read at a time. Requests wait in a
+    queue served newest first, so after a fast scroll the pages now on
+    screen are read before the ones scrolled past; requests beyond
+    MAX_QUEUED are dropped and asked again if those rows are painted
+    again. Loading another repository or revision cancels everything
+    still running.
+    
+    Every page of one load is read from the same commit (head_oid), so
+    HEAD moving in between cannot shift rows between pages. The first
+    pages are read with --skip; once `git rev-list` has indexed the whole
+    history, which also gives the count, each page is read by its hashes,
+    so pages deep in the history cost no more than the first.
+    
+    Args:
+        git_ops (GitOperations): Source of log pages and commit lists
+        async_runner (AsyncCommandRunner): Runs the reads off the UI thread
+    """
+    
+    MAX_IN_FLIGHT = 2
+    MAX_QUEUED = 6
+    
+    def __init__(self, git_ops, async_runner, parent=None):
+        super().__init__(parent)
+        self.git_ops = git_ops
+        self.async_runner = async_runner
+        self.repo_path = None
+        self.revision = 'HEAD'
+        self.head_oid = None        # Commit the loaded history starts from
+        self._oids = None           # OidIndex of the loaded history, once listed
+        self._generation = 0        # Bumped on every load; older results are ignored
+        self._handles = {}          # Page -> CommandHandle reading it
+        self._queue = deque()
+        self._list_handle = None
+        
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+        
+        self.model = HistoryModel(self)
+        self.model.page_requested.connect(self._on_page_requested)
+        self.table_view = QTableView()
+        self.table_view.setObjectName("historyTable")
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table_view.setWordWrap(False)
+        self.table_view.setMinimumHeight(220)
+        self.table_view.verticalHeader().hide()
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_view.verticalHeader().setDefaultSectionSize(24)
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(HistoryModel.SUBJECT_COLUMN, QHeaderView.Stretch)
+        for column, width in ((HistoryModel.COMMIT_COLUMN, 90), (HistoryModel.AUTHOR_COLUMN, 150),
+                              (HistoryModel.DATE_COLUMN, 130)):
+            header.setSectionResizeMode(column, QHeaderView.Interactive)
+            header.resizeSection(column, width)
+        layout.addWidget(self.table_view)
+        
+        self.summary_label = QLabel("History not loaded")
+        self.summary_label.setObjectName("historySummary")
+        layout.addWidget(self.summary_label)
+        
+    def load(self, repo_path, revision='HEAD', head_oid=None):
+        """Show the history of revision in repo_path from the top"""
+        self.cancel()
+        self.repo_path = repo_path
+        self.revision = revision
+        self.head_oid = head_oid
+        self._oids = None
+        self.model.clear()
+        
+        # First page before the commit list, which walks the whole history
+        self.model.fetchMore()
+        generation = self._generation
+        self._list_handle = self.async_runner.submit_background(
+            self.git_ops.list_commits, repo_path, self._log_revision()
+        )
+        self._list_handle.finished.connect(lambda result: self._on_commits_listed(generation, result))
+        self._update_summary()
+        
+    def clear(self, message="History not loaded"):
+        """Stop loading and show message instead of commits"""
+        self.cancel()
+        self.repo_path = None
+        self.head_oid = None
+        self._oids = None
+        self.model.clear()
+        self.summary_label.setText(message)
+        
+    def cancel(self):
+        """Stop every read in progress and forget queued ones"""
+        self._generation += 1
+        for handle in self._handles.values():
+            handle.cancel()
+        self._handles.clear()
+        self._queue.clear()
+        if self._list_handle is not None:
+            self._list_handle.cancel()
+            self._list_handle = None
+            
+    def _on_page_requested(self, page):
+        self._queue.append(page)
+        while len(self._queue) > self.MAX_QUEUED:
+            self.model.forget_request(self._queue.popleft())
+        self._pump()
+        
+    def _pump(self):
+        """Start queued page reads while there is room"""
+        while self._queue and len(self._handles) < self.MAX_IN_FLIGHT and self.repo_path:
+            page = self._queue.pop()
+            size = HistoryModel.PAGE_SIZE
+            oids = self._oids.page(page, size) if self._oids is not None else None
+            handle = self.async_runner.submit(
+                self.git_ops.log_page, self.repo_path, page * size, size, self._log_revision(), oids
+            )
+            self._handles[page] = handle
+            generation = self._generation
+            handle.finished.connect(
+                lambda result, page=page: self._on_page_loaded(generation, page, result)
+            )
+            
+    def _on_page_loaded(self, generation, page, result):
+        if generation != self._generation:
+            return
+        self._handles.pop(page, None)
+        success, records, error = result
+        if getattr(result, 'cancelled', False):
+            self.model.forget_request(page)
+        elif success:
+            self.model.set_page(page, records)
+        else:
+            self.model.set_page_failed(page)
+        # Refill the freed slot either way, or queued pages would wait for a scroll
+        self._pump()
+        if success or getattr(result, 'cancelled', False):
+            self._update_summary()
+        else:
+            self.summary_label.setText(f"History could not be read: {error.strip()}")
+        
+    def _log_revision(self):
+        """What every page is read from: the resolved HEAD commit if known"""
+        return self.head_oid or self.revision
+        
+    def _on_commits_listed(self, generation, result):
+        if generation != self._generation:
+            return
+        self._list_handle = None
+        success, oids, _error = result
+        if success:
+            self._oids = oids
+            self.model.set_total(len(oids))
+            self._update_summary()
+            
+    def _update_summary(self):
+        model = self.model
+        total = model.total_count()
+        counted = f"{total:,} commits" if total is not None else f"{model.rowCount():,}+ commits"
+        self.summary_label.setText(
+            f"{counted} on {self.revision} · {len(model.pages)} of {model.MAX_PAGES} pages cached"
+        )
+        
+    def selected_commit(self):
+        """Selected CommitRecord, or None"""
+        return self.model.data(self.table_view.currentIndex(), HistoryModel.CommitRole)
\ No newline at end of file
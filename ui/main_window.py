@@ -2,15 +2,22 @@
 DevTerm - Professional Main Window with Modern UI Design
 """
 
+import html
+
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QTabWidget, QTextEdit, QLabel, QSplitter, QFrame, QScrollArea, QPushButton
+    QTabWidget, QTextEdit, QLabel, QSplitter, QFrame, QScrollArea, QPushButton,
+    QFileDialog
 )
-from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QFont, QPalette, QColor
+from PySide6.QtCore import Qt, QSize, QTimer
+from PySide6.QtGui import QFont, QPalette, QColor, QAction
+
+from core.stall_detector import StallDetector
+from core.tracing import traced, tracer, trace_from_environment
 
 from .git_tab import GitTab
 from .docker_tab import DockerTab
+from .diagnostics_tab import DiagnosticsTab
 
 class MainWindow(QMainWindow):
     """Professional main window with clean, modern design"""
@@ -21,6 +28,9 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 1400, 900)
         self.setMinimumSize(1200, 700)
         
+        # DEVTERM_TRACE=<file> records a trace from startup until exit
+        self.trace_path = trace_from_environment()
+        
         # Apply global theme first
         self.apply_global_theme()
         
@@ -39,6 +49,20 @@ class MainWindow(QMainWindow):
         # Create main content area
         self.create_content_area(main_layout)
         
+        # Create menu
+        self.create_menu()
+        
+        # Watch for event-loop stalls and report them in the header HUD
+        self.stall_detector = StallDetector(self)
+        self.stall_detector.stall_detected.connect(self.on_stall_detected)
+        self.stall_detector.start()
+        
+        self.hud_timer = QTimer(self)
+        self.hud_timer.setInterval(1000)
+        self.hud_timer.timeout.connect(self.update_hud)
+        self.hud_timer.start()
+        self.update_hud()
+        
     def create_header(self, parent_layout):
         """Create professional header with gradient background"""
         header_frame = QFrame()
@@ -65,6 +89,11 @@ class MainWindow(QMainWindow):
         header_layout.addLayout(title_container)
         header_layout.addStretch()
         
+        # Performance HUD
+        self.hud_label = QLabel()
+        self.hud_label.setObjectName("perfHud")
+        header_layout.addWidget(self.hud_label)
+        
         # Version info
         version_label = QLabel("v1.0.0")
         version_label.setObjectName("version")
@@ -127,17 +156,26 @@ class MainWindow(QMainWindow):
         docker_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         docker_scroll.setObjectName("dockerScrollArea")
         
+        diagnostics_scroll = QScrollArea()
+        diagnostics_scroll.setWidgetResizable(True)
+        diagnostics_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        diagnostics_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        diagnostics_scroll.setObjectName("diagnosticsScrollArea")
+        
         # Create tabs
         self.git_tab = GitTab(self.log_panel if hasattr(self, 'log_panel') else None)
         self.docker_tab = DockerTab(self.log_panel if hasattr(self, 'log_panel') else None)
+        self.diagnostics_tab = DiagnosticsTab(self.log_panel if hasattr(self, 'log_panel') else None)
         
         # Add tabs to scroll areas
         git_scroll.setWidget(self.git_tab)
         docker_scroll.setWidget(self.docker_tab)
+        diagnostics_scroll.setWidget(self.diagnostics_tab)
         
         # Add tabs to tab widget
         self.tab_widget.addTab(git_scroll, "🔧 Git Operations")
         self.tab_widget.addTab(docker_scroll, "🐳 Docker Management")
+        self.tab_widget.addTab(diagnostics_scroll, "📊 Diagnostics")
         
         tab_layout.addWidget(self.tab_widget)
         parent_splitter.addWidget(tab_container)
@@ -186,9 +224,81 @@ class MainWindow(QMainWindow):
             self.git_tab.log_panel = self.log_panel
         if hasattr(self, 'docker_tab'):
             self.docker_tab.log_panel = self.log_panel
+        if hasattr(self, 'diagnostics_tab'):
+            self.diagnostics_tab.log_panel = self.log_panel
         
         parent_splitter.addWidget(console_container)
         
+    def create_menu(self):
+        """Create the menu bar"""
+        diagnostics_menu = self.menuBar().addMenu("Diagnostics")
+        
+        self.trace_action = QAction("⏺️ Record Trace", self)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(tracer.enabled)
+        self.trace_action.toggled.connect(self.toggle_tracing)
+        diagnostics_menu.addAction(self.trace_action)
+        
+    def toggle_tracing(self, enabled):
+        """Start recording a trace, or stop and save it"""
+        if enabled:
+            tracer.start()
+            self.log_info("Recording trace of UI actions and commands...")
+            return
+            
+        tracer.stop()
+        path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "devterm-trace.json", "Trace (*.json)")
+        if not path:
+            self.log_warning("Trace discarded")
+            return
+            
+        try:
+            tracer.write(path)
+        except OSError as e:
+            self.log_error(f"Could not save trace: {e}")
+            return
+        self.log_success(f"Trace saved to {path} (open in chrome://tracing or ui.perfetto.dev)")
+        
+    def update_hud(self):
+        """Show stall count and worst event-loop latency in the header"""
+        detector = self.stall_detector
+        if detector.stall_count == 0:
+            icon = "🟢"
+        elif detector.worst_latency < 1.0:
+            icon = "🟡"
+        else:
+            icon = "🔴"
+        self.hud_label.setText(
+            f"{icon} {detector.stall_count} stalls · worst {detector.worst_latency * 1000:.0f} ms"
+        )
+        
+        if detector.last_stall is not None:
+            self.hud_label.setToolTip(
+                f"Last stall: {detector.last_stall.duration * 1000:.0f} ms in {detector.last_stall.describe()}"
+            )
+        else:
+            self.hud_label.setToolTip("Event-loop latency watchdog")
+            
+    def on_stall_detected(self, record):
+        """Report an event-loop stall"""
+        self.update_hud()
+        self.log_warning(f"🐢 UI stalled for {record.duration * 1000:.0f} ms in {html.escape(record.describe())}")
+        
+    def closeEvent(self, event):
+        """Cancel running commands so that closing never waits on them"""
+        self.stall_detector.stop()
+        self.git_tab.async_runner.cancel_all()
+        self.docker_tab.async_runner.cancel_all()
+        
+        if self.trace_path and tracer.enabled:
+            tracer.stop()
+            try:
+                tracer.write(self.trace_path)
+            except OSError:
+                pass
+        super().closeEvent(event)
+        
+    @traced
     def clear_console(self):
         """Clear the console output"""
         self.log_panel.clear()
@@ -227,6 +337,17 @@ class MainWindow(QMainWindow):
                 padding: 0;
             }
             
+            #perfHud {
+                color: white;
+                font-size: 12px;
+                font-weight: 500;
+                background-color: rgba(0, 0, 0, 0.2);
+                padding: 4px 12px;
+                border-radius: 12px;
+                margin-top: 20px;
+                margin-right: 10px;
+            }
+            
             #version {
                 color: rgba(255, 255, 255, 0.8);
                 font-size: 12px;
@@ -562,6 +683,7 @@ class MainWindow(QMainWindow):
             }
         """)
     
+    @traced(name='log_panel.append', category='log')
     def log_message(self, message, color="#d4d4d4"):
         """Add message to log panel with timestamp"""
         import datetime
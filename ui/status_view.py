@@ -0,0 +1,455 @@
+"""
+Change list for repositories with tens of thousands of changed files
+"""
+
+from array import array
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QComboBox, QCheckBox, QLabel,
+    QTreeView, QAbstractItemView, QHeaderView
+)
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex, QTimer, Signal
+from PySide6.QtGui import QBrush, QColor, QFont
+
+from core.status_store import (
+    KINDS, StatusStore, ALL, STAGED, UNSTAGED, UNTRACKED, CONFLICTED, SORT_PATH, SORT_STATUS
+)
+
+class StatusModel(QAbstractItemModel):
+    """
+    Two-column (path, status) model over a StatusStore
+    
+    Flat, every visible change is a top-level row; grouped, the top level
+    holds one row per directory with its changes as children. The model
+    only keeps arrays of store rows, and rows are exposed to the view in
+    FETCH_BATCH chunks through canFetchMore/fetchMore (per directory when
+    grouped), so the view only lays out what has been scrolled to and no
+    per-entry objects exist. Check boxes edit the excluded
+    set shared with GitTab: a ticked change is staged on commit. Changes
+    that are fully staged already cannot be unticked.
+    """
+    
+    FETCH_BATCH = 500
+    PATH_COLUMN, STATUS_COLUMN = 0, 1
+    PathRole = Qt.UserRole + 1
+    
+    # Precomputed: flags() runs for every row the view lays out
+    _PLAIN_FLAGS = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemNeverHasChildren
+    _CHECKABLE_FLAGS = _PLAIN_FLAGS | Qt.ItemIsUserCheckable
+    _GROUP_FLAGS = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+    
+    exclusions_changed = Signal()
+    
+    def __init__(self, excluded=None, parent=None):
+        super().__init__(parent)
+        self.store = StatusStore()
+        self.excluded = excluded if excluded is not None else set()
+        self.grouped = False
+        self._query = ''
+        self._category = ALL
+        self._sort_key = SORT_PATH
+        self._descending = False
+        self._rows = array('I')     # Visible store rows, flat mode
+        self._groups = []           # (directory id, rows) per directory, grouped mode
+        self._exposed = 0           # Top-level rows the view has been told about
+        self._child_exposed = {}    # Group number -> children the view has been told about
+        self._group_states = {}     # Group number -> cached check state
+        self._bold = QFont()
+        self._bold.setBold(True)
+        self._brushes = {
+            'untracked': QBrush(QColor('#28a745')),
+            'unmerged': QBrush(QColor('#dc3545')),
+            'ignored': QBrush(QColor('#adb5bd')),
+        }
+        
+    # Structure
+    def _group_of(self, index):
+        """Group number of a child index, or None for top-level indexes"""
+        parent_id = index.internalId()
+        return parent_id - 1 if parent_id else None
+        
+    def store_row(self, index):
+        """Store row shown at index, or None for directory rows"""
+        if not index.isValid():
+            return None
+        group = self._group_of(index)
+        if group is not None:
+            return self._groups[group][1][index.row()]
+        if self.grouped:
+            return None
+        return self._rows[index.row()]
+        
+    def index(self, row, column, parent=QModelIndex()):
+        if row < 0 or not 0 <= column < 2 or row >= self.rowCount(parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, 0)
+        return self.createIndex(row, column, parent.row() + 1)
+        
+    def parent(self, index=None):
+        if index is None:
+            return super().parent()
+        if not index.isValid():
+            return QModelIndex()
+        group = self._group_of(index)
+        if group is None:
+            return QModelIndex()
+        return self.createIndex(group, 0, 0)
+        
+    def _total(self, parent):
+        """Rows under parent once everything is fetched"""
+        if not parent.isValid():
+            return len(self._groups) if self.grouped else len(self._rows)
+        if self.grouped and parent.internalId() == 0 and parent.column() == 0:
+            return len(self._groups[parent.row()][1])
+        return 0
+        
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self._exposed
+        if self.grouped and parent.internalId() == 0 and parent.column() == 0:
+            group = parent.row()
+            exposed = self._child_exposed.get(group)
+            if exposed is None:
+                exposed = self._child_exposed[group] = min(self.FETCH_BATCH, len(self._groups[group][1]))
+            return exposed
+        return 0
+        
+    def canFetchMore(self, parent=QModelIndex()):
+        return self.rowCount(parent) < self._total(parent)
+        
+    def fetchMore(self, parent=QModelIndex()):
+        self.fetch_to(self.rowCount(parent) + self.FETCH_BATCH, parent)
+        
+    def fetch_to(self, count, parent=QModelIndex()):
+        """Expose rows under parent until at least count are visible to the view"""
+        exposed = self.rowCount(parent)
+        count = min(count, self._total(parent))
+        if count <= exposed:
+            return
+        self.beginInsertRows(parent, exposed, count - 1)
+        if parent.isValid():
+            self._child_exposed[parent.row()] = count
+        else:
+            self._exposed = count
+        self.endInsertRows()
+        
+    def columnCount(self, parent=QModelIndex()):
+        return 2
+        
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ("Path", "Status")[section]
+        return None
+        
+    # Content
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.store_row(index)
+        if row is None:
+            return self._group_data(index, role)
+            
+        store = self.store
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == self.STATUS_COLUMN:
+                return store.status(row)
+            text = store.name(row) if self.grouped else store.paths[row]
+            orig = store.orig_paths.get(row)
+            return f"{orig} → {text}" if orig else text
+        if role == Qt.CheckStateRole and column == self.PATH_COLUMN:
+            if store.is_stageable(row) and store.paths[row] in self.excluded:
+                return Qt.Unchecked
+            return Qt.Checked
+        if role == self.PathRole:
+            return store.paths[row]
+        if role == Qt.ToolTipRole:
+            if not store.is_stageable(row):
+                return f"{store.paths[row]}\nAlready staged"
+            return store.paths[row]
+        if role == Qt.ForegroundRole:
+            return self._brushes.get(KINDS[store.kinds[row]])
+        if role == Qt.FontRole and column == self.STATUS_COLUMN:
+            return self._bold
+        return None
+        
+    def _group_data(self, index, role):
+        group = index.row()
+        dir_id, rows = self._groups[group]
+        if role == Qt.DisplayRole:
+            if index.column() == self.STATUS_COLUMN:
+                return f"{len(rows)} changes"
+            directory = self.store.directories[dir_id]
+            return f"{directory}/" if directory else "(top level)"
+        if role == Qt.CheckStateRole and index.column() == self.PATH_COLUMN:
+            return self._group_check_state(group)
+        if role == Qt.ToolTipRole:
+            counts = self.store.kind_counts(rows)
+            return ', '.join(f"{count} {kind}" for kind, count in counts.items())
+        if role == Qt.FontRole:
+            return self._bold
+        return None
+        
+    def _group_check_state(self, group):
+        state = self._group_states.get(group)
+        if state is None:
+            store, excluded = self.store, self.excluded
+            stageable = excluded_count = 0
+            for row in self._groups[group][1]:
+                if store.is_stageable(row):
+                    stageable += 1
+                    if store.paths[row] in excluded:
+                        excluded_count += 1
+            if excluded_count == 0:
+                state = Qt.Checked
+            elif excluded_count == stageable:
+                state = Qt.Unchecked
+            else:
+                state = Qt.PartiallyChecked
+            self._group_states[group] = state
+        return state
+        
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        row = self.store_row(index)
+        if row is None:
+            return self._GROUP_FLAGS
+        if index.column() == self.PATH_COLUMN and self.store.is_stageable(row):
+            return self._CHECKABLE_FLAGS
+        return self._PLAIN_FLAGS
+        
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        checked = Qt.CheckState(value) == Qt.Checked
+        row = self.store_row(index)
+        if row is None:
+            self._set_rows_checked(self._groups[index.row()][1], checked)
+            exposed = self.rowCount(index)
+            if exposed:
+                self.dataChanged.emit(self.index(0, 0, index), self.index(exposed - 1, 0, index), [Qt.CheckStateRole])
+        else:
+            self._set_rows_checked((row,), checked)
+            parent = index.parent()
+            if parent.isValid():
+                self.dataChanged.emit(parent, parent, [Qt.CheckStateRole])
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.exclusions_changed.emit()
+        return True
+        
+    def _set_rows_checked(self, rows, checked):
+        store, excluded = self.store, self.excluded
+        for row in rows:
+            if not store.is_stageable(row):
+                continue
+            if checked:
+                excluded.discard(store.paths[row])
+            else:
+                excluded.add(store.paths[row])
+        self._group_states.clear()
+        
+    def set_all_checked(self, checked):
+        """Tick or untick every change that can still be staged"""
+        self.excluded.clear()
+        if not checked:
+            self._set_rows_checked(range(len(self.store)), False)
+        self._group_states.clear()
+        # Repaint every row without resetting expansion and scroll position
+        self.layoutAboutToBeChanged.emit()
+        self.layoutChanged.emit()
+        self.exclusions_changed.emit()
+        
+    # Filtering, sorting and grouping
+    def set_store(self, store):
+        """Show a new StatusStore, keeping filter, sort order and grouping"""
+        self.store = store
+        self._rebuild()
+        
+    def set_filter(self, query, category=ALL):
+        """Show only changes in category whose path contains query"""
+        query = query.strip()
+        if query == self._query and category == self._category:
+            return
+        self._query, self._category = query, category
+        self._rebuild()
+        
+    def set_grouped(self, grouped):
+        """Switch between a flat list and per-directory groups"""
+        if grouped != self.grouped:
+            self.grouped = grouped
+            self._rebuild()
+            
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort_key = SORT_STATUS if column == self.STATUS_COLUMN else SORT_PATH
+        self._descending = order == Qt.DescendingOrder
+        self._rebuild()
+        
+    def _rebuild(self):
+        self.beginResetModel()
+        store = self.store
+        rows = store.sort(store.filter(self._query, self._category), self._sort_key, self._descending)
+        if self.grouped:
+            directories = store.directories
+            self._groups = sorted(
+                store.group_by_directory(rows),
+                key=lambda group: directories[group[0]],
+                reverse=self._descending and self._sort_key == SORT_PATH
+            )
+            self._rows = rows
+        else:
+            self._groups = []
+            self._rows = rows
+        self._exposed = min(self.FETCH_BATCH, self._total(QModelIndex()))
+        self._child_exposed = {}
+        self._group_states.clear()
+        self.endResetModel()
+        
+    def match_count(self):
+        """Number of changes passing the filter"""
+        return len(self._rows)
+        
+    def directory_count(self):
+        """Number of directories with changes passing the filter (grouped mode)"""
+        return len(self._groups)
+        
+    def group_directory(self, row):
+        """Directory of a top-level row in grouped mode"""
+        return self.store.directories[self._groups[row][0]]
+
+class StatusView(QWidget):
+    """
+    Filterable, sortable change list with optional per-directory grouping
+    
+    Args:
+        excluded (set): Paths the user unticked; shared with the caller and
+            updated in place
+    """
+    
+    # Milliseconds of typing to coalesce before filtering
+    FILTER_DELAY = 120
+    
+    CATEGORY_LABELS = (
+        (ALL, "All changes"),
+        (STAGED, "Staged"),
+        (UNSTAGED, "Unstaged"),
+        (UNTRACKED, "Untracked"),
+        (CONFLICTED, "Conflicted"),
+    )
+    
+    exclusions_changed = Signal()
+    current_path_changed = Signal(str)  # Path of the change the user selected
+    
+    def __init__(self, excluded=None, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+        
+        controls = QHBoxLayout()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter changes by path...")
+        self.filter_input.setObjectName("changesFilter")
+        controls.addWidget(self.filter_input, 1)
+        
+        self.category_combo = QComboBox()
+        for category, label in self.CATEGORY_LABELS:
+            self.category_combo.addItem(label, category)
+        controls.addWidget(self.category_combo)
+        
+        self.group_check = QCheckBox("Group by directory")
+        self.group_check.toggled.connect(self._on_group_toggled)
+        controls.addWidget(self.group_check)
+        layout.addLayout(controls)
+        
+        self.model = StatusModel(excluded, self)
+        self.model.exclusions_changed.connect(self._update_summary)
+        self.model.exclusions_changed.connect(self.exclusions_changed)
+        self.tree_view = QTreeView()
+        self.tree_view.setObjectName("changesList")
+        self.tree_view.setModel(self.model)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setRootIsDecorated(False)
+        self.tree_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tree_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tree_view.setMinimumHeight(160)
+        self.tree_view.setSortingEnabled(True)
+        self.tree_view.sortByColumn(StatusModel.PATH_COLUMN, Qt.AscendingOrder)
+        header = self.tree_view.header()
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(StatusModel.PATH_COLUMN, QHeaderView.Stretch)
+        # A fixed width: sizing to contents would measure every row
+        header.setSectionResizeMode(StatusModel.STATUS_COLUMN, QHeaderView.Fixed)
+        header.resizeSection(StatusModel.STATUS_COLUMN, 110)
+        self.tree_view.selectionModel().currentChanged.connect(self._on_current_changed)
+        layout.addWidget(self.tree_view)
+        
+        self.summary_label = QLabel()
+        self.summary_label.setObjectName("changesSummary")
+        layout.addWidget(self.summary_label)
+        
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(self.FILTER_DELAY)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self.filter_input.textChanged.connect(self._filter_timer.start)
+        self.category_combo.currentIndexChanged.connect(lambda: self._apply_filter())
+        self._update_summary()
+        
+    def _apply_filter(self):
+        self._keeping_view_state(
+            lambda: self.model.set_filter(self.filter_input.text(), self.category_combo.currentData())
+        )
+        
+    def _on_current_changed(self, current, _previous):
+        path = self.model.data(current, StatusModel.PathRole)
+        if path is not None:
+            self.current_path_changed.emit(path)
+            
+    def _on_group_toggled(self, grouped):
+        self.model.set_grouped(grouped)
+        self.tree_view.setRootIsDecorated(grouped)
+        self._update_summary()
+        
+    def _keeping_view_state(self, change):
+        """Apply a model change, then restore expanded directories and scroll position"""
+        expanded = set()
+        if self.model.grouped:
+            for row in range(self.model.rowCount()):
+                if self.tree_view.isExpanded(self.model.index(row, 0)):
+                    expanded.add(self.model.group_directory(row))
+        scroll = self.tree_view.verticalScrollBar().value()
+        fetched = self.model.rowCount()
+        
+        change()
+        
+        self.model.fetch_to(fetched)
+        if expanded:
+            for row in range(self.model.rowCount()):
+                if self.model.group_directory(row) in expanded:
+                    self.tree_view.setExpanded(self.model.index(row, 0), True)
+        self.tree_view.verticalScrollBar().setValue(scroll)
+        self._update_summary()
+        
+    def _update_summary(self):
+        model = self.model
+        text = f"{model.match_count()} of {len(model.store)} changes"
+        if model.grouped:
+            text += f" in {model.directory_count()} directories"
+        if model.excluded:
+            text += f" · {len(model.excluded)} excluded"
+        self.summary_label.setText(text)
+        
+    def set_snapshot(self, snapshot):
+        """Show the changes of a RepoSnapshot"""
+        store = snapshot.store if snapshot.store is not None else StatusStore.from_entries(snapshot.entries)
+        self._keeping_view_state(lambda: self.model.set_store(store))
+        
+    def set_all_checked(self, checked):
+        self.model.set_all_checked(checked)
+        self._update_summary()
+        
+    def selected_path(self):
+        """Path of the selected change, or None"""
+        return self.model.data(self.tree_view.currentIndex(), StatusModel.PathRole)
\ No newline at end of file